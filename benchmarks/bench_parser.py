@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: _parse_klines_response vs _parse_klines_fast.
+
+Run:
+    python benchmarks/bench_parser.py --rows 1000000
+
+Notes (written content):
+- Synthetic 1m klines shaped like /fapi/v1/klines responses (string prices,
+  int times), split into MAX_LIMIT-row pages as the fetcher would see them.
+- "list" times parsing already-decoded pages; "bytes" times parsing the raw
+  response bodies, i.e. it includes the work json.loads would otherwise do.
+- Every fast result is checked for exact equality with the reference first.
+"""
+
+import argparse
+import json
+import random
+import time
+
+import pandas as pd
+
+from binance_ohlcv_extractor.extractor import MAX_LIMIT, _parse_klines_fast, _parse_klines_response
+
+
+def synthetic_pages(rows: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    t0 = 1_577_836_800_000
+    px = 7_200.0
+    klines = []
+    for i in range(rows):
+        px = max(1.0, px + rng.gauss(0, 5))
+        hi, lo = px + rng.random() * 10, px - rng.random() * 10
+        t = t0 + i * 60_000
+        klines.append(
+            [t, f"{px:.2f}", f"{hi:.2f}", f"{lo:.2f}", f"{px:.2f}", f"{rng.random() * 500:.3f}",
+             t + 59_999, f"{rng.random() * 1e6:.5f}", rng.randint(1, 5000), "1.000", "7200.00", "0"]
+        )
+    return [klines[i : i + MAX_LIMIT] for i in range(0, rows, MAX_LIMIT)]
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark the klines parsers")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    pages = synthetic_pages(args.rows)
+    bodies = [json.dumps(page).encode() for page in pages]
+
+    reference = pd.concat([_parse_klines_response(page) for page in pages])
+    for fast in (pd.concat([_parse_klines_fast(page) for page in pages]),
+                 pd.concat([_parse_klines_fast(body) for body in bodies])):
+        pd.testing.assert_frame_equal(reference, fast, check_exact=True)
+
+    groups = {
+        "decoded pages": {
+            "reference": lambda: [_parse_klines_response(page) for page in pages],
+            "fast": lambda: [_parse_klines_fast(page) for page in pages],
+        },
+        "from response bytes": {
+            "reference (json.loads)": lambda: [_parse_klines_response(json.loads(b)) for b in bodies],
+            "fast (json.loads)": lambda: [_parse_klines_fast(json.loads(b)) for b in bodies],
+            "fast (raw bytes)": lambda: [_parse_klines_fast(b) for b in bodies],
+        },
+    }
+    print(f"{args.rows} rows in {len(pages)} pages, best of {args.repeat}")
+    for group, cases in groups.items():
+        print(f"{group}:")
+        base = None
+        for name, fn in cases.items():
+            secs = best_of(fn, args.repeat)
+            base = base or secs
+            print(f"  {name:<24} {secs * 1000:9.1f} ms  {args.rows / secs / 1e6:6.2f} Mrows/s  x{base / secs:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Throughput of the fetch-thread / worker-process pipeline against thread-only extraction.
+
+Run:
+    python benchmarks/bench_pipeline.py                       # 16 symbols x 14 days of 1m
+    python benchmarks/bench_pipeline.py --symbols 64 --days 30 --processes 1 2 4 8 --json pipe.json
+
+Notes (written content):
+- Pages come from an in-memory transport that serves pre-encoded JSON bodies
+  (mock_server.synthetic_klines) with an optional per-request sleep, so the
+  client's parse and write work is what is measured, not an HTTP server
+  running in the same interpreter.
+- "threads" is the CLI's default path: criptodata(return_df=False) per symbol on
+  --io-workers threads, parsing and writing under the GIL. "pipeline, N procs"
+  is run_pipeline() with the same fetch threads and N worker processes.
+- Output is CSV; every row checks that all symbols wrote the same bytes.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import synthetic_klines  # noqa: E402
+
+from binance_ohlcv_extractor.extractor import criptodata  # noqa: E402
+from binance_ohlcv_extractor.pipeline import run_pipeline  # noqa: E402
+from binance_ohlcv_extractor.ratelimit import RateLimiter  # noqa: E402
+from binance_ohlcv_extractor.transport import AsyncResponse  # noqa: E402
+
+
+class MemoryTransport:
+    """Serves klines pages from memory; bodies do not depend on the symbol, so each is encoded once."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self._bodies: Dict[Tuple[str, int, int, int], bytes] = {}
+
+    def get(self, path: str, params: Dict[str, Any]) -> AsyncResponse:
+        key = (params["interval"], params["startTime"], params["endTime"], params["limit"])
+        body = self._bodies.get(key)
+        if body is None:
+            rows = synthetic_klines(*key)
+            body = self._bodies.setdefault(key, json.dumps(rows, separators=(",", ":")).encode())
+        if self.latency:
+            time.sleep(self.latency)
+        return AsyncResponse(200, {}, body, path)
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark pipelined extraction against thread-only extraction")
+    p.add_argument("--symbols", type=int, default=16)
+    p.add_argument("--interval", default="1m")
+    p.add_argument("--days", type=int, default=14)
+    p.add_argument("--latency", type=float, default=0.0, help="Sleep per request (s)")
+    p.add_argument("--io-workers", type=int, default=8)
+    p.add_argument("--processes", type=int, nargs="+", help="Worker counts to try (default 1..cpu_count)")
+    p.add_argument("--json", help="Write the results to this file")
+    args = p.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = args.processes or sorted({1, 2, 4, cpus} & set(range(1, cpus + 1)))
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    start_str, end = "2021-01-01", date(2021, 1, 1) + timedelta(days=args.days - 1)
+    transport = MemoryTransport(args.latency)
+    limiter = RateLimiter(weight_limit=10**9)
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory() as out:
+        # Warm the body cache so no row pays for encoding.
+        criptodata(symbols[0], start_str, end, interval=args.interval, output_dir=os.path.join(out, "warm"),
+                   limiter=limiter, transport=transport, return_df=False)
+
+        def check(run_dir: str) -> None:
+            first = open(os.path.join(run_dir, f"{symbols[0]}.csv"), "rb").read()
+            for s in symbols[1:]:
+                assert open(os.path.join(run_dir, f"{s}.csv"), "rb").read() == first, s
+
+        def record(name: str, secs: float, rows: int) -> None:
+            results.append({"run": name, "seconds": round(secs, 4), "rows_per_s": round(rows / secs, 1)})
+
+        run_dir = os.path.join(out, "threads")
+        t = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.io_workers) as pool:
+            rows = sum(pool.map(
+                lambda s: criptodata(s, start_str, end, interval=args.interval, output_dir=run_dir,
+                                     limiter=limiter, transport=transport, return_df=False),
+                symbols,
+            ))
+        record(f"threads ({args.io_workers})", time.perf_counter() - t, rows)
+        check(run_dir)
+
+        for n in counts:
+            run_dir = os.path.join(out, f"pipeline-{n}")
+            t = time.perf_counter()
+            got = run_pipeline(symbols, start_str, end, interval=args.interval, output_dir=run_dir,
+                               io_workers=args.io_workers, processes=n, limiter=limiter, transport=transport)
+            secs = time.perf_counter() - t
+            failed = [s for s, r in got.items() if isinstance(r, Exception)]
+            assert not failed, got[failed[0]]
+            record(f"pipeline, {n} procs", secs, sum(got.values()))
+            check(run_dir)
+
+    print(f"{args.symbols} symbols x {args.days} days of {args.interval}, {cpus} CPUs, latency {args.latency}s")
+    print(f"  {'run':<22} {'seconds':>9} {'rows/s':>12} {'speedup':>8}")
+    base = results[0]["seconds"]
+    for r in results:
+        print(f"  {r['run']:<22} {r['seconds']:>9.3f} {r['rows_per_s']:>12} {base / r['seconds']:>7.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"args": vars(args), "cpus": cpus, "results": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Startup time and import footprint of the CLI.
+
+Run:
+    python benchmarks/bench_startup.py            # 10 runs per case
+    python benchmarks/bench_startup.py --runs 30 --json startup.json
+
+Notes (written content):
+- Every case runs in a fresh interpreter; the table shows the median wall time
+  and the child's peak RSS (ru_maxrss).
+- "import cli" is what every cron tick pays before doing any work; "import
+  pandas" is shown for scale. The CLI case fetches one day of 1m bars from the
+  local mock API (benchmarks/mock_server.py) and reports whether pandas was
+  loaded at any point of the run.
+- The heaviest imports by cumulative time come from python -X importtime.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockFuturesAPI  # noqa: E402
+
+PROBE = (
+    "import resource, sys, runpy\n"
+    "sys.argv = {argv!r}\n"
+    "{body}\n"
+    "peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss\n"
+    "peak = peak / 1048576 if sys.platform == 'darwin' else peak / 1024\n"
+    "print('PROBE', peak, 'pandas' in sys.modules, file=sys.stderr)\n"
+)
+
+
+def run_case(body: str, argv: List[str], runs: int) -> Dict[str, Any]:
+    code = PROBE.format(argv=argv, body=body)
+    times, peaks, pandas_loaded = [], [], False
+    for _ in range(runs):
+        t = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - t)
+        probe = [ln for ln in proc.stderr.splitlines() if ln.startswith("PROBE")][-1].split()
+        peaks.append(float(probe[1]))
+        pandas_loaded = pandas_loaded or probe[2] == "True"
+    return {
+        "median_s": round(statistics.median(times), 4),
+        "peak_rss_mb": round(max(peaks), 1),
+        "pandas_loaded": pandas_loaded,
+    }
+
+
+def heaviest_imports(module: str, top: int) -> List[Dict[str, Any]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            name = parts[2].strip()
+            if "." not in name or name.startswith("binance_ohlcv_extractor"):
+                rows.append({"module": name, "cumulative_ms": int(parts[1]) / 1000})
+    rows.sort(key=lambda r: -r["cumulative_ms"])
+    return rows[:top]
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Measure CLI startup time and import footprint")
+    p.add_argument("--runs", type=int, default=10)
+    p.add_argument("--top", type=int, default=8, help="Heaviest imports to list")
+    p.add_argument("--json", help="Write the results to this file")
+    args = p.parse_args()
+
+    results: Dict[str, Any] = {}
+    results["python -c pass"] = run_case("pass", ["-c"], args.runs)
+    results["import pandas"] = run_case("import pandas", ["-c"], args.runs)
+    results["import cli"] = run_case("import binance_ohlcv_extractor.cli", ["-c"], args.runs)
+    with MockFuturesAPI() as api, tempfile.TemporaryDirectory() as out:
+        argv = [
+            "binance-ohlcv", "--symbols", "BTCUSDT", "--start", "2021-01-01", "--end", "2021-01-01",
+            "--interval", "1m", "--out", out, "--base-url", api.url,
+        ]
+        body = "import contextlib, io\nwith contextlib.redirect_stdout(io.StringIO()):\n" \
+               "    runpy.run_module('binance_ohlcv_extractor.cli', run_name='__main__')"
+        results["CLI, 1 day of 1m (csv)"] = run_case(body, argv, args.runs)
+    imports = heaviest_imports("binance_ohlcv_extractor.cli", args.top)
+
+    print(f"  {'case':<26} {'median s':>9} {'peak RSS MB':>12} {'pandas':>7}")
+    for name, r in results.items():
+        print(f"  {name:<26} {r['median_s']:>9.3f} {r['peak_rss_mb']:>12} {str(r['pandas_loaded']):>7}")
+    print("  heaviest imports of binance_ohlcv_extractor.cli (cumulative ms):")
+    for r in imports:
+        print(f"    {r['module']:<40} {r['cumulative_ms']:>8.1f}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"runs": args.runs, "results": results, "imports": imports}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Binance USDT-M futures klines endpoint.
+
+Usage:
+    with MockFuturesAPI(latency=0.02, page_size=1000, throttle_every=50) as api:
+        criptodata("BTCUSDT", "2021-01-01", transport=HttpTransport(base_url=api.url))
+
+Notes (written content):
+- Serves GET /fapi/v1/klines with deterministic synthetic bars for any symbol
+  and fixed-length interval, honouring startTime, endTime and limit.
+- latency: seconds slept before every response (per request, on its own thread).
+- page_size: server-side cap on bars per page, below MAX_LIMIT to stress paging.
+- throttle_every: every N-th request gets 429 with Retry-After: retry_after.
+- X-MBX-USED-WEIGHT-1M is reported like the exchange does, per wall-clock minute.
+- GET /fapi/v1/exchangeInfo lists ``listings`` ({symbol: {"status", "onboardDate",
+  "deliveryDate", ...}}); klines are served for any symbol regardless.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from binance_ohlcv_extractor.extractor import INTERVAL_MS
+from binance_ohlcv_extractor.ratelimit import klines_weight
+
+
+def synthetic_klines(interval: str, start_ms: int, end_ms: int, limit: int) -> list:
+    """Bars for every interval slot in [start_ms, end_ms], at most ``limit`` of them."""
+    step = INTERVAL_MS[interval]
+    first = -(-start_ms // step) * step
+    rows = []
+    for t in range(first, end_ms + 1, step):
+        if len(rows) == limit:
+            break
+        base = 20_000 + (t // step) % 997
+        rows.append(
+            [t, f"{base:.2f}", f"{base + 7.5:.2f}", f"{base - 6.25:.2f}", f"{base + 1.1:.2f}", f"{(t // step) % 89 + 0.123:.3f}",
+             t + step - 1, "1000.00000", 42, "1.000", "20000.00", "0"]
+        )
+    return rows
+
+
+class MockFuturesAPI:
+    """Threaded HTTP server on 127.0.0.1 with an ephemeral port."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        page_size: int = 1000,
+        throttle_every: int = 0,
+        retry_after: float = 0.0,
+        listings: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        self.latency = latency
+        self.page_size = page_size
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.listings = listings or {}
+        self.stats: Dict[str, int] = {"requests": 0, "throttled": 0, "bars": 0, "bytes": 0}
+        self._lock = threading.Lock()
+        self._minute = -1
+        self._used_weight = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> Any:
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                url = urlparse(self.path)
+                q = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if url.path == "/fapi/v1/exchangeInfo":
+                    symbols = [{"symbol": s, **fields} for s, fields in api.listings.items()]
+                    self._send(200, json.dumps({"symbols": symbols}).encode(), {})
+                    return
+                if url.path != "/fapi/v1/klines":
+                    self._send(404, b'{"code":-1,"msg":"not found"}', {})
+                    return
+                if api.latency:
+                    time.sleep(api.latency)
+                limit = min(int(q.get("limit", 500)), 1500)
+                with api._lock:
+                    api.stats["requests"] += 1
+                    throttled = api.throttle_every and api.stats["requests"] % api.throttle_every == 0
+                    minute = int(time.time() // 60)
+                    if minute != api._minute:
+                        api._minute, api._used_weight = minute, 0
+                    api._used_weight += klines_weight(limit)
+                    used = api._used_weight
+                    if throttled:
+                        api.stats["throttled"] += 1
+                headers = {"X-MBX-USED-WEIGHT-1M": str(used)}
+                if throttled:
+                    headers["Retry-After"] = str(api.retry_after)
+                    self._send(429, b'{"code":-1003,"msg":"Too many requests"}', headers)
+                    return
+                rows = synthetic_klines(
+                    q["interval"], int(q["startTime"]), int(q["endTime"]), min(limit, api.page_size)
+                )
+                body = json.dumps(rows, separators=(",", ":")).encode()
+                with api._lock:
+                    api.stats["bars"] += len(rows)
+                    api.stats["bytes"] += len(body)
+                self._send(200, body, headers)
+
+        return Handler
+
+    def start(self) -> "MockFuturesAPI":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockFuturesAPI":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
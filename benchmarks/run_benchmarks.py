@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark against a local mock of /fapi/v1/klines.
+
+Run:
+    python benchmarks/run_benchmarks.py --days 30 --interval 1m --latency 0.02 --page-workers 4
+    python benchmarks/run_benchmarks.py --json bench_output.json   # keep results for comparison
+
+Notes (written content):
+- Nothing leaves the machine: benchmarks/mock_server.py serves synthetic bars with
+  configurable latency, server-side page size and 429 injection.
+- Phases are timed separately (fetch, parse+filter, write) on the columnar path
+  criptodata(return_df=False) runs (NumPy columns into Sink.write_columns, no
+  pandas), so they add up to the end-to-end runs that follow: criptodata()
+  in-process (with and without RunMetrics, to show the instrumentation
+  overhead) and the CLI in a subprocess.
+- Peak RSS is the process high-water mark (ru_maxrss) after each phase, so it only
+  ever grows; the CLI row reports the child process's own peak.
+- The shared limiter is given a huge budget by default so it measures the
+  extractor, not the exchange cap; pass --weight-limit 2400 to include pacing.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_server import MockFuturesAPI  # noqa: E402
+
+from binance_ohlcv_extractor.extractor import (  # noqa: E402
+    _iter_klines_pages,
+    _parse_klines_columns,
+    _window_ms,
+    criptodata,
+)
+from binance_ohlcv_extractor.metrics import RunMetrics  # noqa: E402
+from binance_ohlcv_extractor.ratelimit import RateLimiter  # noqa: E402
+from binance_ohlcv_extractor.transport import HttpTransport  # noqa: E402
+from binance_ohlcv_extractor.writers import CsvWriter  # noqa: E402
+
+
+def peak_rss_mb(who: int = resource.RUSAGE_SELF) -> float:
+    """ru_maxrss is KiB on Linux and bytes on macOS."""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Benchmark the extractor against a local mock futures API")
+    p.add_argument("--symbols", type=int, default=2, help="Number of synthetic symbols")
+    p.add_argument("--interval", default="1m")
+    p.add_argument("--days", type=int, default=14)
+    p.add_argument("--latency", type=float, default=0.01, help="Mock per-request latency (s)")
+    p.add_argument("--page-size", type=int, default=1000, help="Mock server cap on bars per page")
+    p.add_argument("--throttle-every", type=int, default=0, help="Answer every N-th request with 429")
+    p.add_argument("--workers", type=int, default=2)
+    p.add_argument("--page-workers", type=int, default=4)
+    p.add_argument("--weight-limit", type=int, default=10**9)
+    p.add_argument("--json", help="Write the results to this file")
+    args = p.parse_args()
+
+    end = date(2021, 1, 1) + timedelta(days=args.days - 1)
+    start_str = "2021-01-01"
+    start_ms, end_ms = _window_ms(start_str, end)
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    results: List[Dict[str, Any]] = []
+
+    def record(phase: str, secs: float, pages: int = 0, rows: int = 0, rss: float = 0.0) -> None:
+        results.append(
+            {
+                "phase": phase,
+                "seconds": round(secs, 4),
+                "pages_per_s": round(pages / secs, 1) if pages and secs else None,
+                "rows_per_s": round(rows / secs, 1) if rows and secs else None,
+                "peak_rss_mb": round(rss or peak_rss_mb(), 1),
+            }
+        )
+
+    with MockFuturesAPI(
+        latency=args.latency, page_size=args.page_size, throttle_every=args.throttle_every
+    ) as api, tempfile.TemporaryDirectory() as out, HttpTransport(
+        base_url=api.url, pool_size=max(4, args.workers * args.page_workers)
+    ) as transport:
+        limiter = RateLimiter(weight_limit=args.weight_limit)
+
+        t = time.perf_counter()
+        pages = list(
+            _iter_klines_pages(
+                symbols[0], args.interval, start_ms, end_ms, limiter,
+                page_workers=args.page_workers, transport=transport,
+            )
+        )
+        rows = sum(len(page) for page in pages)
+        record("fetch", time.perf_counter() - t, len(pages), rows)
+
+        # The columnar path criptodata(return_df=False) runs: no pandas, no DataFrames.
+        t = time.perf_counter()
+        chunks = []
+        for page in pages:
+            cols = _parse_klines_columns(page)
+            keep = (cols["open_time"] >= start_ms) & (cols["open_time"] <= end_ms)
+            chunks.append({name: col[keep] for name, col in cols.items()})
+        record("parse+filter", time.perf_counter() - t, len(pages), rows)
+
+        t = time.perf_counter()
+        with CsvWriter().open(os.path.join(out, "phase"), symbols[0], args.interval) as sink:
+            for cols in chunks:
+                sink.write_columns(cols)
+        record("write (csv)", time.perf_counter() - t, len(pages), rows)
+        del pages, chunks
+
+        before = dict(api.stats)
+        t = time.perf_counter()
+        n = criptodata(
+            symbols[0], start_str, end, interval=args.interval, output_dir=os.path.join(out, "e2e"),
+            limiter=limiter, page_workers=args.page_workers, transport=transport, return_df=False,
+        )
+        record("criptodata() end to end", time.perf_counter() - t, api.stats["requests"] - before["requests"], n)
+
+        metrics = RunMetrics()
+        before = dict(api.stats)
+        t = time.perf_counter()
+        n = criptodata(
+            symbols[0], start_str, end, interval=args.interval, output_dir=os.path.join(out, "e2e-metrics"),
+            limiter=limiter, page_workers=args.page_workers, transport=transport, return_df=False, metrics=metrics,
+        )
+        record("  ... with metrics", time.perf_counter() - t, api.stats["requests"] - before["requests"], n)
+
+        before = dict(api.stats)
+        cmd = [
+            sys.executable, "-m", "binance_ohlcv_extractor.cli", "--symbols", *symbols,
+            "--start", start_str, "--end", end.isoformat(), "--interval", args.interval,
+            "--out", os.path.join(out, "cli"), "--base-url", api.url, "--workers", str(args.workers),
+            "--page-workers", str(args.page_workers), "--weight-limit", str(args.weight_limit),
+        ]
+        t = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+        secs = time.perf_counter() - t
+        record(
+            f"CLI, {len(symbols)} symbols",
+            secs,
+            api.stats["requests"] - before["requests"],
+            api.stats["bars"] - before["bars"],
+            rss=peak_rss_mb(resource.RUSAGE_CHILDREN),
+        )
+        server = dict(api.stats)
+
+    print(f"{args.symbols} symbols x {args.days} days of {args.interval}, latency {args.latency}s, "
+          f"page size {args.page_size}, 429 every {args.throttle_every or 'never'}")
+    print(f"  {'phase':<26} {'seconds':>9} {'pages/s':>10} {'rows/s':>12} {'peak RSS MB':>12}")
+    for r in results:
+        print(f"  {r['phase']:<26} {r['seconds']:>9.3f} {r['pages_per_s'] or '-':>10} "
+              f"{r['rows_per_s'] or '-':>12} {r['peak_rss_mb']:>12}")
+    print(f"  mock server: {server}")
+    print(f"  run metrics: {metrics.to_dict()['phases_s']}")
+
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(
+                {"args": vars(args), "results": results, "server": server, "metrics": metrics.to_dict()}, fh, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
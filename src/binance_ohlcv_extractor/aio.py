@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Native asyncio counterparts of the fetcher and criptodata().
+
+This module exposes:
+- acriptodata(symbol, start_date_str, end_date=None, interval="1d", output_dir=".", ...)
+  -> awaitable of what criptodata() returns, with the same arguments.
+- aiter_klines_pages(symbol, interval, start_ts_ms, end_ts_ms, ...) -> async iterator of
+  raw klines pages in open-time order.
+
+Notes (written content):
+- Requests go through an AsyncHttpTransport (aiohttp) and waits through
+  RateLimiter.acquire_async(), so nothing blocks the event loop on the network
+  or on pacing. One RateLimiter can be shared with blocking callers.
+- ``page_workers`` pages per symbol are in flight at once; run many acriptodata()
+  calls with asyncio.gather on one transport for hundreds of concurrent
+  requests on a single thread (pool_size caps open connections).
+- Cancelling the awaiting task cancels the page requests still in flight and
+  aborts the output sinks, as any failed run does: the existing output is left
+  as it was, and the rows written so far stay only in the ``{output}.part``
+  file (CSV and bars) of a full run, or in place when appending.
+- Parsing, page-cache lookups and sink writes are short CPU/disk steps and run
+  on the loop between requests.
+"""
+
+import asyncio
+from collections import deque
+from datetime import date
+from typing import TYPE_CHECKING, Any, AsyncIterator, Deque, Dict, List, Optional, Union
+
+import numpy as np
+
+from .cache import PageCache
+from .extractor import (
+    INTERVAL_MS,
+    KLINES_PATH,
+    MAX_LIMIT,
+    MAX_RETRIES,
+    RETRY_STATUS,
+    TIMEFRAME_DEFAULT,
+    _drop_seen,
+    _Extraction,
+    _iter_archived_columns,
+    _parse_klines_columns,
+    _plan_sources,
+    _plan_windows,
+    _retry_delay,
+)
+from .metrics import NULL_METRICS, RunMetrics
+from .ratelimit import USED_WEIGHT_HEADER, RateLimiter, klines_weight
+from .schema import OHLCV, BarSchema
+from .transport import AsyncHttpTransport
+from .writers import Writer
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .journal import Journal
+    from .metadata import SymbolMetadata
+
+DEFAULT_PAGE_WORKERS = 8
+
+
+async def _afetch_page(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: Any,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> List[list]:
+    """Async _fetch_page: one page with the same pacing, retries and caching."""
+    if cache is not None:
+        cached = cache.get(symbol, interval, start_ts_ms, end_ts_ms)
+        if cached is not None:
+            metrics.inc("cache_hits")
+            return cached
+    weight = klines_weight(MAX_LIMIT)
+    attempt = 0
+    loop = asyncio.get_running_loop()
+    while True:
+        with metrics.timer("rate_limit_wait"):
+            await limiter.acquire_async(weight)
+        t = loop.time()
+        resp = await transport.get(
+            KLINES_PATH,
+            params={"symbol": symbol, "interval": interval, "startTime": start_ts_ms, "endTime": end_ts_ms, "limit": MAX_LIMIT},
+        )
+        metrics.observe_latency(loop.time() - t)
+        metrics.inc("requests")
+        metrics.inc("bytes_received", len(resp.content))
+        limiter.observe(resp.headers.get(USED_WEIGHT_HEADER))
+        if resp.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            metrics.inc("retries")
+            limiter.pause(_retry_delay(resp, attempt))
+            attempt += 1
+            continue
+        resp.raise_for_status()
+        data = resp.json()
+        metrics.inc("pages")
+        if cache is not None:
+            cache.put(symbol, interval, start_ts_ms, end_ts_ms, data)
+        return data
+
+
+async def _aiter_range_pages(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: Any,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> AsyncIterator[List[list]]:
+    """Async _iter_range_pages: dependent pages, each starting after the last bar."""
+    step = INTERVAL_MS.get(interval)
+    next_start = start_ts_ms
+    while next_start <= end_ts_ms:
+        data = await _afetch_page(symbol, interval, next_start, end_ts_ms, limiter, transport, cache, metrics)
+        if not data:
+            break
+        yield data
+        if step is None and len(data) < MAX_LIMIT:
+            break
+        next_start = int(data[-1][0]) + (step or 1)
+
+
+async def _afetch_window(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: Any,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> List[list]:
+    pages = [
+        page
+        async for page in _aiter_range_pages(
+            symbol, interval, start_ts_ms, end_ts_ms, limiter, transport, cache, metrics
+        )
+    ]
+    return pages[0] if len(pages) == 1 else [k for page in pages for k in page]
+
+
+async def aiter_klines_pages(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: Optional[RateLimiter] = None,
+    page_workers: int = DEFAULT_PAGE_WORKERS,
+    transport: Optional[Any] = None,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> AsyncIterator[List[list]]:
+    """
+    Yield raw klines pages for [start_ts_ms, end_ts_ms] in open-time order.
+
+    Same contract as _iter_klines_pages, but ``page_workers`` windows are fetched
+    as concurrent tasks on the running loop instead of threads. Without a
+    ``transport`` a private AsyncHttpTransport is opened and closed here.
+    """
+    if limiter is None:
+        limiter = RateLimiter()
+    own_transport = transport is None
+    if transport is None:
+        transport = AsyncHttpTransport()
+
+    last_open_time: Optional[int] = start_ts_ms - 1
+    try:
+        if interval in INTERVAL_MS and (page_workers > 1 or cache is not None):
+            pending: Deque[asyncio.Task] = deque()
+            try:
+                for w in _plan_windows(interval, start_ts_ms, end_ts_ms, aligned=cache is not None):
+                    pending.append(
+                        asyncio.ensure_future(
+                            _afetch_window(symbol, interval, w[0], w[1], limiter, transport, cache, metrics)
+                        )
+                    )
+                    if len(pending) < page_workers:
+                        continue
+                    data = await pending.popleft()
+                    for page in _drop_seen(data, last_open_time):
+                        yield page
+                    last_open_time = int(data[-1][0]) if data else last_open_time
+                while pending:
+                    data = await pending.popleft()
+                    for page in _drop_seen(data, last_open_time):
+                        yield page
+                    last_open_time = int(data[-1][0]) if data else last_open_time
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+            return
+
+        async for page in _aiter_range_pages(
+            symbol, interval, start_ts_ms, end_ts_ms, limiter, transport, cache, metrics
+        ):
+            yield page
+    finally:
+        if own_transport:
+            await transport.close()
+
+
+async def _aiter_bar_columns(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    archive_dir: Optional[str] = None,
+    metrics: RunMetrics = NULL_METRICS,
+    schema: BarSchema = OHLCV,
+    **fetch_kwargs: Any,
+) -> AsyncIterator[Dict[str, np.ndarray]]:
+    """Async _iter_bar_columns: archived periods read from disk, every other part from REST pages."""
+    for archived, seg_start, seg_end in _plan_sources(symbol, interval, start_ts_ms, end_ts_ms, archive_dir):
+        if archived:
+            assert archive_dir is not None
+            for cols in _iter_archived_columns(symbol, interval, seg_start, seg_end, archive_dir, metrics, schema):
+                yield cols
+            continue
+        pages = aiter_klines_pages(symbol, interval, seg_start, seg_end, metrics=metrics, **fetch_kwargs)
+        try:
+            async for page in pages:
+                with metrics.timer("parse"):
+                    cols = _parse_klines_columns(page, schema)
+                metrics.inc("rows_parsed", len(cols["open_time"]))
+                yield cols
+        finally:
+            await pages.aclose()
+
+
+async def acriptodata(
+    symbol: str,
+    start_date_str: str,
+    end_date: Optional[date] = None,
+    interval: str = TIMEFRAME_DEFAULT,
+    output_dir: str = ".",
+    limiter: Optional[RateLimiter] = None,
+    page_workers: int = DEFAULT_PAGE_WORKERS,
+    transport: Optional[Any] = None,
+    incremental: bool = False,
+    cache: Optional[PageCache] = None,
+    writer: Optional[Writer] = None,
+    return_df: bool = True,
+    archive_dir: Optional[str] = None,
+    resample_to: Optional[List[str]] = None,
+    metrics: Optional[RunMetrics] = None,
+    schema: Optional[BarSchema] = None,
+    metadata: Optional["SymbolMetadata"] = None,
+    journal: Optional["Journal"] = None,
+) -> Union["pd.DataFrame", int]:
+    """
+    criptodata() on the running event loop.
+
+    Arguments and result are those of criptodata(); ``transport`` is an
+    AsyncHttpTransport (one is opened per call when omitted) and ``page_workers``
+    defaults to DEFAULT_PAGE_WORKERS concurrent pages. A ``journal`` is
+    checkpointed and resumed as there (its fsyncs run on the loop), and the
+    caller closes it.
+    """
+    run = _Extraction(
+        symbol, start_date_str, end_date, interval, output_dir, incremental, writer, return_df, resample_to, metrics,
+        schema, metadata, journal,
+    )
+    if run.up_to_date:
+        return run.result()
+    chunks = _aiter_bar_columns(
+        symbol,
+        interval,
+        run.start_ms,
+        run.end_ms,
+        archive_dir=archive_dir,
+        metrics=run.metrics,
+        schema=run.schema,
+        limiter=limiter,
+        page_workers=page_workers,
+        transport=transport,
+        cache=cache,
+    )
+    run.open()
+    ok = False
+    try:
+        async for cols in chunks:
+            run.feed(cols)
+        run.finish()
+        ok = True
+    finally:
+        await chunks.aclose()
+        run.close(ok)
+    return run.result()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped range reads over the binary bar store written by BarWriter.
+
+This module exposes:
+- BarStore(root="."): keeps one read-only memory map per {symbol}_{interval}.bars
+  file under ``root`` and answers read_range() from it.
+- read_range(symbol, interval, start, end, root=".") -> structured NumPy array of the
+  file's record layout (BAR_DTYPE by default) for the bars with start <= open_time <= end.
+
+Notes (written content):
+- Records are fixed width and sorted by open_time, so a range is two binary
+  searches on the mapped open_time column and the result is a slice of the map:
+  no parsing and no copy, only the touched pages are read from disk.
+- Returned arrays are read-only views; fields are columns, e.g. bars["close"].
+  A full rewrite replaces the file, so views taken earlier keep the old bars.
+- A BarStore notices appends and rewrites (size or inode changed) and remaps on the next read; reuse
+  one instance across calls, mapping a file costs far more than a range read.
+"""
+
+import os
+from datetime import date, datetime, timezone
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from .writers import BAR_DTYPE, BarWriter, read_bar_file
+
+TimeLike = Union[int, date, datetime]
+
+
+def _as_ms(value: TimeLike) -> int:
+    """Milliseconds since epoch; naive datetimes and dates are taken as UTC."""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    if isinstance(value, date):
+        return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp() * 1000)
+    return int(value)
+
+
+class BarStore:
+    """Read-only access to the .bars files of one output directory."""
+
+    def __init__(self, root: str = ".") -> None:
+        self.root = root
+        self._writer = BarWriter()
+        self._maps: Dict[Tuple[str, str], Tuple[Tuple[int, int], np.ndarray, np.ndarray]] = {}
+
+    def _mapped(self, symbol: str, interval: str) -> Tuple[np.ndarray, np.ndarray]:
+        path = self._writer.path(self.root, symbol, interval)
+        try:
+            st = os.stat(path)
+        except OSError:
+            empty = np.empty(0, dtype=BAR_DTYPE)
+            return empty, empty["open_time"]
+        cached = self._maps.get((symbol, interval))
+        version = (st.st_size, st.st_ino)
+        if cached is None or cached[0] != version:
+            bars = read_bar_file(path)
+            assert bars is not None
+            # Plain strided ndarray over the mapped column: searchsorted without copying it.
+            cached = (version, bars, bars["open_time"].view(np.ndarray))
+            self._maps[(symbol, interval)] = cached
+        return cached[1], cached[2]
+
+    def bars(self, symbol: str, interval: str) -> np.ndarray:
+        """All stored bars of symbol/interval (empty if none), mapped once per file version."""
+        return self._mapped(symbol, interval)[0]
+
+    def read_range(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> np.ndarray:
+        """Bars with start <= open_time <= end as a zero-copy view (O(log n) lookup)."""
+        bars, times = self._mapped(symbol, interval)
+        lo = int(np.searchsorted(times, _as_ms(start), side="left"))
+        hi = int(np.searchsorted(times, _as_ms(end), side="right"))
+        return bars[lo:hi]
+
+    def close(self) -> None:
+        self._maps.clear()
+
+
+_stores: Dict[str, BarStore] = {}
+
+
+def read_range(
+    symbol: str, interval: str, start: TimeLike, end: TimeLike, root: Optional[str] = None
+) -> np.ndarray:
+    """
+    Bars of ``symbol``/``interval`` stored under ``root`` with start <= open_time <= end.
+
+    ``start`` and ``end`` are epoch milliseconds or (UTC) dates/datetimes. Maps are
+    kept per root between calls; see BarStore for explicit control.
+    """
+    root = root or "."
+    store = _stores.get(root)
+    if store is None:
+        store = _stores.setdefault(root, BarStore(root))
+    return store.read_range(symbol, interval, start, end)
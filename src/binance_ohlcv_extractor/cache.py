@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of raw klines pages.
+
+This module exposes:
+- PageCache(directory, max_bytes=512 MiB): get()/put() raw pages keyed by
+  (symbol, interval, startTime), evicting least recently used files over the cap.
+
+Notes (written content):
+- Closed klines never change, so a page is stored only once every bar in it has
+  closed and no later bar can still join it (see PageCache.put).
+- One file per page, written to a temp name and renamed, so concurrent readers
+  never see a partial file. The LRU order is kept in memory: loaded once from
+  the file mtimes when the cache is opened, then updated by get() and put()
+  (which also touch the mtime, so the next run starts from the same order).
+  Eviction drops the oldest pages without rescanning the directory.
+- Pages are keyed by their startTime, so with a cache the fetchers request
+  fixed-length intervals on the grid of extractor._plan_windows(aligned=True):
+  a range overlapping earlier ones asks for the same pages and reads them here.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class PageCache:
+    """LRU-bounded directory of raw klines pages."""
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024, page_limit: int = 1000) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.page_limit = page_limit
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        found = []
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(directory, name))
+                found.append((st.st_mtime, name, st.st_size))
+        # page name -> size, least recently used first
+        self._sizes: "OrderedDict[str, int]" = OrderedDict((name, size) for _, name, size in sorted(found))
+        self._total = sum(self._sizes.values())
+
+    @staticmethod
+    def _name(symbol: str, interval: str, start_ms: int) -> str:
+        return f"{symbol}_{interval}_{start_ms}.json"
+
+    def get(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> Optional[List[list]]:
+        """
+        Return the cached page for a request, or None on a miss.
+
+        A stored page answers any request with the same start whose end it
+        covers; a full page answers every such request, since the exchange
+        would return the same MAX_LIMIT bars regardless of the end.
+        """
+        name = self._name(symbol, interval, start_ms)
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as fh:
+                entry = json.loads(fh.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            if name in self._sizes:
+                self._sizes.move_to_end(name)
+        klines = entry["klines"]
+        if entry["end"] < end_ms and len(klines) < self.page_limit:
+            return None
+        return [k for k in klines if k[0] <= end_ms]
+
+    def put(
+        self, symbol: str, interval: str, start_ms: int, end_ms: int, klines: List[list], now_ms: Optional[int] = None
+    ) -> bool:
+        """
+        Store a page if its window is fully closed; return whether it was stored.
+
+        The last bar must have closed, and either the page is full or the
+        requested window ended in the past (so no newer bar can appear in it).
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+        if not klines or int(klines[-1][6]) >= now_ms:
+            return False
+        if len(klines) < self.page_limit and end_ms >= now_ms:
+            return False
+
+        name = self._name(symbol, interval, start_ms)
+        payload = json.dumps({"end": end_ms, "klines": klines}, separators=(",", ":")).encode()
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, os.path.join(self.directory, name))
+        with self._lock:
+            self._total += len(payload) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(payload)
+            self._evict()
+        return True
+
+    def _evict(self) -> None:
+        """Drop least recently used pages until the cache fits in max_bytes (lock held)."""
+        while self._total > self.max_bytes and self._sizes:
+            name, size = self._sizes.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
@@ -4,44 +4,425 @@ CLI entrypoint for the Binance USDT-M OHLCV extractor.
 
 Usage example:
   python -m binance_ohlcv_extractor.cli --symbols BTCUSDT ETHUSDT --start 2021-01-01 --interval 1d --out ./binance_futures_csvs
+  python -m binance_ohlcv_extractor.cli --symbols BTCUSDT ETHUSDT SOLUSDT --start 2021-01-01 --workers 8
 
 Notes (written content):
 - This module is a thin wrapper around extractor.criptodata().
 - It normalizes CLI input and prints user-facing progress messages.
+- Symbols are independent, so --workers N runs them on a thread pool; all workers
+  share one RateLimiter so the combined request weight stays within --weight-limit.
+- --page-workers N additionally fetches the pages of each symbol concurrently.
+- --incremental appends only bars newer than the last row of each existing CSV.
+- Runs keep a checkpoint journal in --out (see journal.py) and write each output
+  through a .part file renamed on success; after a crash or Ctrl-C, the same
+  command with --resume continues every symbol from its last checkpoint. A run
+  without --resume refuses to start over a journal left behind.
+- --archive-dir loads Binance's monthly/daily zip archives and uses REST only for the periods
+  they do not cover; --archive-mirror downloads missing months into it beforehand.
+- --resample 5m 1h 1d derives higher intervals locally from one --interval fetch.
+- --repair diffs stored output against the expected bar grid and fetches only the holes.
+- --metadata PATH caches exchangeInfo (onboard date, status, delivery date) for --metadata-ttl
+  seconds; ranges are cut to each contract's lifetime and dead symbols fail before any request.
+- --cache-dir keeps closed pages on disk so re-runs and overlapping ranges skip the network.
+- --format parquet writes a partitioned symbol/interval/month Parquet dataset instead of CSVs;
+  --format bars writes memory-mappable {symbol}_{interval}.bars files (see barstore.read_range).
+- --compression gzip|zstd streams CSVs into {symbol}.csv.gz / .csv.zst (--compress-level,
+  --compress-threads); zstd needs the zstd extra (see csvio.py).
+- --schema full keeps every kline field (close time, quote volume, trades, taker-buy volumes);
+  --schema compact does so with float32 prices and volumes (see schema.py).
+- --metrics-json / --metrics-prom write a run report (request latency histogram, retries,
+  bytes, rows, per-phase seconds) as JSON or Prometheus text; without them nothing is recorded.
+- All symbols reuse one pooled keep-alive HTTP transport (--pool-size connections).
+- --follow keeps running after the extraction and appends every newly closed bar of all
+  symbols shortly after each interval boundary (one small request per symbol).
+- --manifest jobs.json|yaml runs many (symbol, interval, start, end) jobs: overlapping and
+  adjacent ranges are merged, series run heaviest first; --dry-run prints the plan.
+- --async drives aio.acriptodata() on one event loop: --workers symbols with --page-workers
+  pages each in flight as tasks rather than threads (needs the [async] extra, aiohttp).
+- --processes N parses and writes in N worker processes fed by --workers fetch threads
+  (see pipeline.py), so large multi-symbol backfills use every core.
 - Provenance: generated/edited to include a module docstring on 2025-10-02.
 """
 
 import argparse
-from datetime import date
-from typing import List, Optional
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timezone
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
 
-from .extractor import criptodata
+from .archives import DATA_VISION_URL, download_archives
+from .cache import PageCache
+from .csvio import COMPRESSIONS
+from .extractor import INTERVAL_MS, criptodata
+from .follow import Follower
+from .gaps import backfill_gaps
+from .journal import JOURNAL_NAME, Journal
+from .metadata import DEFAULT_TTL, SymbolMetadata
+from .metrics import RunMetrics
+from .planner import Series, load_manifest, plan_jobs, run_plan
+from .ratelimit import WEIGHT_LIMIT_1M, RateLimiter
+from .schema import SCHEMAS, get_schema
+from .transport import DEFAULT_BASE_URL, AsyncHttpTransport, HttpTransport
+from .writers import WRITERS, CsvWriter, Writer, get_writer
+
+
+def _report(done: int, total: int, symbol: str, result: Any, unit: str, failed: List[str]) -> None:
+    if isinstance(result, Exception):
+        failed.append(symbol)
+        print(f"  [{done}/{total}] Error for {symbol}: {result}")
+    else:
+        print(f"  [{done}/{total}] -> {symbol}: {result} {unit}")
+
+
+async def _extract_async(
+    symbols: List[str], workers: int, base_url: str, pool_size: int, failed: List[str], **kwargs: Any
+) -> None:
+    """Run acriptodata() for every symbol on one event loop, ``workers`` symbols at a time."""
+    import asyncio
+
+    from .aio import acriptodata
+
+    gate = asyncio.Semaphore(workers)
+    async with AsyncHttpTransport(base_url=base_url, pool_size=pool_size) as transport:
+
+        async def one(symbol: str) -> Tuple[str, Any]:
+            async with gate:
+                try:
+                    return symbol, await acriptodata(symbol, transport=transport, **kwargs)
+                except Exception as e:
+                    return symbol, e
+
+        for done, fut in enumerate(asyncio.as_completed([one(s) for s in symbols]), start=1):
+            symbol, result = await fut
+            _report(done, len(symbols), symbol, result, "rows", failed)
+
+
+def _run_manifest(
+    args: argparse.Namespace,
+    writer: Writer,
+    limiter: RateLimiter,
+    cache: Optional[PageCache],
+    pool_size: int,
+    metrics: Optional[RunMetrics],
+    metadata: Optional[SymbolMetadata],
+) -> None:
+    """Plan the manifest's jobs, print the plan and (unless --dry-run) execute it."""
+    plan = plan_jobs(load_manifest(args.manifest), weight_limit=args.weight_limit, metadata=metadata)
+    print(
+        f"Manifest: {plan.requested} jobs -> {len(plan.series)} series, ~{plan.total_weight} weight, "
+        f"ETA >= {plan.eta_seconds:.0f}s at {args.weight_limit} weight/min"
+    )
+    for job, reason in plan.skipped:
+        print(f"  skipped {job.symbol} {job.interval} {job.start.isoformat()}..{job.end.isoformat()}: {reason}")
+    if args.dry_run:
+        for s in plan.series:
+            ranges = ", ".join(f"{a.isoformat()}..{b.isoformat()}" for a, b in s.ranges)
+            print(f"  {s.symbol} {s.interval}: {s.pages} pages, weight {s.weight} ({ranges})")
+        return
+
+    total = len(plan.series)
+    failed: List[str] = []
+    done = 0
+
+    def report(series: Series, result: Any) -> None:
+        nonlocal done
+        done += 1
+        _report(done, total, f"{series.symbol} {series.interval}", result, "rows", failed)
+
+    kwargs: Dict[str, Any] = dict(
+        page_workers=args.page_workers, cache=cache, archive_dir=args.archive_dir, schema=get_schema(args.schema)
+    )
+    if metrics is not None:
+        kwargs["metrics"] = metrics
+    with HttpTransport(base_url=args.base_url, pool_size=pool_size) as transport:
+        run_plan(
+            plan, args.out, workers=args.workers, writer=writer, limiter=limiter, transport=transport,
+            on_done=report, **kwargs,
+        )
+    if failed:
+        print(f"{len(failed)} of {total} series failed: {', '.join(sorted(failed))}")
+    if metrics is not None:
+        _write_metrics(args, metrics, total, len(failed))
+    print("Data extraction finished :)")
+
+
+def _write_metrics(args: argparse.Namespace, metrics: RunMetrics, total: int, failed: int) -> None:
+    metrics.inc("symbols", total)
+    metrics.inc("symbols_failed", failed)
+    if args.metrics_json:
+        metrics.to_json(args.metrics_json)
+    if args.metrics_prom:
+        metrics.to_prometheus(args.metrics_prom)
 
 
 def main() -> None:
-    p = argparse.ArgumentParser(description="Binance USDT-M OHLCV extractor (CSV per symbol)")
+    p = argparse.ArgumentParser(description="Binance USDT-M OHLCV extractor (CSV or Parquet per symbol)")
 
-    p.add_argument("--symbols", nargs="+", required=True, help="Symbols, e.g. BTCUSDT ETHUSDT")
-    p.add_argument("--start", required=True, help="Start date YYYY-MM-DD")
+    p.add_argument("--symbols", nargs="+", help="Symbols, e.g. BTCUSDT ETHUSDT")
+    p.add_argument("--start", help="Start date YYYY-MM-DD")
     p.add_argument("--end", help="End date YYYY-MM-DD (defaults to yesterday)")
     p.add_argument("--interval", default="1d", help="Kline interval, e.g. 1m 5m 1h 4h 1d")
     p.add_argument("--out", default="./binance_futures_csvs", help="Output directory")
+    p.add_argument(
+        "--format", choices=sorted(WRITERS), default="csv", help="Output backend (parquet needs pyarrow)"
+    )
+    p.add_argument(
+        "--compression",
+        choices=sorted(COMPRESSIONS),
+        help="Compress CSV output as it is written (zstd needs zstandard)",
+    )
+    p.add_argument("--compress-level", type=int, help="Compression level (default: gzip 6, zstd 3)")
+    p.add_argument("--compress-threads", type=int, default=1, help="Threads compressing CSV output (default: 1)")
+    p.add_argument(
+        "--schema",
+        choices=list(SCHEMAS),
+        default="ohlcv",
+        help="Fields and dtypes to keep: OHLCV (default), every kline field, or every field with float32 values",
+    )
     p.add_argument("--force-requests", action="store_true", help="Bypass connector and use REST")
+    p.add_argument(
+        "--incremental", action="store_true", help="Only fetch bars newer than each existing CSV and append them"
+    )
+    p.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from the checkpoint journal in --out instead of starting over",
+    )
+    p.add_argument(
+        "--resample",
+        nargs="+",
+        metavar="INTERVAL",
+        help="Also write these higher intervals, aggregated locally from the --interval bars",
+    )
+    p.add_argument(
+        "--repair", action="store_true", help="Find missing bars in existing output and fetch only those"
+    )
+    p.add_argument("--archive-dir", help="Directory of Binance monthly/daily klines .zip archives to load first")
+    p.add_argument(
+        "--archive-mirror",
+        nargs="?",
+        const=DATA_VISION_URL,
+        help=f"Download missing monthly archives into --archive-dir first (default mirror {DATA_VISION_URL})",
+    )
+    p.add_argument("--metadata", metavar="PATH", help="exchangeInfo cache file; clamps ranges to contract lifetimes")
+    p.add_argument(
+        "--metadata-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help=f"Seconds before --metadata is refetched (default {DEFAULT_TTL:g})",
+    )
+    p.add_argument("--cache-dir", help="Directory for the on-disk cache of closed klines pages")
+    p.add_argument("--cache-max-mb", type=int, default=512, help="Page cache size cap in MiB (default 512)")
+    p.add_argument("--workers", type=int, default=1, help="Symbols fetched concurrently (default 1)")
+    p.add_argument(
+        "--page-workers", type=int, default=1, help="Pages of one symbol fetched concurrently (default 1)"
+    )
+    p.add_argument(
+        "--pool-size", type=int, help="Pooled HTTP connections (default: workers x page-workers, min 4)"
+    )
+    p.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"REST base URL (default {DEFAULT_BASE_URL})")
+    p.add_argument(
+        "--weight-limit",
+        type=int,
+        default=WEIGHT_LIMIT_1M,
+        help=f"Request weight per minute shared by all workers (default {WEIGHT_LIMIT_1M})",
+    )
+    p.add_argument(
+        "--manifest",
+        metavar="PATH",
+        help="JSON/YAML list of (symbol, interval, start, end) jobs; replaces --symbols/--start/--end/--interval",
+    )
+    p.add_argument("--dry-run", action="store_true", help="With --manifest, print the plan and exit")
+    p.add_argument(
+        "--follow",
+        action="store_true",
+        help="After the initial extraction keep running and append each newly closed bar (Ctrl-C stops)",
+    )
+    p.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="Fetch on one asyncio event loop instead of threads (needs aiohttp)",
+    )
+    p.add_argument(
+        "--processes",
+        type=int,
+        help="Parse and write in this many worker processes, fed raw pages by --workers fetch threads",
+    )
+    p.add_argument("--metrics-json", metavar="PATH", help="Write a JSON run report with counters and timings")
+    p.add_argument("--metrics-prom", metavar="PATH", help="Write run metrics in Prometheus text format")
     args = p.parse_args()
+    if args.manifest:
+        if args.symbols or args.start or args.end:
+            p.error("--manifest replaces --symbols, --start and --end")
+        if args.repair or args.incremental or args.resample or args.follow or args.use_async or args.processes:
+            p.error(
+                "--manifest cannot be combined with --repair, --incremental, --resample, --follow, --async "
+                "or --processes"
+            )
+    elif not (args.symbols and args.start):
+        p.error("--symbols and --start are required (or use --manifest)")
+    elif args.dry_run:
+        p.error("--dry-run requires --manifest")
+    if args.symbols:
+        args.symbols = list(dict.fromkeys(args.symbols))  # one task (and one output file) per symbol
+    if args.workers < 1:
+        p.error("--workers must be >= 1")
+    if args.page_workers < 1:
+        p.error("--page-workers must be >= 1")
+    if args.repair and args.incremental:
+        p.error("--repair and --incremental are mutually exclusive")
+    if args.resample and (args.repair or args.incremental):
+        p.error("--resample cannot be combined with --repair or --incremental")
+    if args.follow and (args.repair or args.resample or args.end):
+        p.error("--follow cannot be combined with --repair, --resample or --end")
+    if args.follow and args.interval not in INTERVAL_MS:
+        p.error(f"--follow needs a fixed-length interval, got {args.interval}")
+    if args.resume and (args.manifest or args.repair or args.resample or args.use_async or args.processes):
+        p.error("--resume cannot be combined with --manifest, --repair, --resample, --async or --processes")
+    journal_path = os.path.join(args.out, JOURNAL_NAME)
+    journaled = not (args.manifest or args.repair or args.resample or args.use_async or args.processes)
+    if journaled and not args.resume and os.path.exists(journal_path):
+        p.error(f"{journal_path} holds an interrupted run; pass --resume to continue it, or delete it to start over")
+    if args.use_async and args.repair:
+        p.error("--async cannot be combined with --repair")
+    if args.processes is not None:
+        if args.processes < 1:
+            p.error("--processes must be >= 1")
+        if args.use_async or args.repair or args.resample or args.archive_dir or args.page_workers > 1:
+            p.error(
+                "--processes cannot be combined with --async, --repair, --resample, --archive-dir or --page-workers"
+            )
+    if args.archive_mirror and not args.archive_dir:
+        p.error("--archive-mirror requires --archive-dir")
+    if args.pool_size is not None and args.pool_size < 1:
+        p.error("--pool-size must be >= 1")
+    if args.weight_limit <= 0:
+        p.error("--weight-limit must be > 0")
+    if args.compression and args.format != "csv":
+        p.error("--compression requires --format csv")
+    if args.compress_threads < 1:
+        p.error("--compress-threads must be >= 1")
 
     end_d: Optional[date] = None
     if args.end:
         y, m, d = [int(x) for x in args.end.split("-")]
         end_d = date(y, m, d)
 
+    limiter = RateLimiter(weight_limit=args.weight_limit)
+    writer = get_writer(args.format)
+    if args.compression:
+        writer = CsvWriter(args.compression, args.compress_level, args.compress_threads)
+    cache = PageCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache_dir else None
+    pool_size = args.pool_size or max(4, args.workers * args.page_workers)
+    metrics = RunMetrics() if args.metrics_json or args.metrics_prom else None
+    metadata = None
+    if args.metadata:
+        metadata = SymbolMetadata(args.metadata, ttl=args.metadata_ttl, limiter=limiter, base_url=args.base_url)
+    if args.manifest:
+        _run_manifest(args, writer, limiter, cache, pool_size, metrics, metadata)
+        return
+    total = len(args.symbols)
+    failed: List[str] = []
+
     print(f"Starting extraction for: {', '.join(args.symbols)}")
-    for s in args.symbols:
-        try:
-            df = criptodata(s, start_date_str=args.start, end_date=end_d, interval=args.interval, output_dir=args.out)
-            print(f"  -> {s}: {len(df)} rows")
-        except Exception as e:
-            print(f"Error for {s}: {e}")
+    if args.archive_mirror:
+        start_ms = int(datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000)
+        end_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+        with HttpTransport(base_url=args.archive_mirror) as mirror:
+            for s in args.symbols:
+                try:
+                    got = download_archives(args.archive_dir, s, args.interval, start_ms, end_ms, transport=mirror)
+                    print(f"  {s}: downloaded {len(got)} monthly archives")
+                except Exception as e:
+                    print(f"  {s}: archive download failed: {e}")
+
+    common = dict(
+        start_date_str=args.start,
+        end_date=end_d,
+        interval=args.interval,
+        output_dir=args.out,
+        writer=writer,
+        limiter=limiter,
+        cache=cache,
+        schema=get_schema(args.schema),
+    )
+    if metrics is not None:
+        common["metrics"] = metrics
+    extract = dict(
+        page_workers=args.page_workers,
+        incremental=args.incremental,
+        return_df=False,
+        archive_dir=args.archive_dir,
+        resample_to=args.resample,
+        metadata=metadata,
+    )
+    if args.processes:
+        from .pipeline import run_pipeline  # multiprocessing only when asked for
+
+        done = 0
+
+        def report(symbol: str, result: Any) -> None:
+            nonlocal done
+            done += 1
+            _report(done, total, symbol, result, "rows", failed)
+
+        with HttpTransport(base_url=args.base_url, pool_size=pool_size) as transport:
+            run_pipeline(
+                args.symbols, io_workers=args.workers, processes=args.processes, incremental=args.incremental,
+                transport=transport, on_done=report, metadata=metadata, **common,
+            )
+    elif args.use_async:
+        import asyncio
+
+        asyncio.run(_extract_async(args.symbols, args.workers, args.base_url, pool_size, failed, **extract, **common))
+    else:
+        journal = Journal(journal_path, resume=args.resume) if journaled else None
+        with HttpTransport(base_url=args.base_url, pool_size=pool_size) as transport, ThreadPoolExecutor(
+            max_workers=min(args.workers, total)
+        ) as pool:
+            if args.repair:
+                task, unit = partial(backfill_gaps, transport=transport, **common), "missing bars filled"
+            else:
+                task, unit = partial(criptodata, transport=transport, journal=journal, **extract, **common), "rows"
+            futures = {pool.submit(task, s): s for s in args.symbols}
+            try:
+                for done, fut in enumerate(as_completed(futures), start=1):
+                    s = futures[fut]
+                    try:
+                        _report(done, total, s, fut.result(), unit, failed)
+                    except Exception as e:
+                        _report(done, total, s, e, unit, failed)
+            except KeyboardInterrupt:
+                for fut in futures:
+                    fut.cancel()
+                if journal is not None:
+                    print(f"Interrupted; rerun with --resume to continue from {journal.path}")
+                raise
+        if journal is not None:
+            if failed:
+                journal.close()
+                print(f"Progress kept in {journal.path}; rerun with --resume to continue")
+            else:
+                journal.discard()
 
+    if failed:
+        print(f"{len(failed)} of {total} symbols failed: {', '.join(sorted(failed))}")
+    following = [s for s in args.symbols if s not in failed]
+    if args.follow and following:
+        print(f"Following {', '.join(following)} ({args.interval} bars); Ctrl-C to stop")
+        with HttpTransport(base_url=args.base_url, pool_size=max(4, len(following))) as transport:
+            follower = Follower(
+                following, args.interval, args.out, writer=writer, limiter=limiter, transport=transport, metrics=metrics,
+                schema=get_schema(args.schema),
+            )
+            try:
+                follower.run()
+            except KeyboardInterrupt:
+                pass
+    if metrics is not None:
+        _write_metrics(args, metrics, total, len(failed))
     print("Data extraction finished :)")
 
 
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Fast CSV row formatting and compressed output streams for CsvWriter.
+
+This module exposes:
+- format_csv_rows(cols) -> bytes of CSV rows for NumPy columns, formatted in
+  vectorized blocks, or None when a value needs the exact fallback.
+- COMPRESSIONS: compression name -> file suffix ("gzip" -> ".gz", "zstd" -> ".zst").
+- open_stream(fh, compression=None, level=None, threads=1) -> stream with write(),
+  checkpoint() and close() over a binary file.
+- open_reader(path) -> binary reader of a plain or compressed CSV.
+
+Notes (written content):
+- Rows are byte for byte what DataFrame.to_csv(float_format="%.8f") writes:
+  "YYYY-MM-DD HH:MM:SS+00:00", %.8f floats, %d integers, os.linesep endings.
+  Digits are looked up four at a time from a table, dates are computed from
+  day numbers with integer arithmetic, and a block of rows is assembled in one
+  byte matrix (padding bytes are then dropped), instead of one Python format
+  call per value.
+- A float is split into its integer part and fraction (both exact), and the
+  fraction is scaled by 1e8 with an error-free product (Dekker), so it is
+  rounded on its exact value, ties to even, like Python's correctly rounded
+  "%.8f". Non-finite values, |x| >= 9e18 and sub-second or pre-1970 open times make the
+  block fall back (None), so callers use the per-value path.
+- gzip output is a series of gzip members and zstd output a series of zstd
+  frames; readers (gzip, zstd, pandas.read_csv) treat both as one stream.
+  checkpoint() ends the current member or frame and fsyncs, so a file cut at a
+  checkpointed size is still valid and appending (incremental runs, resume)
+  adds members or frames after it.
+- threads > 1 compresses blocks of CHUNK_BYTES in a thread pool (gzip members,
+  zlib releases the GIL) or with zstd's own worker threads, while the caller
+  formats the next rows.
+- zstd needs the zstandard package (pip install "binance-ohlcv-extractor[zstd]"),
+  imported only when zstd output is requested; gzip is in the standard library.
+"""
+
+import functools
+import gzip
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+COMPRESSIONS: Dict[str, str] = {"gzip": ".gz", "zstd": ".zst"}
+BLOCK_ROWS = 65_536
+CHUNK_BYTES = 1024 * 1024
+_LINESEP = np.frombuffer(os.linesep.encode(), dtype=np.uint8)
+_MAX_ABS = 9e18  # integer parts must fit in int64
+_MAX_TIME_MS = 253_402_300_799_000  # 9999-12-31 23:59:59
+_SPLIT = 134_217_729.0  # 2**27 + 1: Veltkamp split into two 26-bit halves
+# ASCII of 0000..9999, four bytes packed per uint32 so a lookup is one gather.
+_QUADS = np.frombuffer("".join(f"{i:04d}" for i in range(10_000)).encode(), dtype=np.uint32)
+
+
+def _const(text: str, n: int) -> np.ndarray:
+    return np.broadcast_to(np.frombuffer(text.encode(), dtype=np.uint8), (n, len(text)))
+
+
+def _fixed_digits(v: np.ndarray, groups: int) -> np.ndarray:
+    """ASCII of non-negative int64 ``v`` zero-padded to 4 * ``groups`` digits, one row per value."""
+    quads = np.empty((len(v), groups), dtype=np.uint32)
+    for k in range(groups - 1, -1, -1):
+        q = v // 10_000
+        quads[:, k] = _QUADS[v - q * 10_000]
+        v = q
+    return quads.view(np.uint8)
+
+
+def _digits(v: np.ndarray) -> np.ndarray:
+    """ASCII digits of non-negative int64 ``v``, right-aligned in a uint8 matrix padded with 0 bytes."""
+    width = len(str(int(v.max()))) if len(v) else 1
+    out = _fixed_digits(v, -(-width // 4))[:, -width:]
+    if width > 1:
+        powers = 10 ** np.arange(width - 1, 0, -1, dtype=np.int64)
+        out[:, :-1][v[:, None] < powers] = 0  # leading zeros; the units digit always stays
+    return out
+
+
+def _sign(negative: np.ndarray) -> List[np.ndarray]:
+    """A "-" column where ``negative``; no column at all when nothing is."""
+    if not negative.any():
+        return []
+    return [np.where(negative, np.uint8(45), np.uint8(0))[:, None]]
+
+
+def _int_field(col: np.ndarray) -> Optional[List[np.ndarray]]:
+    v = col.astype(np.int64)
+    if len(v) and v.min() == np.iinfo(np.int64).min:
+        return None
+    return [*_sign(v < 0), _digits(np.abs(v))]
+
+
+def _round_fraction(f: np.ndarray) -> np.ndarray:
+    """f * 1e8 rounded to the nearest integer on the exact product, ties to even (0 <= f < 1)."""
+    p = f * 1e8
+    rounded = np.rint(p)
+    # p can only sit on the wrong side of a half when it is exactly one.
+    tie = np.flatnonzero(p - np.floor(p) == 0.5)
+    if len(tie):
+        ft, pt = f[tie], p[tie]
+        c = _SPLIT * ft
+        hi = c - (c - ft)
+        err = (hi * 1e8 - pt) + (ft - hi) * 1e8  # exact: pt + err == ft * 1e8 (1e8 needs only 27 bits)
+        rounded[tie] = np.where(err > 0, np.ceil(pt), np.where(err < 0, np.floor(pt), rounded[tie]))
+    return rounded.astype(np.int64)
+
+
+def _float_field(col: np.ndarray) -> Optional[List[np.ndarray]]:
+    x = col.astype(np.float64)
+    a = np.abs(x)
+    if not (a < _MAX_ABS).all():  # also False for nan and inf
+        return None
+    whole = np.trunc(a)
+    fraction = _round_fraction(a - whole)
+    carry = fraction == 100_000_000
+    ints = whole.astype(np.int64) + carry
+    fraction[carry] = 0
+    return [*_sign(np.signbit(x)), _digits(ints), _const(".", len(x)), _fixed_digits(fraction, 2)]
+
+
+def _dates(days: np.ndarray) -> np.ndarray:
+    """"YYYY-MM-DD" of day numbers since the epoch, as S10."""
+    # Gregorian date of a day number (H. Hinnant's civil_from_days).
+    z = days + 719_468
+    era = z // 146_097
+    doe = z - era * 146_097
+    yoe = (doe - doe // 1460 + doe // 36_524 - doe // 146_096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    out = np.empty((len(days), 10), dtype=np.uint8)
+    out[:, 0:4] = _fixed_digits(year, 1)
+    out[:, 5:7] = _fixed_digits(month, 1)[:, 2:]
+    out[:, 8:10] = _fixed_digits(day, 1)[:, 2:]
+    out[:, [4, 7]] = ord("-")
+    return out.view("S10").ravel()
+
+
+@functools.lru_cache(maxsize=1)
+def _times_of_day() -> np.ndarray:
+    """"HH:MM:SS" of every second of a day, as S8 (built on first use)."""
+    secs = np.arange(86_400, dtype=np.int64)
+    out = np.empty((86_400, 8), dtype=np.uint8)
+    for pos, value in ((0, secs // 3600), (3, secs // 60 % 60), (6, secs % 60)):
+        out[:, pos : pos + 2] = _fixed_digits(value, 1)[:, 2:]
+    out[:, [2, 5]] = ord(":")
+    return out.view("S8").ravel()
+
+
+def _stamps(times: np.ndarray) -> Optional[np.ndarray]:
+    """"YYYY-MM-DD HH:MM:SS" of epoch-ms open times as a uint8 matrix."""
+    if len(times) and ((times % 1000).any() or times.min() < 0 or times.max() > _MAX_TIME_MS):
+        return None
+    out = np.empty(len(times), dtype=[("date", "S10"), ("sep", "S1"), ("time", "S8")])
+    if len(times):
+        seconds = times // 1000
+        days = seconds // 86_400
+        first, last = int(days.min()), int(days.max())
+        if last - first < len(days):  # intraday bars: format each day once
+            out["date"] = _dates(np.arange(first, last + 1, dtype=np.int64))[days - first]
+        else:
+            out["date"] = _dates(days)
+        out["sep"] = b" "
+        out["time"] = _times_of_day()[seconds - days * 86_400]
+    return out.view(np.uint8).reshape(len(times), 19)
+
+
+def _format_block(cols: Dict[str, np.ndarray]) -> Optional[bytes]:
+    n = len(cols["open_time"])
+    stamps = _stamps(cols["open_time"])
+    if stamps is None:
+        return None
+    blocks = [stamps, _const("+00:00", n)]
+    for name, col in cols.items():
+        if name == "open_time":
+            continue
+        field = _int_field(col) if col.dtype.kind in "iu" else _float_field(col)
+        if field is None:
+            return None
+        blocks.append(_const(",", n))
+        blocks.extend(field)
+    blocks.append(np.broadcast_to(_LINESEP, (n, len(_LINESEP))))
+    matrix = np.concatenate(blocks, axis=1)
+    filled = matrix != 0
+    return matrix.tobytes() if filled.all() else matrix[filled].tobytes()
+
+
+def format_csv_rows(cols: Dict[str, np.ndarray]) -> Optional[bytes]:
+    """
+    CSV rows of ``cols`` ("open_time" in ms plus value columns) without the header.
+
+    Returns None when any value needs the exact per-value formatting (see
+    module notes); nothing is returned partially.
+    """
+    n = len(cols["open_time"])
+    if n <= BLOCK_ROWS:
+        return _format_block(cols)
+    parts = []
+    for i in range(0, n, BLOCK_ROWS):
+        part = _format_block({name: col[i : i + BLOCK_ROWS] for name, col in cols.items()})
+        if part is None:
+            return None
+        parts.append(part)
+    return b"".join(parts)
+
+
+def _sync(fh: Any) -> int:
+    """Flush and fsync an open file; returns its size."""
+    fh.flush()
+    os.fsync(fh.fileno())
+    return os.fstat(fh.fileno()).st_size
+
+
+class _PlainStream:
+    def __init__(self, fh: Any) -> None:
+        self.fh = fh
+
+    def write(self, data: bytes) -> None:
+        self.fh.write(data)
+
+    def flush(self) -> None:
+        self.fh.flush()
+
+    def checkpoint(self) -> int:
+        return _sync(self.fh)
+
+    def close(self) -> None:
+        self.fh.close()
+
+
+class _GzipStream(_PlainStream):
+    """One gzip member per checkpoint, or per CHUNK_BYTES compressed on ``threads`` threads."""
+
+    def __init__(self, fh: Any, level: Optional[int], threads: int) -> None:
+        super().__init__(fh)
+        self.level = 6 if level is None else level
+        self._member: Optional[gzip.GzipFile] = None
+        self._pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        self._threads = threads
+        self._buffer = bytearray()
+        self._pending: Deque[Future] = deque()
+
+    def write(self, data: bytes) -> None:
+        if self._pool is None:
+            if self._member is None:
+                self._member = gzip.GzipFile(fileobj=self.fh, mode="wb", compresslevel=self.level, mtime=0)
+            self._member.write(data)
+            return
+        self._buffer += data
+        if len(self._buffer) >= CHUNK_BYTES:
+            self._submit()
+
+    def _submit(self) -> None:
+        assert self._pool is not None
+        if self._buffer:
+            self._pending.append(self._pool.submit(gzip.compress, bytes(self._buffer), self.level, mtime=0))
+            self._buffer = bytearray()
+        while len(self._pending) > 2 * self._threads:
+            self.fh.write(self._pending.popleft().result())
+
+    def _end_member(self) -> None:
+        if self._pool is not None:
+            self._submit()
+            while self._pending:
+                self.fh.write(self._pending.popleft().result())
+        elif self._member is not None:
+            self._member.close()  # writes the trailer; the file stays open
+            self._member = None
+
+    def flush(self) -> None:
+        if self._member is not None:
+            self._member.flush()
+        self.fh.flush()
+
+    def checkpoint(self) -> int:
+        self._end_member()
+        return _sync(self.fh)
+
+    def close(self) -> None:
+        try:
+            self._end_member()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+            self.fh.close()
+
+
+class _ZstdStream(_PlainStream):
+    """One zstd frame per checkpoint; ``threads`` > 1 uses zstd's worker threads."""
+
+    def __init__(self, fh: Any, level: Optional[int], threads: int) -> None:
+        super().__init__(fh)
+        zstd = _zstandard()
+        self._flush_frame = zstd.FLUSH_FRAME
+        compressor = zstd.ZstdCompressor(level=3 if level is None else level, threads=threads if threads > 1 else 0)
+        self._writer = compressor.stream_writer(fh, closefd=False)
+
+    def write(self, data: bytes) -> None:
+        self._writer.write(data)
+
+    def flush(self) -> None:
+        self._writer.flush()
+        self.fh.flush()
+
+    def checkpoint(self) -> int:
+        self._writer.flush(self._flush_frame)
+        return _sync(self.fh)
+
+    def close(self) -> None:
+        try:
+            self._writer.close()
+        finally:
+            self.fh.close()
+
+
+def _zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:  # pragma: no cover - depends on the environment
+        raise ImportError("zstd output requires zstandard: pip install 'binance-ohlcv-extractor[zstd]'") from e
+    return zstandard
+
+
+def open_stream(fh: Any, compression: Optional[str] = None, level: Optional[int] = None, threads: int = 1) -> Any:
+    """Wrap binary file ``fh``; closing the stream closes ``fh``."""
+    if compression is None:
+        return _PlainStream(fh)
+    if compression == "gzip":
+        return _GzipStream(fh, level, threads)
+    if compression == "zstd":
+        return _ZstdStream(fh, level, threads)
+    raise ValueError(f"Unknown compression {compression!r}; choose from {', '.join(COMPRESSIONS)}")
+
+
+def open_reader(path: str) -> Any:
+    """Binary reader of ``path``, decompressed according to its suffix."""
+    if path.endswith(COMPRESSIONS["gzip"]):
+        return gzip.open(path, "rb")
+    if path.endswith(COMPRESSIONS["zstd"]):
+        return _zstandard().ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+    return open(path, "rb")
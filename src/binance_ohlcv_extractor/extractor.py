@@ -3,25 +3,70 @@
 Extractor module for Binance USDT-M futures OHLCV.
 
 This module exposes:
-- criptodata(symbol, start_date_str, end_date=None, interval="1d", output_dir=".")
-  -> pandas.DataFrame
+- criptodata(symbol, start_date_str, end_date=None, interval="1d", output_dir=".", limiter=None,
+             page_workers=1, transport=None, incremental=False, cache=None, writer=None,
+             return_df=True, archive_dir=None, resample_to=None, metrics=None, schema=None,
+             metadata=None, journal=None)
+  -> pandas.DataFrame (or rows written when return_df=False)
+- read_range(symbol, interval, start, end, root=None) -> zero-copy NumPy view of bars
+  stored with writer=BarWriter() (re-exported from barstore.py)
 
 Notes (written content):
 - Purpose: provide a deterministic, documented function to fetch and export OHLCV.
+- pandas is imported only when a DataFrame is requested (return_df=True, resampling,
+  Parquet output): criptodata(return_df=False) with CSV or bars output runs on NumPy.
 - Provenance: prompt_id ffw-2025-10-02-v1 (see prompts/financial_framework_template.md).
 - Maintainer: alearisteguieta (add contact in repo-wide CODEOWNERS if desired).
 """
 
-import os
 import time
-from datetime import datetime, date, timedelta
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, date, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
 
-import pandas as pd
+import numpy as np
 import requests
 
+from .archives import archive_spans, iter_archive_columns
+from .barstore import read_range  # noqa: F401  (public API next to criptodata)
+from .cache import PageCache
+from .metrics import NULL_METRICS, RunMetrics
+from .ratelimit import USED_WEIGHT_HEADER, RateLimiter, klines_weight
+from .schema import OHLCV, BarSchema
+from .transport import HttpTransport
+from .writers import CsvWriter, Sink, Writer
+
+if TYPE_CHECKING:  # pandas is imported lazily, only where a DataFrame is built
+    import pandas as pd
+
+    from .journal import Checkpoint, Journal
+    from .metadata import SymbolMetadata
+
+KLINES_PATH = "/fapi/v1/klines"
 MAX_LIMIT = 1000
 TIMEFRAME_DEFAULT = "1d"
+MAX_RETRIES = 5
+RETRY_STATUS = (418, 429)
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Fixed bar lengths in milliseconds. "1M" is absent on purpose: months vary in length.
+INTERVAL_MS: Dict[str, int] = {
+    "1m": 60_000,
+    "3m": 3 * 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "2h": 2 * 3_600_000,
+    "4h": 4 * 3_600_000,
+    "6h": 6 * 3_600_000,
+    "8h": 8 * 3_600_000,
+    "12h": 12 * 3_600_000,
+    "1d": 86_400_000,
+    "3d": 3 * 86_400_000,
+    "1w": 7 * 86_400_000,
+}
 
 
 def _to_millis(dt: datetime) -> int:
@@ -29,13 +74,15 @@ def _to_millis(dt: datetime) -> int:
     return int(dt.timestamp() * 1000)
 
 
-def _parse_klines_response(klines: List[list]) -> pd.DataFrame:
+def _parse_klines_response(klines: List[list]) -> "pd.DataFrame":
     """
     Convert raw klines (list-of-lists) into a canonical pandas.DataFrame.
 
     Returns a DataFrame indexed by Date with float columns:
     ['open', 'high', 'low', 'close', 'volume']
     """
+    import pandas as pd
+
     df = pd.DataFrame(
         klines,
         columns=[
@@ -62,69 +109,632 @@ def _parse_klines_response(klines: List[list]) -> pd.DataFrame:
     return df
 
 
-def _fetch_klines_requests(symbol: str, interval: str, start_ts_ms: int, end_ts_ms: int) -> List[list]:
+def _parse_klines_columns(
+    klines: Union[List[list], bytes], schema: BarSchema = OHLCV
+) -> Dict[str, np.ndarray]:
     """
-    Fetch klines using the Binance Futures public REST endpoint with pagination.
-    This function returns the raw list-of-lists returned by the API.
+    Convert raw klines into typed NumPy columns without an intermediate object frame.
+
+    ``klines`` is either the decoded list-of-lists or the raw JSON response body.
+    Returns the columns of ``schema``; by default {"open_time": int64,
+    "open"/"high"/"low"/"close"/"volume": float64}.
     """
-    endpoint = "https://fapi.binance.com/fapi/v1/klines"
-    all_klines: List[list] = []
-    next_start = start_ts_ms
+    if isinstance(klines, (bytes, bytearray, memoryview)):
+        body = bytes(klines)
+        # Strip brackets and quotes: what remains is every field, comma-separated.
+        flat = body.translate(None, b'[]" \n')
+        if not flat:
+            return schema.empty()
+        ncols = body[: body.index(b"]")].count(b",") + 1
+        values = np.fromstring(flat, dtype=np.float64, sep=",")
+        if values.size % ncols:
+            raise ValueError("Malformed klines payload")
+        return schema.from_matrix(values.reshape(-1, ncols))
+
+    cols = {"open_time": np.fromiter((k[0] for k in klines), dtype=np.int64, count=len(klines))}
+    for i, name in enumerate(schema.fields[1:], start=1):
+        cols[name] = np.array([k[i] for k in klines], dtype=np.float64).astype(schema.dtype(name), copy=False)
+    return cols
+
+
+def _frame_from_columns(cols: Dict[str, np.ndarray]) -> "pd.DataFrame":
+    """Build the canonical Date-indexed frame from _parse_klines_columns output."""
+    import pandas as pd
+
+    index = pd.DatetimeIndex(cols["open_time"] * 1_000_000, dtype="datetime64[ns, UTC]", name="Date")
+    return pd.DataFrame({name: col for name, col in cols.items() if name != "open_time"}, index=index)
+
+
+def _parse_klines_fast(klines: Union[List[list], bytes]) -> "pd.DataFrame":
+    """Drop-in replacement for _parse_klines_response that also accepts raw bytes."""
+    return _frame_from_columns(_parse_klines_columns(klines))
+
+
+def _window_ms(start_date_str: str, end_date: date) -> Tuple[int, int]:
+    """Inclusive [start, end] in ms: start_date 00:00:00 to end_date 23:59:59 (UTC)."""
+    start_dt = datetime.strptime(start_date_str, "%Y-%m-%d")
+    start_dt_utc = datetime(start_dt.year, start_dt.month, start_dt.day, 0, 0, 0, tzinfo=timezone.utc)
+    end_dt_utc = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59, tzinfo=timezone.utc)
+    return _to_millis(start_dt_utc), _to_millis(end_dt_utc)
+
+
+def _empty_columns(schema: BarSchema = OHLCV) -> Dict[str, np.ndarray]:
+    """Zero-length columns in the layout _parse_klines_columns produces."""
+    return schema.empty()
+
+
+def _empty_frame(schema: BarSchema = OHLCV) -> "pd.DataFrame":
+    """An empty frame with the same index and columns _parse_klines_response produces."""
+    return _frame_from_columns(schema.empty())
+
+
+def _plan_windows(
+    interval: str, start_ts_ms: int, end_ts_ms: int, aligned: bool = False
+) -> List[Tuple[int, int]]:
+    """
+    Split [start_ts_ms, end_ts_ms] into inclusive windows of at most MAX_LIMIT bars.
+
+    Windows follow a fixed grid of MAX_LIMIT * interval milliseconds counted from
+    the epoch, so the same page boundaries come back for overlapping ranges. With
+    ``aligned`` the first window starts on the grid too (before start_ts_ms), so
+    every window is a cacheable page that any overlapping range requests again;
+    the caller drops the bars before start_ts_ms.
+    """
+    span = INTERVAL_MS[interval] * MAX_LIMIT
+    if aligned:
+        start_ts_ms = start_ts_ms // span * span
+    windows: List[Tuple[int, int]] = []
+    for cell in range(start_ts_ms // span, end_ts_ms // span + 1):
+        windows.append((max(start_ts_ms, cell * span), min(end_ts_ms, (cell + 1) * span - 1)))
+    return windows
+
+
+def _retry_delay(resp: requests.Response, attempt: int) -> float:
+    """Seconds to back off after a throttled response: Retry-After, but never less than 2**attempt."""
+    try:
+        retry_after = float(resp.headers.get("Retry-After", 0))
+    except ValueError:
+        retry_after = 0.0
+    return max(retry_after, float(2**attempt))
+
+
+def _fetch_page(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: HttpTransport,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+    limit: int = MAX_LIMIT,
+    raw: bool = False,
+) -> Union[List[list], bytes]:
+    """
+    Fetch a single page (up to ``limit`` klines) starting at start_ts_ms.
+
+    429/418 responses pause the shared limiter and are retried up to MAX_RETRIES
+    times; any other HTTP error is raised immediately. With a ``cache``, closed
+    pages are served from disk without touching the limiter or the network.
+    A smaller ``limit`` costs less request weight (see klines_weight). With
+    ``raw`` the undecoded response body is returned (cached pages stay decoded).
+    """
+    if cache is not None:
+        cached = cache.get(symbol, interval, start_ts_ms, end_ts_ms)
+        if cached is not None:
+            metrics.inc("cache_hits")
+            return cached
+    weight = klines_weight(limit)
+    attempt = 0
     while True:
-        resp = requests.get(
-            endpoint,
-            params={"symbol": symbol, "interval": interval, "startTime": next_start, "endTime": end_ts_ms, "limit": MAX_LIMIT},
-            timeout=30,
+        with metrics.timer("rate_limit_wait"):
+            limiter.acquire(weight)
+        t = time.perf_counter()
+        resp = transport.get(
+            KLINES_PATH,
+            params={"symbol": symbol, "interval": interval, "startTime": start_ts_ms, "endTime": end_ts_ms, "limit": limit},
         )
+        metrics.observe_latency(time.perf_counter() - t)
+        metrics.inc("requests")
+        metrics.inc("bytes_received", len(resp.content))
+        limiter.observe(resp.headers.get(USED_WEIGHT_HEADER))
+        if resp.status_code in RETRY_STATUS and attempt < MAX_RETRIES:
+            metrics.inc("retries")
+            limiter.pause(_retry_delay(resp, attempt))
+            attempt += 1
+            continue
         resp.raise_for_status()
+        if raw and cache is None:
+            metrics.inc("pages")
+            return resp.content
         data = resp.json()
+        metrics.inc("pages")
+        if cache is not None:
+            cache.put(symbol, interval, start_ts_ms, end_ts_ms, data)
+        return data
+
+
+def _iter_range_pages(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: HttpTransport,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> Iterator[List[list]]:
+    """
+    Walk [start_ts_ms, end_ts_ms] one dependent page at a time (each starts after the last bar).
+
+    For fixed-length intervals paging stops once the next bar would open past the
+    end, so a server that caps pages below MAX_LIMIT is still read to the end.
+    """
+    step = INTERVAL_MS.get(interval)
+    next_start = start_ts_ms
+    while next_start <= end_ts_ms:
+        data = _fetch_page(symbol, interval, next_start, end_ts_ms, limiter, transport, cache, metrics)
         if not data:
             break
-        all_klines.extend(data)
-        if len(data) < MAX_LIMIT:
-            break
+        yield data
         last_open_time = int(data[-1][0])
-        next_start = last_open_time + 1
-        time.sleep(0.2)
+        if step is None and len(data) < MAX_LIMIT:
+            break
+        next_start = last_open_time + (step or 1)
+
+
+def _fetch_window(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: HttpTransport,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> List[list]:
+    """All klines of one planned window; normally a single request (see _plan_windows)."""
+    pages = list(_iter_range_pages(symbol, interval, start_ts_ms, end_ts_ms, limiter, transport, cache, metrics))
+    return pages[0] if len(pages) == 1 else [k for page in pages for k in page]
+
+
+def _iter_klines_pages(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: Optional[RateLimiter] = None,
+    page_workers: int = 1,
+    transport: Optional[HttpTransport] = None,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> Iterator[List[list]]:
+    """
+    Yield raw klines pages for [start_ts_ms, end_ts_ms] in open-time order.
+
+    Every request goes through ``limiter``; pass a shared instance when several
+    symbols are fetched concurrently so they draw from one request budget.
+
+    With ``page_workers`` > 1 and a fixed-length interval, the range is split into
+    windows up front (see _plan_windows) and pages are fetched concurrently, with
+    at most 2 * page_workers pages fetched ahead of the consumer. Bars already
+    yielded are dropped from later pages, so no open time appears twice.
+
+    Requests go through ``transport``; without one, a private pooled transport is
+    opened for this generator and closed when it finishes. Pages found in
+    ``cache`` are not requested again; with a cache, fixed-length intervals are
+    always fetched as grid-aligned windows (one worker or many), so a range that
+    overlaps earlier ones requests the same pages and finds them on disk.
+    Requests, retries, bytes and latencies are recorded in ``metrics``.
+    """
+    if limiter is None:
+        limiter = RateLimiter()
+    own_transport = transport is None
+    if transport is None:
+        transport = HttpTransport()
+
+    last_open_time: Optional[int] = start_ts_ms - 1
+    try:
+        if interval in INTERVAL_MS and cache is not None and page_workers == 1:
+            for w in _plan_windows(interval, start_ts_ms, end_ts_ms, aligned=True):
+                data = _fetch_window(symbol, interval, w[0], w[1], limiter, transport, cache, metrics)
+                yield from _drop_seen(data, last_open_time)
+                last_open_time = int(data[-1][0]) if data else last_open_time
+            return
+        if page_workers > 1 and interval in INTERVAL_MS:
+            windows = iter(_plan_windows(interval, start_ts_ms, end_ts_ms, aligned=cache is not None))
+            pending: Deque[Future] = deque()
+            with ThreadPoolExecutor(max_workers=page_workers) as pool:
+                try:
+                    for w in windows:
+                        pending.append(
+                            pool.submit(_fetch_window, symbol, interval, w[0], w[1], limiter, transport, cache, metrics)
+                        )
+                        if len(pending) < 2 * page_workers:
+                            continue
+                        data = pending.popleft().result()
+                        yield from _drop_seen(data, last_open_time)
+                        last_open_time = int(data[-1][0]) if data else last_open_time
+                    while pending:
+                        data = pending.popleft().result()
+                        yield from _drop_seen(data, last_open_time)
+                        last_open_time = int(data[-1][0]) if data else last_open_time
+                finally:
+                    for fut in pending:
+                        fut.cancel()
+            return
+
+        # Sequential pagination; also the path for 1M, whose bar length varies.
+        yield from _iter_range_pages(symbol, interval, start_ts_ms, end_ts_ms, limiter, transport, cache, metrics)
+    finally:
+        if own_transport:
+            transport.close()
+
+
+def _drop_seen(data: List[list], last_open_time: Optional[int]) -> Iterator[List[list]]:
+    """Yield ``data`` without bars at or before ``last_open_time`` (nothing if that leaves it empty)."""
+    if data and last_open_time is not None and int(data[0][0]) <= last_open_time:
+        data = [k for k in data if int(k[0]) > last_open_time]
+    if data:
+        yield data
+
+
+def _fetch_klines_requests(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: Optional[RateLimiter] = None,
+    page_workers: int = 1,
+    transport: Optional[HttpTransport] = None,
+    cache: Optional[PageCache] = None,
+) -> List[list]:
+    """
+    Fetch klines using the Binance Futures public REST endpoint with pagination.
+    This function returns the raw list-of-lists returned by the API.
+
+    Collects every page from _iter_klines_pages (same arguments) into one list.
+    """
+    all_klines: List[list] = []
+    for data in _iter_klines_pages(
+        symbol, interval, start_ts_ms, end_ts_ms, limiter, page_workers=page_workers, transport=transport, cache=cache
+    ):
+        all_klines.extend(data)
     return all_klines
 
 
+def _iter_archived_columns(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    archive_dir: str,
+    metrics: RunMetrics = NULL_METRICS,
+    schema: BarSchema = OHLCV,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """Archived column chunks in open-time order, never repeating an open time."""
+    next_start = start_ts_ms
+    archived = iter_archive_columns(archive_dir, symbol, interval, start_ts_ms, end_ts_ms, schema)
+    while True:
+        with metrics.timer("archive"):
+            cols = next(archived, None)
+        if cols is None:
+            return
+        metrics.inc("rows_parsed", len(cols["open_time"]))
+        if cols["open_time"][0] < next_start:
+            keep = cols["open_time"] >= next_start
+            cols = {name: col[keep] for name, col in cols.items()}
+            if not len(cols["open_time"]):
+                continue
+        yield cols
+        next_start = int(cols["open_time"][-1]) + INTERVAL_MS.get(interval, 1)
+
+
+def _plan_sources(
+    symbol: str, interval: str, start_ts_ms: int, end_ts_ms: int, archive_dir: Optional[str]
+) -> List[Tuple[bool, int, int]]:
+    """
+    Cut [start_ts_ms, end_ts_ms] into (archived, start, end) segments in order.
+
+    Segments covered by archive periods are read from ``archive_dir``; every
+    other part (before the first archive, between archives, after the last) is
+    fetched from REST.
+    """
+    spans = archive_spans(archive_dir, symbol, interval, start_ts_ms, end_ts_ms) if archive_dir else []
+    segments: List[Tuple[bool, int, int]] = []
+    cursor = start_ts_ms
+    for first, last in spans:
+        if first > cursor:
+            segments.append((False, cursor, first - 1))
+        segments.append((True, first, last))
+        cursor = last + 1
+    if cursor <= end_ts_ms:
+        segments.append((False, cursor, end_ts_ms))
+    return segments
+
+
+def _iter_bar_columns(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    archive_dir: Optional[str] = None,
+    metrics: RunMetrics = NULL_METRICS,
+    schema: BarSchema = OHLCV,
+    **fetch_kwargs: Any,
+) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Yield parsed column chunks of ``schema`` for [start_ts_ms, end_ts_ms] in open-time order.
+
+    Periods covered by local archives (see archives.py) are read from disk and
+    the REST fetcher covers everything else (see _plan_sources). ``fetch_kwargs``
+    go to _iter_klines_pages.
+    """
+    for archived, seg_start, seg_end in _plan_sources(symbol, interval, start_ts_ms, end_ts_ms, archive_dir):
+        if archived:
+            assert archive_dir is not None
+            yield from _iter_archived_columns(symbol, interval, seg_start, seg_end, archive_dir, metrics, schema)
+            continue
+        pages = _iter_klines_pages(symbol, interval, seg_start, seg_end, metrics=metrics, **fetch_kwargs)
+        while True:
+            with metrics.timer("fetch"):
+                page = next(pages, None)
+            if page is None:
+                break
+            with metrics.timer("parse"):
+                cols = _parse_klines_columns(page, schema)
+            metrics.inc("rows_parsed", len(cols["open_time"]))
+            yield cols
+
+
 def criptodata(
     symbol: str,
     start_date_str: str,
     end_date: Optional[date] = None,
     interval: str = TIMEFRAME_DEFAULT,
     output_dir: str = ".",
-) -> pd.DataFrame:
+    limiter: Optional[RateLimiter] = None,
+    page_workers: int = 1,
+    transport: Optional[HttpTransport] = None,
+    incremental: bool = False,
+    cache: Optional[PageCache] = None,
+    writer: Optional[Writer] = None,
+    return_df: bool = True,
+    archive_dir: Optional[str] = None,
+    resample_to: Optional[List[str]] = None,
+    metrics: Optional[RunMetrics] = None,
+    schema: Optional[BarSchema] = None,
+    metadata: Optional["SymbolMetadata"] = None,
+    journal: Optional["Journal"] = None,
+) -> Union["pd.DataFrame", int]:
     """
     Orchestrate extraction, parsing and CSV export for a single symbol.
 
-    Returns a pandas.DataFrame indexed by Date (UTC).
+    Pages are streamed: each one is parsed, filtered to the requested window and
+    handed to the writer before the next is consumed, so memory stays flat for
+    any range unless the full DataFrame is requested.
+
+    ``limiter`` paces the underlying requests; share one instance across threads
+    to keep a multi-symbol run inside a single request budget. ``page_workers``
+    sets how many pages of this symbol are in flight at once. ``transport`` is
+    the pooled HTTP session to reuse (one per call when omitted). ``cache`` is an
+    on-disk PageCache serving closed pages from earlier runs. ``writer`` selects
+    the output backend (CsvWriter, i.e. ``{symbol}.csv``, by default).
+    ``archive_dir`` points at downloaded monthly/daily klines archives; the
+    periods they cover are read from disk and REST fetches only the rest. ``resample_to``
+    lists higher intervals (e.g. ["5m", "1h", "1d"]) derived locally from the
+    fetched bars and written alongside them (see Writer.derived_dir); only
+    target bars the window fully covers are written. ``metrics`` (a RunMetrics)
+    collects request counts, latencies and per-phase times for a run report.
+    ``schema`` (see schema.py) selects the kline fields kept and their dtypes,
+    OHLCV in float64 by default; every writer stores the columns it is given.
+    With ``metadata`` (a SymbolMetadata) the window is first cut to the
+    contract's listed lifetime, and a window it does not overlap raises
+    before any request is made. ``journal`` (see journal.py) records durable
+    checkpoints while the run progresses; a Journal opened with resume=True
+    continues an interrupted run of the same arguments from its last
+    checkpoint, and returns the row count of one that had completed. The
+    journal stays open: the caller owns it and must close() it (or use it as
+    a context manager) once the run, or every run sharing it, is over.
+
+    With ``incremental`` and existing output, only bars newer than the stored
+    last row are fetched and appended; the result then covers just those new
+    rows (possibly none).
+
+    Returns a pandas.DataFrame indexed by Date (UTC), or, with ``return_df=False``,
+    only the number of rows written.
     """
-    if end_date is None:
-        end_date = date.today() - timedelta(days=1)
+    run = _Extraction(
+        symbol, start_date_str, end_date, interval, output_dir, incremental, writer, return_df, resample_to, metrics,
+        schema, metadata, journal,
+    )
+    if run.up_to_date:
+        return run.result()
+    chunks = _iter_bar_columns(
+        symbol,
+        interval,
+        run.start_ms,
+        run.end_ms,
+        archive_dir=archive_dir,
+        metrics=run.metrics,
+        schema=run.schema,
+        limiter=limiter,
+        page_workers=page_workers,
+        transport=transport,
+        cache=cache,
+    )
+    run.open()
+    ok = False
+    try:
+        for cols in chunks:
+            run.feed(cols)
+        run.finish()
+        ok = True
+    finally:
+        run.close(ok)
+    return run.result()
 
-    # Normalize start/end datetimes (UTC)
-    start_dt = datetime.strptime(start_date_str, "%Y-%m-%d")
-    start_dt_utc = datetime(start_dt.year, start_dt.month, start_dt.day, 0, 0, 0)
-    end_dt_utc = datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59)
 
-    start_ms = _to_millis(start_dt_utc)
-    end_ms = _to_millis(end_dt_utc)
+class _Extraction:
+    """
+    Window, sinks and row accounting of one criptodata() run.
 
-    raw_klines = _fetch_klines_requests(symbol, interval, start_ms, end_ms)
-    if not raw_klines:
-        raise RuntimeError(f"No kline data returned for {symbol} between {start_date_str} and {end_date.isoformat()}")
+    Shared by the blocking and the asyncio drivers (see aio.py), which only
+    differ in how they produce column chunks: open(), feed() every chunk,
+    finish(), and close(ok) in a finally block; only close(True) replaces the
+    existing output.
+    """
 
-    df = _parse_klines_response(raw_klines)
+    def __init__(
+        self,
+        symbol: str,
+        start_date_str: str,
+        end_date: Optional[date],
+        interval: str,
+        output_dir: str,
+        incremental: bool,
+        writer: Optional[Writer],
+        return_df: bool,
+        resample_to: Optional[List[str]],
+        metrics: Optional[RunMetrics],
+        schema: Optional[BarSchema] = None,
+        metadata: Optional["SymbolMetadata"] = None,
+        journal: Optional["Journal"] = None,
+    ) -> None:
+        if end_date is None:
+            end_date = date.today() - timedelta(days=1)
+        self.symbol = symbol
+        self.start_date_str = start_date_str
+        self.end_date = end_date
+        self.interval = interval
+        self.output_dir = output_dir
+        self.writer = writer if writer is not None else CsvWriter()
+        self.return_df = return_df
+        self.resample_to = resample_to or []
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.schema = schema if schema is not None else OHLCV
+        self.journal = journal
+        self.start_ms, self.end_ms = _window_ms(start_date_str, end_date)
+        if self.resample_to:
+            from .resample import check_resample
 
-    # Filter to requested closed window
-    df = df[(df.index >= start_dt_utc) & (df.index <= end_dt_utc)]
+            if incremental:
+                raise ValueError("resample_to cannot be combined with incremental")
+            if journal is not None:
+                raise ValueError("resample_to cannot be combined with a journal")
+            for target in self.resample_to:
+                check_resample(interval, target)
+        self.append = False
+        self.up_to_date = False
+        self.rows = self.resumed_rows = self.pages = 0
+        self.fetched = False
+        self.frames: List["pd.DataFrame"] = []
+        self.sinks: List[Sink] = []
+        self._resumed: Optional[Sink] = None
+        resume = None
+        if journal is not None:
+            params = dict(
+                window=[self.start_ms, self.end_ms], writer=self.writer.name, schema=list(self.schema),
+                incremental=incremental,
+            )
+            resume = journal.begin(symbol, interval, params)
+            if resume is not None and not resume.done and resume.size != 0:
+                self._resumed = self.writer.resume(output_dir, symbol, interval, resume.size, resume.append)
+                if self._resumed is None:
+                    resume = None  # the partial output is gone: start over
+        if resume is not None:
+            # Continue after the last checkpoint; nothing before it is fetched or written again.
+            self.start_ms, self.end_ms, self.append = resume.next_ms, resume.end_ms, resume.append
+            self.rows = self.resumed_rows = resume.rows
+            self.pages = resume.pages
+            self.fetched = True
+            self.up_to_date = resume.done
+        elif incremental:
+            last_open_ms = self.writer.last_open_time_ms(output_dir, symbol, interval)
+            if last_open_ms is not None:
+                self.append = True
+                # Next bar's open time; 1M has no fixed length, so just step past the last one.
+                self.start_ms = max(self.start_ms, last_open_ms + INTERVAL_MS.get(interval, 1))
+                self.up_to_date = self.start_ms > self.end_ms
+        if metadata is not None and not self.up_to_date:
+            span = metadata.clamp(symbol, interval, self.start_ms, self.end_ms)
+            if span is not None:
+                self.start_ms, self.end_ms = span
+            elif self.append:
+                self.up_to_date = True  # delisted since the last run
+            else:
+                info = metadata.get(symbol)
+                assert info is not None  # clamp() raised otherwise
+                listed = datetime.fromtimestamp(info.onboard_ms / 1000, tz=timezone.utc).date()
+                raise RuntimeError(
+                    f"No kline data for {symbol} between {start_date_str} and {end_date.isoformat()}: "
+                    f"{info.status} contract listed {listed.isoformat()}"
+                )
 
-    # Ensure output directory and write CSV
-    os.makedirs(output_dir, exist_ok=True)
-    # For CSV we write ISO 8601 UTC timestamps (pandas will include timezone if tz-aware)
-    csv_path = os.path.join(output_dir, f"{symbol}.csv")
-    df.to_csv(csv_path, index=True, float_format="%.8f")
+    def open(self) -> None:
+        if self._resumed is not None:
+            self.sinks = [self._resumed]
+        else:
+            self.sinks = [self.writer.open(self.output_dir, self.symbol, self.interval, append=self.append)]
+        if self.resample_to:
+            from .resample import ResampleSink  # pandas-based
+        for target in self.resample_to:
+            derived = self.writer.open(self.writer.derived_dir(self.output_dir, target), self.symbol, target)
+            self.sinks.append(ResampleSink(derived, self.interval, target, self.start_ms, self.end_ms))
 
-    return df
+    def feed(self, cols: Dict[str, np.ndarray]) -> None:
+        self.fetched = True
+        self.pages += 1
+        times = cols["open_time"]
+        # Filter to requested closed window
+        with self.metrics.timer("filter"):
+            keep = (times >= self.start_ms) & (times <= self.end_ms)
+            if not keep.all():
+                cols = {name: col[keep] for name, col in cols.items()}
+        n = len(cols["open_time"])
+        if n:
+            with self.metrics.timer("write"):
+                for sink in self.sinks:
+                    sink.write_columns(cols)
+            self.rows += n
+            if self.return_df:
+                self.frames.append(_frame_from_columns(cols))
+        if self.journal is not None and len(times) and self.journal.due(self.symbol, self.interval):
+            with self.metrics.timer("write"):
+                size = self.sinks[0].checkpoint()
+            self.journal.checkpoint(self.symbol, self.interval, self._progress(int(times[-1]), size))
+
+    def _progress(self, last_open_ms: int, size: Optional[int]) -> "Checkpoint":
+        from .journal import Checkpoint
+
+        next_ms = last_open_ms + INTERVAL_MS.get(self.interval, 1)
+        return Checkpoint(next_ms, self.end_ms, self.append, self.rows, self.pages, size)
+
+    def finish(self) -> None:
+        if not self.fetched and not self.append:
+            raise RuntimeError(
+                f"No kline data returned for {self.symbol} between {self.start_date_str} "
+                f"and {self.end_date.isoformat()}"
+            )
+        if self.rows == 0 and not self.append:
+            self.sinks[0].write_columns(_empty_columns(self.schema))
+
+    def close(self, ok: bool = True) -> None:
+        with self.metrics.timer("write"):
+            for sink in self.sinks:
+                if ok:
+                    sink.close()
+                else:
+                    sink.abort()
+        self.metrics.inc("rows_written", self.rows - self.resumed_rows)
+        if ok and self.journal is not None:
+            self.journal.done(self.symbol, self.interval, self._progress(self.end_ms, None))
+
+    def result(self) -> Union["pd.DataFrame", int]:
+        if not self.return_df:
+            return self.rows
+        if not self.frames:
+            return _empty_frame(self.schema)
+        import pandas as pd
+
+        return pd.concat(self.frames)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Live tail: append each newly closed candle of several symbols as it closes.
+
+This module exposes:
+- Follower(symbols, interval="1m", output_dir=".", writer=None, source=None, ...):
+  keeps one append sink and the last stored open time per symbol in memory;
+  run(stop) loops until the stop event is set.
+- PushSource: interface for sources that push closed klines (e.g. a websocket).
+- QueueSource(): in-process PushSource fed with push(symbol, kline); the local
+  stand-in used by tests and by callers that receive klines elsewhere.
+
+Notes (written content):
+- Without a push source the follower sleeps until the next interval boundary
+  (plus ``lag``), then fetches only the newly closed bar(s) of every due symbol
+  in one concurrent batch, asking for exactly that many bars (weight 1 per
+  symbol). A bar the exchange has not published yet is polled again every
+  ``retry`` seconds.
+- With a push source, pushed bars are appended as they arrive; REST is only
+  used for symbols still missing a bar ``grace`` seconds after the boundary,
+  and for catching up after downtime.
+- Every appended batch is flushed to the sink, so readers see a bar as soon as
+  it is written. State lives in memory; the output is read once, at start.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .extractor import (
+    INTERVAL_MS,
+    _fetch_page,
+    _iter_klines_pages,
+    _parse_klines_columns,
+)
+from .metrics import NULL_METRICS, RunMetrics
+from .ratelimit import RateLimiter
+from .schema import OHLCV, BarSchema
+from .transport import HttpTransport
+from .writers import CsvWriter, Sink, Writer
+
+# Below 100 bars a klines request costs weight 1 (see ratelimit.klines_weight).
+CHEAP_LIMIT = 99
+
+
+class PushSource:
+    """Delivers closed klines (REST row layout) for the subscribed symbols."""
+
+    def subscribe(self, symbols: Sequence[str], interval: str) -> None:
+        """Start delivering closed ``interval`` klines of ``symbols``."""
+
+    def get(self, timeout: float) -> Optional[Tuple[str, list]]:
+        """Next (symbol, kline) pair, or None if nothing arrived within ``timeout`` seconds."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Stop delivering and release resources."""
+
+
+class QueueSource(PushSource):
+    """PushSource backed by a thread-safe queue; call push() from any thread."""
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Tuple[str, list]]" = queue.Queue()
+
+    def push(self, symbol: str, kline: list) -> None:
+        self._queue.put((symbol, kline))
+
+    def get(self, timeout: float) -> Optional[Tuple[str, list]]:
+        try:
+            return self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+
+class Follower:
+    """
+    Appends closed ``interval`` bars of ``symbols`` to ``writer`` output as they close.
+
+    Without stored output a symbol starts at the latest closed bar. ``limiter``,
+    ``transport`` and ``metrics`` are used as in criptodata(); ``clock`` returns
+    the current time in seconds and exists for tests. ``schema`` must match the
+    one the stored output was written with.
+    """
+
+    def __init__(
+        self,
+        symbols: Sequence[str],
+        interval: str = "1m",
+        output_dir: str = ".",
+        writer: Optional[Writer] = None,
+        source: Optional[PushSource] = None,
+        limiter: Optional[RateLimiter] = None,
+        transport: Optional[HttpTransport] = None,
+        metrics: Optional[RunMetrics] = None,
+        lag: float = 0.2,
+        retry: float = 0.25,
+        grace: float = 2.0,
+        clock: Callable[[], float] = time.time,
+        schema: Optional[BarSchema] = None,
+    ) -> None:
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Following needs a fixed-length interval, got {interval!r}")
+        self.symbols = list(symbols)
+        self.interval = interval
+        self.step = INTERVAL_MS[interval]
+        self.output_dir = output_dir
+        self.writer = writer if writer is not None else CsvWriter()
+        self.source = source
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self._own_transport = transport is None
+        self.transport = transport if transport is not None else HttpTransport(pool_size=max(4, len(self.symbols)))
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.lag = lag
+        self.retry = retry
+        self.grace = grace
+        self.clock = clock
+        self.schema = schema if schema is not None else OHLCV
+        self._lock = threading.Lock()
+        self._sinks: Dict[str, Sink] = {}
+        self.last_open_ms: Dict[str, int] = {}
+        forming = self._forming_open_ms()
+        for s in self.symbols:
+            last = self.writer.last_open_time_ms(output_dir, s, interval)
+            self.last_open_ms[s] = last if last is not None else forming - 2 * self.step
+        if source is not None:
+            source.subscribe(self.symbols, interval)
+
+    def _forming_open_ms(self) -> int:
+        """Open time of the bar that is still forming now."""
+        now_ms = int(self.clock() * 1000)
+        return now_ms - now_ms % self.step
+
+    def due(self) -> List[str]:
+        """Symbols whose newest closed bar is not stored yet."""
+        last_closed = self._forming_open_ms() - self.step
+        return [s for s in self.symbols if self.last_open_ms[s] < last_closed]
+
+    def append(self, symbol: str, klines: List[list]) -> int:
+        """Append the closed bars in ``klines`` newer than the stored tail; returns rows added."""
+        if not klines:
+            return 0
+        cols = _parse_klines_columns(klines, self.schema)
+        with self._lock:
+            keep = (cols["open_time"] > self.last_open_ms[symbol]) & (cols["open_time"] < self._forming_open_ms())
+            if not keep.any():
+                return 0
+            cols = {name: col[keep] for name, col in cols.items()}
+            sink = self._sinks.get(symbol)
+            if sink is None:
+                sink = self._sinks[symbol] = self.writer.open(self.output_dir, symbol, self.interval, append=True)
+            with self.metrics.timer("write"):
+                sink.write_columns(cols)
+                sink.flush()
+            self.last_open_ms[symbol] = int(np.max(cols["open_time"]))
+        rows = len(cols["open_time"])
+        self.metrics.inc("rows_written", rows)
+        return rows
+
+    def _fetch_missing(self, symbol: str) -> int:
+        first = self.last_open_ms[symbol] + self.step
+        end = self._forming_open_ms() - 1
+        missing = (end - first) // self.step + 1
+        if missing <= 0:
+            return 0
+        if missing <= CHEAP_LIMIT:
+            page = _fetch_page(
+                symbol, self.interval, first, end, self.limiter, self.transport, None, self.metrics, limit=missing
+            )
+            return self.append(symbol, page)
+        # Catching up after downtime: regular paging.
+        pages = _iter_klines_pages(
+            symbol, self.interval, first, end, self.limiter, transport=self.transport, metrics=self.metrics
+        )
+        return sum(self.append(symbol, page) for page in pages)
+
+    def catch_up(self, symbols: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+        """Fetch the missing closed bars of ``symbols`` (default: all due) in one concurrent batch."""
+        symbols = self.due() if symbols is None else list(symbols)
+        results: Dict[str, Any] = {}
+        if not symbols:
+            return results
+        with ThreadPoolExecutor(max_workers=min(len(symbols), 16)) as pool:
+            futures = {s: pool.submit(self._fetch_missing, s) for s in symbols}
+        for s, fut in futures.items():
+            try:
+                results[s] = fut.result()
+            except Exception as e:  # keep following the other symbols
+                self.metrics.inc("follow_errors")
+                results[s] = e
+        return results
+
+    def poll_source(self, timeout: float) -> int:
+        """Append pushed bars for ``timeout`` seconds (then drain what is queued); returns rows added."""
+        if self.source is None:
+            return 0
+        added = 0
+        deadline = self.clock() + timeout
+        while True:
+            event = self.source.get(max(0.0, deadline - self.clock()))
+            if event is None:
+                return added
+            symbol, kline = event
+            if symbol in self.last_open_ms:
+                added += self.append(symbol, [kline])
+
+    def _next_wake(self) -> float:
+        now = self.clock()
+        forming = self._forming_open_ms() / 1000
+        boundary = forming + self.step / 1000
+        if self.source is not None:
+            # Pushed bars arrive on their own; REST only for what is still missing after grace.
+            return forming + self.grace if now < forming + self.grace else boundary + self.grace
+        if self.due() and now < forming + self.grace:
+            return now + self.retry  # not published yet
+        return boundary + self.lag
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Follow until ``stop`` is set (or KeyboardInterrupt), then close the sinks."""
+        stop = stop or threading.Event()
+        try:
+            while not stop.is_set():
+                self.catch_up()
+                wake = self._next_wake()
+                while not stop.is_set() and self.clock() < wake:
+                    remaining = wake - self.clock()
+                    if self.source is not None:
+                        self.poll_source(min(remaining, 1.0))
+                    else:
+                        stop.wait(remaining)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            for sink in self._sinks.values():
+                sink.close()
+            self._sinks = {}
+        if self.source is not None:
+            self.source.close()
+        if self._own_transport:
+            self.transport.close()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+In-process, range-aware cache of parsed bars for long-lived services.
+
+This module exposes:
+- FrameCache(max_bytes=256 MiB): bars per (symbol, interval, schema) with the
+  open-time spans they cover, evicting least recently used series over the cap.
+  - frame(symbol, start_date_str, end_date=None, interval="1d", schema=None, **fetch_kwargs)
+    -> pandas.DataFrame, like criptodata(return_df=True) but without output files
+  - columns(symbol, interval, start_ms, end_ms, schema=None, **fetch_kwargs) -> NumPy columns
+  - get(), missing() and put() for callers that fetch on their own.
+
+Notes (written content):
+- Each series keeps one set of sorted NumPy columns and the disjoint, merged
+  [start_ms, end_ms] spans of open times it holds every bar of. A request inside
+  the spans is a searchsorted slice of those columns: no request, no parsing,
+  no file. A partly covered request fetches only the holes (the uncovered
+  edges, or gaps between spans) and merges them in.
+- Only closed bars are cached: the spans stop one bar length (31 days for 1M)
+  before the clock, so the still-open bar and anything later is fetched again.
+- Size is the bytes of the stored columns; after each merge the least recently
+  used series are dropped until the total fits ``max_bytes``.
+- Cached arrays are read-only and slices are views of them; frame() copies them
+  into its DataFrame.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .extractor import INTERVAL_MS, TIMEFRAME_DEFAULT, _frame_from_columns, _iter_bar_columns, _window_ms
+from .metrics import NULL_METRICS
+from .schema import OHLCV, BarSchema
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+_MONTH_MS = 31 * 86_400_000
+
+Key = Tuple[str, str, BarSchema]
+Span = Tuple[int, int]
+
+
+class _Series:
+    __slots__ = ("cols", "spans", "nbytes")
+
+    def __init__(self, cols: Dict[str, np.ndarray], spans: List[Span]) -> None:
+        for col in cols.values():
+            col.flags.writeable = False
+        self.cols = cols
+        self.spans = spans
+        self.nbytes = sum(col.nbytes for col in cols.values())
+
+
+def _can_open(start_ms: int, end_ms: int) -> bool:
+    """Whether a bar can open in [start_ms, end_ms]; bars open on whole seconds."""
+    return -(-start_ms // 1000) * 1000 <= end_ms
+
+
+def _merge_spans(spans: List[Span]) -> List[Span]:
+    merged: List[Span] = []
+    for start, end in sorted(spans):
+        if merged and not _can_open(merged[-1][1] + 1, start - 1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _holes(spans: List[Span], start_ms: int, end_ms: int) -> List[Span]:
+    """Parts of [start_ms, end_ms] outside ``spans`` that a bar could open in."""
+    holes = []
+    cursor = start_ms
+    for s, e in spans:
+        if e < cursor:
+            continue
+        if s > end_ms:
+            break
+        if s > cursor:
+            holes.append((cursor, s - 1))
+        cursor = max(cursor, e + 1)
+    if cursor <= end_ms:
+        holes.append((cursor, end_ms))
+    return [(s, e) for s, e in holes if _can_open(s, e)]
+
+
+def _merge(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """One set of columns sorted by open time; a bar found in several parts keeps its last copy."""
+    times = np.concatenate([p["open_time"] for p in parts])
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+    order = order[np.append(sorted_times[1:] != sorted_times[:-1], True)]
+    return {name: np.concatenate([p[name] for p in parts])[order] for name in parts[0]}
+
+
+def _slice(cols: Dict[str, np.ndarray], start_ms: int, end_ms: int) -> Dict[str, np.ndarray]:
+    times = cols["open_time"]
+    lo, hi = np.searchsorted(times, start_ms, "left"), np.searchsorted(times, end_ms, "right")
+    return {name: col[lo:hi] for name, col in cols.items()}
+
+
+class FrameCache:
+    """Byte-bounded LRU of merged bar columns per symbol, interval and schema."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, clock: Callable[[], float] = time.time) -> None:
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._series: "OrderedDict[Key, _Series]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(s.nbytes for s in self._series.values())
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def get(
+        self, symbol: str, interval: str, start_ms: int, end_ms: int, schema: BarSchema = OHLCV
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """Columns of [start_ms, end_ms] if the cache covers all of it, else None."""
+        with self._lock:
+            series = self._series.get((symbol, interval, schema))
+            if series is None or _holes(series.spans, start_ms, end_ms):
+                return None
+            self._series.move_to_end((symbol, interval, schema))
+            return _slice(series.cols, start_ms, end_ms)
+
+    def missing(self, symbol: str, interval: str, start_ms: int, end_ms: int, schema: BarSchema = OHLCV) -> List[Span]:
+        """The parts of [start_ms, end_ms] not covered, in order."""
+        with self._lock:
+            series = self._series.get((symbol, interval, schema))
+            return _holes(series.spans if series else [], start_ms, end_ms)
+
+    def put(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        cols: Dict[str, np.ndarray],
+        schema: BarSchema = OHLCV,
+    ) -> None:
+        """
+        Merge ``cols``, every bar of [start_ms, end_ms], into the cache.
+
+        The span is cut to the bars that have closed; later bars are not stored.
+        """
+        closed = int(self.clock() * 1000) - INTERVAL_MS.get(interval, _MONTH_MS)
+        end_ms = min(end_ms, closed)
+        if end_ms < start_ms:
+            return
+        cols = _slice(cols, start_ms, end_ms)
+        key = (symbol, interval, schema)
+        with self._lock:
+            old = self._series.get(key)
+            if old is not None:
+                self._series[key] = _Series(_merge([old.cols, cols]), _merge_spans([*old.spans, (start_ms, end_ms)]))
+            else:
+                self._series[key] = _Series({name: np.array(col) for name, col in cols.items()}, [(start_ms, end_ms)])
+            self._series.move_to_end(key)
+            total = self.nbytes
+            while total > self.max_bytes and self._series:
+                total -= self._series.popitem(last=False)[1].nbytes
+
+    def columns(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        schema: Optional[BarSchema] = None,
+        **fetch_kwargs: Any,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Bars of [start_ms, end_ms], fetching only what the cache does not cover.
+
+        ``fetch_kwargs`` (limiter, transport, cache, page_workers, archive_dir,
+        metrics) go to the fetcher, as in criptodata().
+        """
+        schema = schema if schema is not None else OHLCV
+        metrics = fetch_kwargs.setdefault("metrics", NULL_METRICS)
+        cached = self.get(symbol, interval, start_ms, end_ms, schema)
+        if cached is not None:
+            metrics.inc("frame_cache_hits")
+            return cached
+        metrics.inc("frame_cache_misses")
+        fetched: List[Dict[str, np.ndarray]] = []
+        for hole_start, hole_end in self.missing(symbol, interval, start_ms, end_ms, schema):
+            chunks = _iter_bar_columns(symbol, interval, hole_start, hole_end, schema=schema, **fetch_kwargs)
+            cols = _slice(_merge([schema.empty(), *chunks]), hole_start, hole_end)
+            self.put(symbol, interval, hole_start, hole_end, cols, schema)
+            fetched.append(cols)
+        # Not everything may have stayed: bars still open, or a series evicted over the cap.
+        with self._lock:
+            series = self._series.get((symbol, interval, schema))
+            stored = _slice(series.cols, start_ms, end_ms) if series is not None else schema.empty()
+        return _merge([stored, *fetched])
+
+    def frame(
+        self,
+        symbol: str,
+        start_date_str: str,
+        end_date: Optional[date] = None,
+        interval: str = TIMEFRAME_DEFAULT,
+        schema: Optional[BarSchema] = None,
+        **fetch_kwargs: Any,
+    ) -> "pd.DataFrame":
+        """The bars criptodata(return_df=True) would return for the same window, served from memory when covered."""
+        if end_date is None:
+            end_date = date.today() - timedelta(days=1)
+        start_ms, end_ms = _window_ms(start_date_str, end_date)
+        return _frame_from_columns(self.columns(symbol, interval, start_ms, end_ms, schema, **fetch_kwargs))
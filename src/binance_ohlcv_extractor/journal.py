@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Crash-safe checkpoint journal for resumable extractions.
+
+This module exposes:
+- JOURNAL_NAME: the journal's file name inside an output directory.
+- Checkpoint(next_ms, end_ms, append, rows, pages, size, done): how far one
+  symbol/interval got, as last recorded.
+- Journal(path, resume=False, every=1.0): append-only JSON-lines log of a run;
+  begin(), due(), checkpoint(), done() and discard().
+
+Notes (written content):
+- Every record is one JSON line, flushed and fsynced before the call returns. A
+  line torn by a crash is ignored when the journal is read back, and a resumed
+  run starts from a compacted copy (one begin and one checkpoint per series).
+- criptodata(journal=...) checkpoints at most every ``every`` seconds per
+  symbol (0: after every page): the sink is flushed and fsynced first, then the
+  journal records the next open time to fetch, the rows and pages done and the
+  size of the partial output file. Nothing before a checkpoint is fetched or
+  written again on resume; at most ``every`` seconds of pages after it are.
+- Full runs write to ``{output}.part`` and rename it over the output on
+  success (see writers.py), so a crash never leaves a truncated output behind;
+  the .part file is what a resumed run truncates to the checkpointed size and
+  continues. Incremental runs append in place and are truncated the same way.
+- A run resumes only a symbol/interval whose begin parameters (window, writer,
+  schema, incremental) match the interrupted run; anything else starts over.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+JOURNAL_NAME = ".binance-ohlcv.journal"
+DEFAULT_EVERY = 1.0
+
+
+class Checkpoint(NamedTuple):
+    next_ms: int  # open time of the first bar not durably written
+    end_ms: int  # last open time of the (clamped) window
+    append: bool  # writing in place (incremental) rather than to a .part file
+    rows: int
+    pages: int
+    size: Optional[int]  # bytes of the partial output; None for writers without a single file
+    done: bool = False
+
+
+class Journal:
+    """Per-run progress log; with ``resume`` the progress of the previous run is loaded first."""
+
+    def __init__(
+        self, path: str, resume: bool = False, every: float = DEFAULT_EVERY, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.path = path
+        self.every = every
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._params: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._progress: Dict[Tuple[str, str], Checkpoint] = {}
+        self._last: Dict[Tuple[str, str], float] = {}
+        if resume and os.path.exists(path):
+            self._load()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # Start from a compacted copy of what was loaded: no torn tail to append after.
+        tmp = path + ".tmp"
+        self._fh = open(tmp, "w")
+        for (symbol, interval), params in self._params.items():
+            self._record(symbol, interval, "begin", params=params)
+            if (symbol, interval) in self._progress:
+                self._record(symbol, interval, "checkpoint", checkpoint=list(self._progress[(symbol, interval)]))
+        self._fh.close()
+        os.replace(tmp, path)
+        self._fh = open(path, "a")
+
+    def _load(self) -> None:
+        with open(self.path) as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                    key = (rec["symbol"], rec["interval"])
+                    if rec["event"] == "begin":
+                        if self._params.get(key) != rec["params"]:
+                            self._progress.pop(key, None)
+                        self._params[key] = rec["params"]
+                    elif rec["event"] in ("checkpoint", "done"):
+                        self._progress[key] = Checkpoint(*rec["checkpoint"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn or foreign line
+
+    def _record(self, symbol: str, interval: str, event: str, **fields: Any) -> None:
+        line = json.dumps({"symbol": symbol, "interval": interval, "event": event, **fields}, separators=(",", ":"))
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def begin(self, symbol: str, interval: str, params: Dict[str, Any]) -> Optional[Checkpoint]:
+        """
+        Record that ``symbol``/``interval`` starts with ``params`` (JSON values).
+
+        Returns the last checkpoint of an interrupted run with the same params,
+        or None when there is nothing to resume.
+        """
+        key = (symbol, interval)
+        params = json.loads(json.dumps(params))  # compare as read back from disk
+        previous = self._progress.get(key) if self._params.get(key) == params else None
+        self._params[key] = params
+        if previous is None:
+            self._progress.pop(key, None)
+        self._record(symbol, interval, "begin", params=params)
+        if previous is not None:
+            self._record(symbol, interval, "checkpoint", checkpoint=list(previous))
+        self._last[key] = self.clock()
+        return previous
+
+    def due(self, symbol: str, interval: str) -> bool:
+        """Whether ``every`` seconds have passed since the last checkpoint of symbol/interval."""
+        return self.clock() - self._last.get((symbol, interval), 0.0) >= self.every
+
+    def checkpoint(self, symbol: str, interval: str, progress: Checkpoint) -> None:
+        """Record ``progress``; the output must already be synced up to ``progress.size``."""
+        self._progress[(symbol, interval)] = progress
+        self._record(symbol, interval, "checkpoint", checkpoint=list(progress))
+        self._last[(symbol, interval)] = self.clock()
+
+    def done(self, symbol: str, interval: str, progress: Checkpoint) -> None:
+        """Record that the output of symbol/interval is complete and in place."""
+        progress = progress._replace(done=True)
+        self._progress[(symbol, interval)] = progress
+        self._record(symbol, interval, "done", checkpoint=list(progress))
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal, once every symbol of the run is complete."""
+        self.close()
+        os.remove(self.path)
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
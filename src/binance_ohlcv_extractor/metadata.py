@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Cached contract metadata from /fapi/v1/exchangeInfo.
+
+This module exposes:
+- SymbolInfo(symbol, status, onboard_ms, delivery_ms, contract_type): one contract.
+- SymbolMetadata(path=None, ttl=3600, transport=None, limiter=None, base_url=...): symbol ->
+  SymbolInfo, fetched once and refreshed when older than ``ttl`` seconds;
+  lifetime(symbol, interval) and clamp(symbol, interval, start_ms, end_ms).
+
+Notes (written content):
+- exchangeInfo costs one request (weight 1) for the whole exchange. With a
+  ``path`` the parsed table is kept on disk (written to a temp file and renamed)
+  and reused by later runs until it is ``ttl`` seconds old; if a refresh fails,
+  the stale table is used. Without a ``transport`` each refresh opens one to
+  ``base_url`` and closes it again.
+- A contract's bars lie between its onboard date and its delivery date; delisted
+  perpetuals carry the delisting time as delivery date, live ones a date in 2100.
+  clamp() cuts a requested range to that lifetime, so nothing is requested
+  before listing or after delisting, and returns None when no bar can exist.
+- The start is moved back to the open time of the bar containing the onboard
+  time: epoch-aligned intervals are floored, 1w and 1M start one bar earlier.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from .extractor import INTERVAL_MS
+from .ratelimit import USED_WEIGHT_HEADER, RateLimiter
+from .transport import DEFAULT_BASE_URL, HttpTransport
+
+EXCHANGE_INFO_PATH = "/fapi/v1/exchangeInfo"
+EXCHANGE_INFO_WEIGHT = 1
+DEFAULT_TTL = 3600.0
+# Intervals whose bars are not aligned to the epoch; the longest month bounds them.
+_UNALIGNED_MS = {"1w": 7 * 86_400_000, "1M": 31 * 86_400_000}
+
+
+class SymbolInfo(NamedTuple):
+    symbol: str
+    status: str  # TRADING, PENDING_TRADING, SETTLING, DELIVERING, DELIVERED, CLOSE, ...
+    onboard_ms: int
+    delivery_ms: int
+    contract_type: str  # PERPETUAL, CURRENT_QUARTER, ...
+
+
+def _parse_exchange_info(data: Dict[str, Any]) -> Dict[str, SymbolInfo]:
+    table = {}
+    for entry in data.get("symbols", []):
+        table[entry["symbol"]] = SymbolInfo(
+            entry["symbol"],
+            entry.get("status", ""),
+            int(entry.get("onboardDate", 0)),
+            int(entry.get("deliveryDate", 0)) or 2**62,
+            entry.get("contractType", ""),
+        )
+    return table
+
+
+class SymbolMetadata:
+    """exchangeInfo symbol table with a TTL, optionally persisted to ``path``."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        transport: Optional[HttpTransport] = None,
+        limiter: Optional[RateLimiter] = None,
+        clock: Callable[[], float] = time.time,
+        base_url: str = DEFAULT_BASE_URL,
+    ) -> None:
+        self.path = path
+        self.base_url = base_url
+        self.ttl = ttl
+        self.transport = transport
+        self.limiter = limiter
+        self.clock = clock
+        self.fetched_at = 0.0
+        self._symbols: Dict[str, SymbolInfo] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            try:
+                with open(path) as fh:
+                    stored = json.load(fh)
+                self._symbols = {s: SymbolInfo(*fields) for s, fields in stored["symbols"].items()}
+                self.fetched_at = float(stored["fetched_at"])
+            except (OSError, ValueError, KeyError, TypeError):
+                pass  # unreadable cache: refetched on first use
+
+    def refresh(self) -> None:
+        """Fetch exchangeInfo now and store it (at ``path`` too, if set)."""
+        transport = self.transport if self.transport is not None else HttpTransport(base_url=self.base_url, pool_size=1)
+        try:
+            if self.limiter is not None:
+                self.limiter.acquire(EXCHANGE_INFO_WEIGHT)
+            resp = transport.get(EXCHANGE_INFO_PATH)
+            if self.limiter is not None:
+                self.limiter.observe(resp.headers.get(USED_WEIGHT_HEADER))
+            resp.raise_for_status()
+            symbols = _parse_exchange_info(resp.json())
+        finally:
+            if self.transport is None:
+                transport.close()
+        self._symbols, self.fetched_at = symbols, self.clock()
+        if self.path:
+            payload = {"fetched_at": self.fetched_at, "symbols": {s: list(i) for s, i in symbols.items()}}
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as fh:
+                json.dump(payload, fh, separators=(",", ":"))
+            os.replace(tmp, self.path)
+
+    def _table(self) -> Dict[str, SymbolInfo]:
+        with self._lock:
+            if not self._symbols or self.clock() - self.fetched_at > self.ttl:
+                try:
+                    self.refresh()
+                except Exception:  # keep serving a stale table rather than none
+                    if not self._symbols:
+                        raise
+            return self._symbols
+
+    def get(self, symbol: str) -> Optional[SymbolInfo]:
+        """Metadata of ``symbol``, or None if exchangeInfo does not list it."""
+        return self._table().get(symbol)
+
+    def symbols(self, status: Optional[str] = "TRADING") -> Dict[str, SymbolInfo]:
+        """Every listed contract, or only those with ``status`` (None for all)."""
+        return {s: i for s, i in self._table().items() if status is None or i.status == status}
+
+    def lifetime(self, symbol: str, interval: str) -> Tuple[int, int]:
+        """Inclusive [first bar open, last bar open] bounds (ms) of ``symbol``'s bars."""
+        info = self.get(symbol)
+        if info is None:
+            raise ValueError(f"{symbol} is not listed in exchangeInfo")
+        if interval in _UNALIGNED_MS or interval not in INTERVAL_MS:
+            first = info.onboard_ms - _UNALIGNED_MS.get(interval, _UNALIGNED_MS["1M"]) + 1
+        else:
+            first = info.onboard_ms - info.onboard_ms % INTERVAL_MS[interval]
+        return max(0, first), info.delivery_ms - 1
+
+    def clamp(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> Optional[Tuple[int, int]]:
+        """[start_ms, end_ms] cut to the contract's lifetime, or None if no bar can fall inside."""
+        first, last = self.lifetime(symbol, interval)
+        start_ms, end_ms = max(start_ms, first), min(end_ms, last)
+        return (start_ms, end_ms) if start_ms <= end_ms else None
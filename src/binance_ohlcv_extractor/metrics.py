@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Run metrics for extractions: counters, phase timers and a request latency histogram.
+
+This module exposes:
+- RunMetrics(): thread-safe collector; inc(), observe_latency(), timer(phase);
+  to_dict()/to_json(path) for a run report and to_prometheus() for the text format.
+- NULL_METRICS: the default, a collector whose methods do nothing.
+
+Notes (written content):
+- criptodata() and the fetcher always call into a metrics object; passing none
+  means NULL_METRICS, so instrumentation costs a no-op method call when off.
+- Phase times are summed over all threads (fetch waits of concurrent symbols add
+  up), so compare them with each other rather than with the run's wall clock.
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, Optional, Tuple
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROM_PREFIX = "binance_ohlcv"
+
+
+class RunMetrics:
+    """Collects counters, per-phase seconds and request latencies for one run."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.counters: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextmanager
+    def _timed(self, phase: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(phase, time.perf_counter() - t)
+
+    def timer(self, phase: str) -> ContextManager[None]:
+        """Context manager adding the block's duration to ``phase``."""
+        return self._timed(phase)
+
+    def observe_latency(self, seconds: float) -> None:
+        i = 0
+        while i < len(LATENCY_BUCKETS) and seconds > LATENCY_BUCKETS[i]:
+            i += 1
+        with self._lock:
+            self.latency_counts[i] += 1
+            self.latency_sum += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            cumulative, running = [], 0
+            for count in self.latency_counts:
+                running += count
+                cumulative.append(running)
+            return {
+                "started_at": self.started_at,
+                "duration_s": round(time.time() - self.started_at, 6),
+                "counters": dict(self.counters),
+                "phases_s": {k: round(v, 6) for k, v in self.phases.items()},
+                "request_latency_s": {
+                    "buckets": {str(le): n for le, n in zip(LATENCY_BUCKETS + ("+Inf",), cumulative)},
+                    "sum": round(self.latency_sum, 6),
+                    "count": running,
+                },
+            }
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """Serialize the run report; also write it to ``path`` when given."""
+        text = json.dumps(self.to_dict(), indent=2, sort_keys=True)
+        if path:
+            with open(path, "w") as fh:
+                fh.write(text + "\n")
+        return text
+
+    def to_prometheus(self, path: Optional[str] = None) -> str:
+        """Prometheus text exposition format (e.g. for node_exporter's textfile collector)."""
+        report = self.to_dict()
+        lines = []
+        for name, value in sorted(report["counters"].items()):
+            metric = f"{PROM_PREFIX}_{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value:g}"]
+        metric = f"{PROM_PREFIX}_phase_seconds_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines += [f'{metric}{{phase="{k}"}} {v:g}' for k, v in sorted(report["phases_s"].items())]
+        metric = f"{PROM_PREFIX}_request_latency_seconds"
+        hist = report["request_latency_s"]
+        lines.append(f"# TYPE {metric} histogram")
+        lines += [f'{metric}_bucket{{le="{le}"}} {n}' for le, n in hist["buckets"].items()]
+        lines += [f"{metric}_sum {hist['sum']:g}", f"{metric}_count {hist['count']}"]
+        text = "\n".join(lines) + "\n"
+        if path:
+            with open(path, "w") as fh:
+                fh.write(text)
+        return text
+
+
+class NullMetrics(RunMetrics):
+    """Drop-in RunMetrics that records nothing."""
+
+    def inc(self, name: str, value: float = 1) -> None:
+        pass
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        pass
+
+    def timer(self, phase: str) -> ContextManager[None]:
+        return nullcontext()
+
+    def observe_latency(self, seconds: float) -> None:
+        pass
+
+
+NULL_METRICS = NullMetrics()
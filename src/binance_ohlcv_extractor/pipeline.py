@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Pipelined extraction: fetch threads feeding worker processes that parse and write.
+
+This module exposes:
+- run_pipeline(symbols, start_date_str, end_date=None, interval="1d", output_dir=".",
+               writer=None, incremental=False, io_workers=8, processes=None, ...)
+  -> {symbol: rows written, or the exception that symbol failed with}
+
+Notes (written content):
+- ``io_workers`` threads download symbols (the pages of one symbol in order) and
+  hand the undecoded response bodies to ``processes`` worker processes, which
+  parse them straight from bytes and write them through ``writer``. Parsing,
+  filtering and formatting, the CPU-bound part of a large backfill, so run on
+  every core while the threads keep the request budget busy.
+- Bodies travel through one shared-memory block cut into ``slots`` slots of
+  SLOT_BYTES: a thread copies a body into a free slot and queues only
+  (symbol, slot, length); the worker copies it out and frees the slot. Threads
+  wait for a free slot, so at most ``slots`` pages sit between the stages
+  (backpressure) and memory stays bounded however far the network runs ahead.
+  A body larger than a slot is pickled through the queue instead, still holding a slot.
+- Each symbol is bound to one worker, which keeps its sink open, so the pages of
+  a symbol are written in order by a single process; across many symbols (a
+  full-universe backfill) the work spreads over all workers.
+- Output, window filtering and incremental mode are those of
+  criptodata(return_df=False). Archives and resampling are not supported here.
+- Workers are started with the "spawn" method: nothing is forked from a process
+  that already runs threads, and the same code path runs on Linux and macOS.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from .cache import PageCache
+from .extractor import (
+    INTERVAL_MS,
+    MAX_LIMIT,
+    TIMEFRAME_DEFAULT,
+    _Extraction,
+    _fetch_page,
+    _parse_klines_columns,
+    _plan_windows,
+)
+from .metadata import SymbolMetadata
+from .metrics import NULL_METRICS, RunMetrics
+from .ratelimit import RateLimiter
+from .schema import BarSchema
+from .transport import HttpTransport
+from .writers import CsvWriter, Writer
+
+# A 1000-bar klines page is about 150 KB of JSON.
+SLOT_BYTES = 256 * 1024
+DEFAULT_IO_WORKERS = 8
+
+
+def _last_open_time(page: Union[bytes, List[list]]) -> Optional[int]:
+    """Open time of the last kline of a raw or decoded page; None if it is empty."""
+    if not isinstance(page, bytes):
+        return int(page[-1][0]) if page else None
+    i = page.rfind(b"[")
+    if i <= 0:  # only the outer bracket: "[]"
+        return None
+    return int(page[i + 1 : page.index(b",", i)])
+
+
+def _iter_raw_pages(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: HttpTransport,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> Iterator[bytes]:
+    """
+    Undecoded pages of [start_ts_ms, end_ts_ms].
+
+    With a ``cache`` fixed-length intervals are paged over grid-aligned windows
+    (see _plan_windows), as _iter_klines_pages does, so overlapping runs share
+    cached pages; the worker drops the bars before the run's start.
+    """
+    if cache is None or interval not in INTERVAL_MS:
+        yield from _iter_raw_range(symbol, interval, start_ts_ms, end_ts_ms, limiter, transport, cache, metrics)
+        return
+    for w_start, w_end in _plan_windows(interval, start_ts_ms, end_ts_ms, aligned=True):
+        yield from _iter_raw_range(symbol, interval, w_start, w_end, limiter, transport, cache, metrics)
+
+
+def _iter_raw_range(
+    symbol: str,
+    interval: str,
+    start_ts_ms: int,
+    end_ts_ms: int,
+    limiter: RateLimiter,
+    transport: HttpTransport,
+    cache: Optional[PageCache] = None,
+    metrics: RunMetrics = NULL_METRICS,
+) -> Iterator[bytes]:
+    """_iter_range_pages yielding undecoded bodies; the next start is read from the last row's bytes."""
+    step = INTERVAL_MS.get(interval)
+    next_start = start_ts_ms
+    while next_start <= end_ts_ms:
+        page = _fetch_page(symbol, interval, next_start, end_ts_ms, limiter, transport, cache, metrics, raw=True)
+        last = _last_open_time(page)
+        if last is None:
+            break
+        if not isinstance(page, bytes):  # served decoded from the page cache
+            rows = len(page)
+            page = json.dumps(page, separators=(",", ":")).encode()
+        else:
+            rows = page.count(b"[") - 1
+        yield page
+        if step is None and rows < MAX_LIMIT:
+            break
+        next_start = last + (step or 1)
+
+
+def _worker(shm_name: str, inbox: Any, free: Any, results: Any) -> None:
+    """
+    Worker process loop: open, page, close/abort and stop messages from ``inbox``.
+
+    Every opened symbol is answered on ``results`` with (symbol, rows or
+    exception, counters, phases) once it is closed or aborted.
+    """
+    shm = SharedMemory(name=shm_name)
+    runs: Dict[str, _Extraction] = {}
+    errors: Dict[str, Exception] = {}
+    try:
+        while True:
+            msg = inbox.get()
+            kind, symbol = msg[0], msg[1]
+            if kind == "stop":
+                return
+            if kind == "open":
+                try:
+                    run = _Extraction(
+                        symbol, *msg[2], return_df=False, resample_to=None, metrics=RunMetrics(), schema=msg[3]
+                    )
+                    run.open()
+                    runs[symbol] = run
+                except Exception as e:
+                    errors[symbol] = e
+            elif kind == "page":
+                slot, size, body = msg[2], msg[3], msg[4]
+                if body is None:
+                    body = bytes(shm.buf[slot * SLOT_BYTES : slot * SLOT_BYTES + size])
+                free.put(slot)
+                run = runs.get(symbol)
+                if run is None:
+                    continue
+                try:
+                    with run.metrics.timer("parse"):
+                        cols = _parse_klines_columns(body, run.schema)
+                    run.metrics.inc("rows_parsed", len(cols["open_time"]))
+                    run.feed(cols)
+                except Exception as e:
+                    errors[symbol] = e
+                    runs.pop(symbol).close(ok=False)
+            else:  # "close" or "abort"
+                run = runs.pop(symbol, None)
+                result: Any = errors.pop(symbol, None)
+                counters: Dict[str, float] = {}
+                phases: Dict[str, float] = {}
+                if run is not None:
+                    try:
+                        if kind == "close":
+                            run.finish()
+                    except Exception as e:
+                        result = e
+                    finally:
+                        run.close(ok=kind == "close" and result is None)
+                    counters, phases = run.metrics.counters, run.metrics.phases
+                    if result is None:
+                        result = run.rows
+                results.put((symbol, result, counters, phases))
+    finally:
+        for run in runs.values():
+            run.close(ok=False)
+        shm.close()
+
+
+def run_pipeline(
+    symbols: Sequence[str],
+    start_date_str: str,
+    end_date: Optional[date] = None,
+    interval: str = TIMEFRAME_DEFAULT,
+    output_dir: str = ".",
+    writer: Optional[Writer] = None,
+    incremental: bool = False,
+    io_workers: int = DEFAULT_IO_WORKERS,
+    processes: Optional[int] = None,
+    slots: Optional[int] = None,
+    limiter: Optional[RateLimiter] = None,
+    transport: Optional[HttpTransport] = None,
+    cache: Optional[PageCache] = None,
+    metrics: Optional[RunMetrics] = None,
+    on_done: Optional[Callable[[str, Any], None]] = None,
+    schema: Optional[BarSchema] = None,
+    metadata: Optional[SymbolMetadata] = None,
+) -> Dict[str, Any]:
+    """
+    Extract ``symbols`` with ``io_workers`` fetch threads and ``processes`` parse/write processes.
+
+    Arguments shared with criptodata() mean the same. ``processes`` defaults to
+    the number of CPUs and ``slots`` (pages buffered between the stages) to
+    2 * (io_workers + processes). Returns rows written per symbol, or the
+    exception that symbol failed with; ``on_done(symbol, result)`` is called as
+    each one finishes.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    processes = max(1, processes or os.cpu_count() or 1)
+    slots = slots or 2 * (io_workers + processes)
+    writer = writer if writer is not None else CsvWriter()
+    limiter = limiter if limiter is not None else RateLimiter()
+    metrics = metrics if metrics is not None else NULL_METRICS
+    own_transport = transport is None
+    if transport is None:
+        transport = HttpTransport(pool_size=max(4, io_workers))
+
+    ctx = mp.get_context("spawn")
+    shm = SharedMemory(create=True, size=slots * SLOT_BYTES)
+    free = ctx.Queue()
+    for slot in range(slots):
+        free.put(slot)
+    done_q = ctx.Queue()
+    inboxes = [ctx.Queue() for _ in range(processes)]
+    procs = [
+        ctx.Process(target=_worker, args=(shm.name, inbox, free, done_q), daemon=True) for inbox in inboxes
+    ]
+    for proc in procs:
+        proc.start()
+    broken = threading.Event()
+    fetch_errors: Dict[str, Exception] = {}
+
+    def take_slot() -> int:
+        while True:
+            try:
+                return free.get(timeout=0.5)
+            except queue.Empty:
+                if broken.is_set():
+                    raise RuntimeError("pipeline worker process exited") from None
+
+    def fetch(i: int, symbol: str) -> None:
+        args = (start_date_str, end_date, interval, output_dir, incremental, writer)
+        try:
+            run = _Extraction(symbol, *args, return_df=False, resample_to=None, metrics=None, metadata=metadata)
+        except Exception as e:
+            done_q.put((symbol, e, {}, {}))
+            return
+        if run.up_to_date:
+            done_q.put((symbol, 0, {}, {}))
+            return
+        inbox = inboxes[i % processes]
+        inbox.put(("open", symbol, args, schema))
+        try:
+            for page in _iter_raw_pages(
+                symbol, interval, run.start_ms, run.end_ms, limiter, transport, cache, metrics
+            ):
+                slot = take_slot()
+                if len(page) <= SLOT_BYTES:
+                    shm.buf[slot * SLOT_BYTES : slot * SLOT_BYTES + len(page)] = page
+                    inbox.put(("page", symbol, slot, len(page), None))
+                else:
+                    inbox.put(("page", symbol, slot, len(page), page))
+        except Exception as e:
+            fetch_errors[symbol] = e
+            inbox.put(("abort", symbol))
+        else:
+            inbox.put(("close", symbol))
+
+    results: Dict[str, Any] = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(io_workers, len(symbols) or 1))) as pool:
+            futures = [pool.submit(fetch, i, s) for i, s in enumerate(symbols)]
+            try:
+                while len(results) < len(symbols):
+                    try:
+                        symbol, result, counters, phases = done_q.get(timeout=0.5)
+                    except queue.Empty:
+                        if not all(proc.is_alive() for proc in procs):
+                            raise RuntimeError("pipeline worker process exited") from None
+                        continue
+                    result = fetch_errors.get(symbol, result)
+                    for name, value in counters.items():
+                        metrics.inc(name, value)
+                    for phase, seconds in phases.items():
+                        metrics.add_time(phase, seconds)
+                    results[symbol] = result
+                    if on_done is not None:
+                        on_done(symbol, result)
+            except BaseException:
+                broken.set()
+                for fut in futures:
+                    fut.cancel()
+                raise
+    finally:
+        for inbox in inboxes:
+            inbox.put(("stop", ""))
+        for proc in procs:
+            proc.join(timeout=10)
+            if proc.is_alive():
+                proc.terminate()
+        shm.close()
+        shm.unlink()
+        if own_transport:
+            transport.close()
+    return results
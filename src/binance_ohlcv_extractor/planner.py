@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Job manifests: many (symbol, interval, start, end) requests planned as one run.
+
+This module exposes:
+- Job(symbol, interval, start, end): one requested range (dates, inclusive).
+- load_manifest(path) -> [Job] from a JSON or YAML file; parse_manifest(data) for decoded data.
+- coalesce(jobs) -> [Job] with overlapping and adjacent ranges merged per symbol/interval.
+- estimate_weight(job, metadata=None) -> (pages, request weight) the REST fetcher will spend on it.
+- plan_jobs(jobs, weight_limit=2400, metadata=None) -> Plan: coalesced series ordered by
+  cost, with an ETA and the jobs skipped as dead.
+- run_plan(plan, output_dir=".", workers=1, writer=None, **fetch_kwargs) -> {(symbol, interval): rows}
+
+Notes (written content):
+- A manifest is a list of jobs, or {"jobs": [...]}. Each job has "symbol" (or a
+  "symbols" list), "interval" (or "intervals"), "start" and optionally "end"
+  (YYYY-MM-DD, default yesterday); lists expand to every combination.
+- Ranges are whole UTC days, so two ranges merge when they overlap or the second
+  starts the day after the first ends. Disjoint ranges of the same symbol and
+  interval stay separate but run as one series into one output, in order, so
+  no bar is requested twice in a run.
+- Series run heaviest first (longest-processing-time order) on ``workers``
+  threads sharing one RateLimiter, so the big downloads start at once and the
+  small ones fill the tail; the ETA is total weight over the weight budget.
+- With ``metadata`` (a SymbolMetadata built from exchangeInfo) every range is
+  cut to the contract's lifetime before it is costed, ranges no bar can fall in
+  (not listed yet, delisted, unknown symbol) are skipped, and each planned page
+  is a request the run will make.
+- YAML needs PyYAML (pip install "binance-ohlcv-extractor[yaml]"), imported only
+  for .yaml/.yml manifests.
+"""
+
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .extractor import INTERVAL_MS, MAX_LIMIT, _iter_bar_columns, _plan_windows, _window_ms
+from .metadata import SymbolMetadata
+from .ratelimit import WEIGHT_LIMIT_1M, RateLimiter, klines_weight
+from .writers import CsvWriter, Writer
+
+
+class Job(NamedTuple):
+    symbol: str
+    interval: str
+    start: date
+    end: date
+
+
+class Series(NamedTuple):
+    """Disjoint, sorted ranges of one symbol and interval, fetched as one task."""
+
+    symbol: str
+    interval: str
+    ranges: List[Tuple[date, date]]
+    pages: int
+    weight: int
+    spans: List[Tuple[int, int]]  # the ranges in ms, cut to the contract lifetime when known
+
+
+class Plan(NamedTuple):
+    series: List[Series]
+    requested: int  # jobs before coalescing
+    total_weight: int
+    eta_seconds: float
+    skipped: List[Tuple[Job, str]]  # coalesced jobs left out, with the reason
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def _as_list(entry: Dict[str, Any], one: str, many: str) -> List[str]:
+    if many in entry:
+        return list(entry[many])
+    if one in entry:
+        return [entry[one]]
+    raise ValueError(f"Manifest job needs {one!r} or {many!r}: {entry}")
+
+
+def parse_manifest(data: Any) -> List[Job]:
+    """Jobs from already-decoded manifest data (see module notes for the layout)."""
+    entries = data.get("jobs", []) if isinstance(data, dict) else data
+    yesterday = date.today() - timedelta(days=1)
+    jobs = []
+    for entry in entries:
+        start = _as_date(entry["start"])
+        end = _as_date(entry["end"]) if entry.get("end") else yesterday
+        if end < start:
+            raise ValueError(f"Manifest job ends before it starts: {entry}")
+        for symbol in _as_list(entry, "symbol", "symbols"):
+            for interval in _as_list(entry, "interval", "intervals"):
+                jobs.append(Job(symbol.upper(), interval, start, end))
+    return jobs
+
+
+def load_manifest(path: str) -> List[Job]:
+    """Read a JSON or (by extension) YAML manifest."""
+    with open(path) as fh:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:  # pragma: no cover - depends on the environment
+                raise ImportError(
+                    "YAML manifests require PyYAML: pip install 'binance-ohlcv-extractor[yaml]'"
+                ) from e
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    return parse_manifest(data)
+
+
+def coalesce(jobs: Iterable[Job]) -> List[Job]:
+    """Merge overlapping or adjacent ranges of the same symbol and interval."""
+    merged: List[Job] = []
+    for job in sorted(jobs):
+        last = merged[-1] if merged else None
+        if (
+            last is not None
+            and (last.symbol, last.interval) == (job.symbol, job.interval)
+            and job.start <= last.end + timedelta(days=1)
+        ):
+            merged[-1] = last._replace(end=max(last.end, job.end))
+        else:
+            merged.append(job)
+    return merged
+
+
+def _job_span(job: Job, metadata: Optional[SymbolMetadata] = None) -> Optional[Tuple[int, int]]:
+    """``job``'s range in ms, cut to the contract lifetime with ``metadata``; None if empty."""
+    start_ms, end_ms = _window_ms(job.start.isoformat(), job.end)
+    if metadata is None:
+        return start_ms, end_ms
+    return metadata.clamp(job.symbol, job.interval, start_ms, end_ms)
+
+
+def _span_pages(interval: str, start_ms: int, end_ms: int) -> int:
+    if interval in INTERVAL_MS:
+        return len(_plan_windows(interval, start_ms, end_ms))
+    # 1M: about 30.4 days per bar
+    return max(1, math.ceil((end_ms - start_ms) / (30.4 * 86_400_000) / MAX_LIMIT))
+
+
+def estimate_weight(job: Job, metadata: Optional[SymbolMetadata] = None) -> Tuple[int, int]:
+    """Pages and request weight to fetch ``job`` from REST (no cache or archives)."""
+    span = _job_span(job, metadata)
+    pages = _span_pages(job.interval, *span) if span is not None else 0
+    return pages, pages * klines_weight(MAX_LIMIT)
+
+
+def plan_jobs(
+    jobs: Iterable[Job], weight_limit: int = WEIGHT_LIMIT_1M, metadata: Optional[SymbolMetadata] = None
+) -> Plan:
+    """Coalesce ``jobs`` into one series per symbol/interval, heaviest first."""
+    jobs = list(jobs)
+    grouped: Dict[Tuple[str, str], List[Tuple[Job, Tuple[int, int]]]] = {}
+    skipped: List[Tuple[Job, str]] = []
+    for job in coalesce(jobs):
+        try:
+            span = _job_span(job, metadata)
+        except ValueError as e:  # unknown symbol
+            skipped.append((job, str(e)))
+            continue
+        if span is None:
+            assert metadata is not None
+            info = metadata.get(job.symbol)
+            skipped.append((job, f"no bars in range ({info.status if info else 'unlisted'} contract)"))
+            continue
+        grouped.setdefault((job.symbol, job.interval), []).append((job, span))
+    series = []
+    for (symbol, interval), parts in grouped.items():
+        pages = [_span_pages(interval, *span) for _, span in parts]
+        series.append(
+            Series(
+                symbol,
+                interval,
+                [(j.start, j.end) for j, _ in parts],
+                sum(pages),
+                sum(pages) * klines_weight(MAX_LIMIT),
+                [span for _, span in parts],
+            )
+        )
+    series.sort(key=lambda s: (-s.weight, s.symbol, s.interval))
+    total = sum(s.weight for s in series)
+    return Plan(series, len(jobs), total, total / (weight_limit / 60.0), skipped)
+
+
+def _run_series(series: Series, output_dir: str, writer: Writer, **fetch_kwargs: Any) -> int:
+    """Fetch every range of ``series`` in order into one output; returns rows written."""
+    rows = 0
+    out = writer.derived_dir(output_dir, series.interval)
+    with writer.open(out, series.symbol, series.interval) as sink:
+        for start_ms, end_ms in series.spans:
+            for cols in _iter_bar_columns(series.symbol, series.interval, start_ms, end_ms, **fetch_kwargs):
+                keep = (cols["open_time"] >= start_ms) & (cols["open_time"] <= end_ms)
+                if keep.any():
+                    sink.write_columns({name: col[keep] for name, col in cols.items()})
+                    rows += int(keep.sum())
+    return rows
+
+
+def run_plan(
+    plan: Plan,
+    output_dir: str = ".",
+    workers: int = 1,
+    writer: Optional[Writer] = None,
+    limiter: Optional[RateLimiter] = None,
+    on_done: Optional[Callable[[Series, Any], None]] = None,
+    **fetch_kwargs: Any,
+) -> Dict[Tuple[str, str], Any]:
+    """
+    Execute ``plan`` on ``workers`` threads sharing ``limiter``.
+
+    Each symbol/interval goes to writer.derived_dir(output_dir, interval), e.g.
+    ``{output_dir}/1h/BTCUSDT.csv`` for CSV. ``fetch_kwargs`` (transport, cache,
+    page_workers, archive_dir, metrics) go to the fetcher. Returns rows written
+    per (symbol, interval), or the exception that series failed with;
+    ``on_done(series, result)`` is called as each one finishes.
+    """
+    writer = writer if writer is not None else CsvWriter()
+    limiter = limiter if limiter is not None else RateLimiter()
+    results: Dict[Tuple[str, str], Any] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plan.series) or 1))) as pool:
+        futures = {
+            pool.submit(_run_series, s, output_dir, writer, limiter=limiter, **fetch_kwargs): s for s in plan.series
+        }
+        for fut in as_completed(futures):
+            s = futures[fut]
+            try:
+                result: Any = fut.result()
+            except Exception as e:
+                result = e
+            results[(s.symbol, s.interval)] = result
+            if on_done is not None:
+                on_done(s, result)
+    return results
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Request-weight budget shared by every fetch in a run.
+
+This module exposes:
+- klines_weight(limit) -> int: request weight Binance charges for /fapi/v1/klines.
+- RateLimiter(weight_limit=2400, burst=None): thread-safe token bucket; call
+  acquire(weight) (or await acquire_async(weight)) before each request and
+  observe()/pause() with the response.
+
+Notes (written content):
+- Binance meters USDT-M futures REST traffic per IP as request weight per minute
+  and reports the running total in the X-MBX-USED-WEIGHT-1M header.
+- One instance can be handed to several criptodata() calls running on different
+  threads; they then share a single budget instead of each pacing itself.
+- reserve() never blocks, so threads and asyncio tasks can share one instance:
+  acquire() sleeps the thread, acquire_async() only suspends the task.
+- 429 means the budget was exceeded, 418 that the IP is temporarily banned; both
+  carry Retry-After, which the fetcher hands to pause() so every caller waits.
+"""
+
+import threading
+import time
+from typing import Optional
+
+WEIGHT_LIMIT_1M = 2400
+USED_WEIGHT_HEADER = "X-MBX-USED-WEIGHT-1M"
+
+
+def klines_weight(limit: int) -> int:
+    """Weight of one klines request for a given ``limit`` (futures API table)."""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at ``weight_limit`` weight per minute.
+
+    ``burst`` caps how much unused budget may accumulate (default: six seconds'
+    worth), so a run that starts cold cannot spend a whole minute in one spike.
+    Reservations are made under a lock and callers sleep outside it; the bucket
+    may go negative, which simply queues later callers behind earlier ones.
+    """
+
+    def __init__(self, weight_limit: int = WEIGHT_LIMIT_1M, burst: Optional[float] = None) -> None:
+        if weight_limit <= 0:
+            raise ValueError("weight_limit must be > 0")
+        self.weight_limit = weight_limit
+        self.rate = weight_limit / 60.0
+        self.burst = float(burst) if burst is not None else self.rate * 6
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._paused_until = 0.0
+
+    def reserve(self, weight: int = 1) -> float:
+        """Reserve ``weight`` from the budget and return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= weight
+            wait = max(0.0, self._paused_until - now)
+            if self._tokens < 0:
+                wait = max(wait, -self._tokens / self.rate)
+            return wait
+
+    def acquire(self, weight: int = 1) -> None:
+        """Block until a request of ``weight`` fits in the budget."""
+        wait = self.reserve(weight)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, weight: int = 1) -> None:
+        """Like acquire(), but waits with asyncio.sleep so the event loop keeps running."""
+        import asyncio  # not needed (nor imported) by blocking callers
+
+        wait = self.reserve(weight)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def observe(self, used_weight: Optional[str]) -> None:
+        """
+        Reconcile with the exchange's X-MBX-USED-WEIGHT-1M counter.
+
+        Other processes on the same IP spend the same budget; once the reported
+        usage nears the cap, everyone waits for the next minute window.
+        """
+        if not used_weight:
+            return
+        try:
+            used = int(used_weight)
+        except ValueError:
+            return
+        if used >= self.weight_limit * 0.95:
+            wall = time.time()
+            self.pause(60.0 - wall % 60.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back all reservations for at least ``seconds`` from now (e.g. Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Local multi-timeframe resampling of fetched bars.
+
+This module exposes:
+- bucket_open_times(open_times_ms, interval) -> open time of the target bar of each row.
+- resample_ohlcv(df, interval) -> DataFrame of higher-interval bars.
+- ResampleSink(target, base, interval, start_ms, end_ms): a writer Sink that aggregates
+  streamed base chunks and forwards only complete target bars.
+
+Notes (written content):
+- Buckets follow the exchange: minute/hour/day (and 3d) bars are aligned to the
+  UTC epoch, weekly bars open on Monday 00:00 UTC and monthly bars on the 1st.
+- Aggregation is first open, max high, min low, last close and summed volume
+  (with the full schema: last close_time, the other fields summed), computed with ufunc.reduceat over sorted rows (no Python loop per bucket).
+- A target bar is emitted only if the requested window covers all of it, so the
+  output holds the same closed bars the exchange would return for that interval.
+"""
+
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .extractor import INTERVAL_MS
+from .writers import Sink
+
+# 1970-01-01 was a Thursday; Binance weeks start on Monday 1970-01-05.
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+AGGREGATIONS = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+    "close_time": "last",
+}
+
+
+def check_resample(base: str, target: str) -> None:
+    """Raise ValueError unless ``target`` bars are whole multiples of ``base`` bars."""
+    if base not in INTERVAL_MS:
+        raise ValueError(f"Cannot resample from {base!r}: base interval must have a fixed length")
+    step = INTERVAL_MS[base]
+    if target == "1M":
+        ok = 86_400_000 % step == 0
+    else:
+        ok = target in INTERVAL_MS and INTERVAL_MS[target] % step == 0 and INTERVAL_MS[target] > step
+    if not ok:
+        raise ValueError(f"Cannot build {target!r} bars from {base!r} bars")
+
+
+def bucket_open_times(open_times_ms: np.ndarray, interval: str) -> np.ndarray:
+    """Open time (ms) of the ``interval`` bar each open time falls into."""
+    t = np.asarray(open_times_ms, dtype=np.int64)
+    if interval == "1M":
+        return t.astype("datetime64[ms]").astype("datetime64[M]").astype("datetime64[ms]").astype(np.int64)
+    step = INTERVAL_MS[interval]
+    offset = WEEK_OFFSET_MS if interval == "1w" else 0
+    return t - (t - offset) % step
+
+
+def bucket_end_ms(bucket_open_ms: np.ndarray, interval: str) -> np.ndarray:
+    """Exclusive end (ms) of each bucket, i.e. the next bar's open time."""
+    t = np.asarray(bucket_open_ms, dtype=np.int64)
+    if interval == "1M":
+        return (t.astype("datetime64[ms]").astype("datetime64[M]") + 1).astype("datetime64[ms]").astype(np.int64)
+    return t + INTERVAL_MS[interval]
+
+
+def _aggregate(df: pd.DataFrame, keys: np.ndarray) -> pd.DataFrame:
+    """Reduce consecutive rows sharing a key (df sorted by time) into one bar per key."""
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)] - 1
+    out = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        how = AGGREGATIONS.get(col, "sum")
+        if how == "first":
+            out[col] = values[starts]
+        elif how == "last":
+            out[col] = values[ends]
+        elif how == "max":
+            out[col] = np.maximum.reduceat(values, starts)
+        elif how == "min":
+            out[col] = np.minimum.reduceat(values, starts)
+        else:
+            out[col] = np.add.reduceat(values, starts)
+    index = pd.DatetimeIndex(keys[starts] * 1_000_000, dtype="datetime64[ns, UTC]", name=df.index.name)
+    return pd.DataFrame(out, index=index)
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregate a Date-indexed OHLCV frame into ``interval`` bars.
+
+    Every bucket that has at least one row is returned, including partially
+    covered buckets at either edge.
+    """
+    if df.empty:
+        return df.copy()
+    keys = bucket_open_times(df.index.as_unit("ms").asi8, interval)
+    return _aggregate(df, keys)
+
+
+class ResampleSink(Sink):
+    """
+    Aggregate streamed base chunks into ``interval`` bars for another sink.
+
+    The newest, possibly unfinished bucket is carried over to the next chunk, so
+    only one target bar's worth of base rows is held in memory.
+    """
+
+    def __init__(self, target: Sink, base: str, interval: str, start_ms: int, end_ms: int) -> None:
+        self.target = target
+        self.base_step = INTERVAL_MS[base]
+        self.interval = interval
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self._carry: Optional[pd.DataFrame] = None
+
+    def _emit(self, df: pd.DataFrame, keys: np.ndarray) -> None:
+        bars = _aggregate(df, keys)
+        opens = bars.index.as_unit("ms").asi8
+        # Whole = the first and the last base bar of the bucket both lie in the window.
+        whole = (opens >= self.start_ms) & (bucket_end_ms(opens, self.interval) - self.base_step <= self.end_ms)
+        if whole.any():
+            self.target.write(bars[whole])
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        if self._carry is not None:
+            df = pd.concat([self._carry, df])
+        keys = bucket_open_times(df.index.as_unit("ms").asi8, self.interval)
+        split = int(np.searchsorted(keys, keys[-1]))
+        if split:
+            self._emit(df.iloc[:split], keys[:split])
+        self._carry = df.iloc[split:]
+
+    def close(self) -> None:
+        if self._carry is not None and not self._carry.empty:
+            self._emit(self._carry, bucket_open_times(self._carry.index.as_unit("ms").asi8, self.interval))
+        self._carry = None
+        self.target.close()
+
+    def abort(self) -> None:
+        self._carry = None
+        self.target.abort()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Bar schemas: which kline fields are kept, and in which dtypes.
+
+This module exposes:
+- BarSchema(full=False, float32=False): the columns and dtypes produced by the parsers.
+- OHLCV, FULL, COMPACT: open_time + OHLCV in float64 (the default); every kline
+  field; every kline field with float32 prices and volumes.
+- get_schema(name) -> BarSchema for "ohlcv", "full" or "compact".
+- schema_of(names, float_dtype) -> the schema a set of stored columns was written with.
+
+Notes (written content):
+- Times are int64 epoch milliseconds (open_time, close_time) and the trade count
+  is int32. Prices and volumes are float64 unless ``float32`` is set; float32
+  keeps about 7 significant digits, enough for exchange ticks and lot sizes in
+  memory, but CSV output then shows the stored float32 values (e.g. 0.10000000149).
+- A bar takes 48 bytes as OHLCV, 84 bytes with every field and 52 bytes in the
+  compact schema, which keeps all fields in about 60% of the full float64 size.
+- Columns are always laid out in KLINE_FIELDS order, so writers can serialize
+  whatever schema they are handed without being told which one it is.
+"""
+
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+import numpy as np
+
+# Field order of a /fapi/v1/klines row (the 12th field is unused and never kept).
+KLINE_FIELDS: Tuple[str, ...] = (
+    "open_time",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "close_time",
+    "quote_volume",
+    "trades",
+    "taker_buy_volume",
+    "taker_buy_quote_volume",
+)
+TIME_FIELDS = ("open_time", "close_time")
+INT_FIELDS = ("trades",)
+
+
+class BarSchema(NamedTuple):
+    full: bool = False  # keep every kline field, not only OHLCV
+    float32: bool = False  # prices and volumes as float32 instead of float64
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """Every column, open_time first, in KLINE_FIELDS order."""
+        return KLINE_FIELDS if self.full else KLINE_FIELDS[:6]
+
+    def dtype(self, name: str) -> np.dtype:
+        if name in TIME_FIELDS:
+            return np.dtype(np.int64)
+        if name in INT_FIELDS:
+            return np.dtype(np.int32)
+        return np.dtype(np.float32 if self.float32 else np.float64)
+
+    def record_dtype(self) -> np.dtype:
+        """Packed little-endian record of one bar (the .bars file layout)."""
+        return np.dtype([(name, self.dtype(name).newbyteorder("<")) for name in self.fields])
+
+    def empty(self) -> Dict[str, np.ndarray]:
+        """Zero-length columns of this schema."""
+        return {name: np.empty(0, dtype=self.dtype(name)) for name in self.fields}
+
+    def from_matrix(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """Typed columns from a float64 matrix whose columns follow KLINE_FIELDS."""
+        return {
+            name: np.ascontiguousarray(values[:, i], dtype=self.dtype(name))
+            for i, name in enumerate(self.fields)
+        }
+
+
+OHLCV = BarSchema()
+FULL = BarSchema(full=True)
+COMPACT = BarSchema(full=True, float32=True)
+SCHEMAS: Dict[str, BarSchema] = {"ohlcv": OHLCV, "full": FULL, "compact": COMPACT}
+
+
+def get_schema(name: str) -> BarSchema:
+    """The schema registered under ``name``."""
+    try:
+        return SCHEMAS[name]
+    except KeyError:
+        raise ValueError(f"Unknown schema {name!r}; choose from {', '.join(SCHEMAS)}") from None
+
+
+def schema_of(names: Iterable[str], float_dtype: np.dtype = np.dtype(np.float64)) -> BarSchema:
+    """Schema of stored columns ``names`` whose prices are of ``float_dtype``."""
+    return BarSchema(full="close_time" in set(names), float32=np.dtype(float_dtype) == np.float32)
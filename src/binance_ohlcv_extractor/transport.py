@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Pooled HTTP transport for the REST fetcher.
+
+This module exposes:
+- HttpTransport(base_url=DEFAULT_BASE_URL, pool_size=10, timeout=30): a keep-alive
+  requests.Session with a bounded connection pool; get(path, params) -> Response.
+- AsyncHttpTransport(base_url=DEFAULT_BASE_URL, pool_size=100, timeout=30): the same
+  on an aiohttp.ClientSession; await get(path, params) -> AsyncResponse.
+
+Notes (written content):
+- A bare requests.get() opens a new TCP + TLS connection for every page. One
+  transport shared by all symbols and threads keeps a handful of warm connections.
+- pool_size is the per-host connection cap. With pool_block=True extra threads
+  wait for a free connection instead of opening (and discarding) new ones.
+- Responses are requested gzip-compressed; requests decompresses transparently.
+- aiohttp is optional (pip install "binance-ohlcv-extractor[async]") and is
+  imported only when an AsyncHttpTransport is created. AsyncResponse mirrors the
+  parts of requests.Response the fetcher uses (status_code, headers, content,
+  json(), raise_for_status()).
+"""
+
+import json
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_BASE_URL = "https://fapi.binance.com"
+
+
+class HttpTransport:
+    """Thin wrapper around a pooled ``requests.Session`` bound to one base URL."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 10,
+        timeout: float = 30,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be >= 1")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+
+    def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET ``base_url + path`` over a pooled connection."""
+        return self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+
+    def close(self) -> None:
+        """Release every pooled connection."""
+        self.session.close()
+
+    def __enter__(self) -> "HttpTransport":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class AsyncResponse:
+    """A fully read response from AsyncHttpTransport."""
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes, url: str = "") -> None:
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=None)
+
+
+class AsyncHttpTransport:
+    """Pooled ``aiohttp.ClientSession`` bound to one base URL; use from a single event loop."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        pool_size: int = 100,
+        timeout: float = 30,
+        session: Optional[Any] = None,
+    ) -> None:
+        if pool_size < 1:
+            raise ValueError("pool_size must be >= 1")
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ImportError(
+                "The asyncio API requires aiohttp: pip install 'binance-ohlcv-extractor[async]'"
+            ) from e
+        self.base_url = base_url.rstrip("/")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = session
+
+    def _session(self) -> Any:
+        # Created lazily: aiohttp sessions must be made inside the running loop.
+        if self.session is None:
+            import aiohttp
+
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+        return self.session
+
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None) -> AsyncResponse:
+        """GET ``base_url + path`` over a pooled connection and read the whole body."""
+        query = {k: str(v) for k, v in (params or {}).items()}
+        async with self._session().get(self.base_url + path, params=query) as resp:
+            content = await resp.read()
+            return AsyncResponse(resp.status, resp.headers, content, str(resp.url))
+
+    async def close(self) -> None:
+        """Release every pooled connection."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "AsyncHttpTransport":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.close()
@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Output writers (sinks) for extracted bars.
+
+This module exposes:
+- CsvWriter(compression=None, level=None, threads=1): one {symbol}.csv per symbol,
+  the historical default; {symbol}.csv.gz or .csv.zst when compressed (see csvio.py).
+- ParquetWriter(compression="zstd"): Hive-partitioned Parquet dataset laid out as
+  symbol=<SYMBOL>/interval=<INTERVAL>/month=<YYYY-MM>/part-0.parquet.
+- BarWriter(): append-only fixed-width binary store, {symbol}_{interval}.bars, for
+  memory-mapped range reads (see barstore.py).
+- get_writer(name) -> writer instance for "csv", "parquet" or "bars".
+
+Notes (written content):
+- Every writer implements open(output_dir, symbol, interval, append=False) -> Sink
+  and last_open_time_ms(output_dir, symbol, interval), which is all criptodata()
+  needs for full and incremental runs. A Sink takes chunks in open-time order
+  through write(df), so callers can stream page by page with bounded memory.
+- CSV and bars sinks of a full run write ``{path}.part`` and rename it over the
+  output in close(), so readers never see a half-written file; abort() (or
+  leaving a ``with`` block by an exception) keeps the old output and leaves the
+  .part file for Writer.resume(), which continues it from the size a
+  Sink.checkpoint() reported (see journal.py).
+- Writers store whichever columns they are handed (see schema.py): OHLCV by
+  default, or every kline field in compact dtypes. CSV writes integer columns
+  as integers; Parquet and bars keep the dtypes as they are. Appending fields
+  other than the stored ones (e.g. an incremental OHLCV run over a --schema
+  full output) raises ValueError in every writer.
+- Parquet columns are typed: Date is timestamp[ms, UTC], the other columns keep
+  their NumPy dtypes (float64 OHLCV by default). Readers such as pyarrow.dataset
+  or pandas.read_parquet can prune by partition and load only the columns they need.
+- A .bars file is a 16-byte header (BAR_MAGIC, record size, field count) followed
+  by packed little-endian records sorted by open_time: BAR_DTYPE (int64
+  open_time in ms, then float64 OHLCV) or the record of another BarSchema, told
+  apart by the header. Appends drop bars not newer than the stored tail.
+- CSV and bars sinks serialize NumPy columns directly (Sink.write_columns), so
+  streaming output needs no pandas; it is imported only to read output back,
+  for Parquet, and for callers that hand in DataFrames. CSV rows are formatted
+  in vectorized blocks (csvio.format_csv_rows) and only values that formatter
+  declines go through per-value formatting or DataFrame.to_csv.
+- pyarrow is optional (pip install "binance-ohlcv-extractor[parquet]") and is
+  imported only when a ParquetWriter is created.
+"""
+
+import os
+import shutil
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from .csvio import COMPRESSIONS, _sync, format_csv_rows, open_reader, open_stream
+from .schema import INT_FIELDS, TIME_FIELDS, BarSchema, schema_of
+
+if TYPE_CHECKING:  # pandas is imported lazily, only where frames are involved
+    import pandas as pd
+
+BAR_MAGIC = b"BOHLCV01"
+BAR_DTYPE = np.dtype(
+    [("open_time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8")]
+)
+BAR_HEADER = np.dtype([("magic", "S8"), ("record_size", "<u4"), ("fields", "<u4")])
+PART_SUFFIX = ".part"
+
+
+class Sink:
+    """An open output for one symbol and interval; chunks arrive in open-time order."""
+
+    def write(self, df: "pd.DataFrame") -> None:
+        raise NotImplementedError
+
+    def write_columns(self, cols: Dict[str, np.ndarray]) -> None:
+        """
+        Write a chunk given as NumPy columns ("open_time" in ms plus value columns).
+
+        Sinks that can serialize columns directly override this so the core path
+        never needs pandas; the default builds a frame and calls write().
+        """
+        from .extractor import _frame_from_columns
+
+        self.write(_frame_from_columns(cols))
+
+    def flush(self) -> None:
+        """Make every row written so far visible to readers of the output."""
+
+    def checkpoint(self) -> Optional[int]:
+        """
+        Flush durably (fsync) for a journal checkpoint.
+
+        Returns the size of the file being written (0 before the first write),
+        or None for sinks that do not write a single file.
+        """
+        self.flush()
+        return None
+
+    def close(self) -> None:
+        """Flush buffered rows and release resources."""
+
+    def abort(self) -> None:
+        """Release resources after a failed run without replacing the existing output."""
+        self.close()
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class Writer:
+    """Interface shared by all output backends."""
+
+    name = ""
+
+    def open(self, output_dir: str, symbol: str, interval: str, append: bool = False) -> Sink:
+        """
+        Open a sink for streaming chunks (indexed by Date, UTC).
+
+        Without ``append`` existing output is replaced, but only once the first
+        chunk arrives, so a run that fails before producing data leaves it intact.
+        """
+        raise NotImplementedError
+
+    def resume(self, output_dir: str, symbol: str, interval: str, size: Optional[int], append: bool) -> Optional[Sink]:
+        """
+        Reopen the output of an interrupted run to continue after its last checkpoint.
+
+        ``size`` is what Sink.checkpoint() returned then. Returns None when the
+        partial output is gone. The default appends, which suits writers that
+        merge what they are given with what is stored (Parquet).
+        """
+        return self.open(output_dir, symbol, interval, append=True)
+
+    def derived_dir(self, output_dir: str, interval: str) -> str:
+        """Where bars resampled to ``interval`` go: a per-interval subdirectory by default."""
+        return os.path.join(output_dir, interval)
+
+    def write(self, df: "pd.DataFrame", output_dir: str, symbol: str, interval: str, append: bool = False) -> None:
+        """Write a whole frame in one go; with ``append`` add to existing output."""
+        with self.open(output_dir, symbol, interval, append=append) as sink:
+            sink.write(df)
+
+    def last_open_time_ms(self, output_dir: str, symbol: str, interval: str) -> Optional[int]:
+        """Open time (ms) of the newest stored bar, or None when nothing is stored."""
+        raise NotImplementedError
+
+    def read(self, output_dir: str, symbol: str, interval: str) -> Optional["pd.DataFrame"]:
+        """Load everything stored for symbol/interval (indexed by Date, UTC), or None."""
+        raise NotImplementedError
+
+
+class CsvWriter(Writer):
+    """
+    ``{output_dir}/{symbol}.csv`` with ISO 8601 UTC timestamps and %.8f floats.
+
+    With ``compression`` ("gzip" or "zstd") the file is ``{symbol}.csv.gz`` or
+    ``{symbol}.csv.zst``, compressed as it is streamed at ``level`` on
+    ``threads`` threads; the text inside is the same.
+    """
+
+    name = "csv"
+
+    def __init__(self, compression: Optional[str] = None, level: Optional[int] = None, threads: int = 1) -> None:
+        if compression is not None and compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}; choose from {', '.join(COMPRESSIONS)}")
+        if compression == "zstd":
+            from .csvio import _zstandard
+
+            _zstandard()  # fail now rather than on the first write
+        self.compression = compression
+        self.level = level
+        self.threads = threads
+
+    def path(self, output_dir: str, symbol: str, interval: str) -> str:
+        suffix = COMPRESSIONS[self.compression] if self.compression else ""
+        return os.path.join(output_dir, f"{symbol}.csv{suffix}")
+
+    def _sink(self, path: str, append: bool, resume_size: Optional[int] = None) -> "_CsvSink":
+        return _CsvSink(path, append, resume_size, self.compression, self.level, self.threads)
+
+    def open(self, output_dir: str, symbol: str, interval: str, append: bool = False) -> Sink:
+        return self._sink(self.path(output_dir, symbol, interval), append)
+
+    def resume(self, output_dir: str, symbol: str, interval: str, size: Optional[int], append: bool) -> Optional[Sink]:
+        path = self.path(output_dir, symbol, interval)
+        if not _resumable(path if append else path + PART_SUFFIX, size):
+            return None
+        return self._sink(path, append, resume_size=size)
+
+    def read(self, output_dir: str, symbol: str, interval: str) -> Optional["pd.DataFrame"]:
+        import pandas as pd
+
+        csv_path = self.path(output_dir, symbol, interval)
+        if not os.path.exists(csv_path):
+            return None
+        df = pd.read_csv(csv_path, index_col="Date")
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True), name="Date").as_unit("ns")
+        dtypes = {c: "int32" if c in INT_FIELDS else "int64" if c in TIME_FIELDS else "float64" for c in df}
+        return df.astype(dtypes)
+
+    def last_open_time_ms(self, output_dir: str, symbol: str, interval: str) -> Optional[int]:
+        """
+        Only the tail of a plain file is read, so this is cheap even for years of 1m bars;
+        a compressed file is decompressed as a stream.
+        """
+        csv_path = self.path(output_dir, symbol, interval)
+        if not os.path.exists(csv_path):
+            return None
+        if self.compression is not None:
+            lines, whole = _compressed_tail(csv_path)
+        else:
+            with open(csv_path, "rb") as fh:
+                fh.seek(0, os.SEEK_END)
+                size = fh.tell()
+                block = 4096
+                while True:
+                    offset = max(0, size - block)
+                    fh.seek(offset)
+                    lines = fh.read(size - offset).splitlines()
+                    if offset == 0 or len(lines) >= 2:
+                        break
+                    block *= 2
+            whole = offset == 0
+        lines = [ln for ln in lines if ln.strip()]
+        if whole:
+            lines = lines[1:]  # header
+        if not lines:
+            return None
+        stamp = lines[-1].split(b",", 1)[0].decode()
+        return int(datetime.fromisoformat(stamp).timestamp() * 1000)
+
+
+class ParquetWriter(Writer):
+    """Monthly Parquet partitions per symbol and interval."""
+
+    name = "parquet"
+
+    def __init__(self, compression: str = "zstd") -> None:
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:  # pragma: no cover - depends on the environment
+            raise ImportError(
+                "Parquet output requires pyarrow: pip install 'binance-ohlcv-extractor[parquet]'"
+            ) from e
+        self.compression = compression
+
+    def root(self, output_dir: str, symbol: str, interval: str) -> str:
+        return os.path.join(output_dir, f"symbol={symbol}", f"interval={interval}")
+
+    def _to_table(self, df: "pd.DataFrame") -> Any:
+        import pyarrow as pa
+
+        columns = {"Date": pa.array(df.index.as_unit("ms"), type=pa.timestamp("ms", tz="UTC"))}
+        for col in df.columns:
+            columns[col] = pa.array(df[col].to_numpy())
+        return pa.table(columns)
+
+    def derived_dir(self, output_dir: str, interval: str) -> str:
+        return output_dir  # the interval is already a partition key
+
+    def open(self, output_dir: str, symbol: str, interval: str, append: bool = False) -> Sink:
+        return _ParquetSink(self, self.root(output_dir, symbol, interval), append)
+
+    def write_partition(self, root: str, month: str, part: "pd.DataFrame", merge: bool) -> None:
+        """Write one month=YYYY-MM partition, merging with the stored rows if ``merge``."""
+        import pandas as pd
+        import pyarrow.parquet as pq
+
+        part_dir = os.path.join(root, f"month={month}")
+        part_path = os.path.join(part_dir, "part-0.parquet")
+        if merge and os.path.exists(part_path):
+            existing = pd.read_parquet(part_path).set_index("Date")
+            part = pd.concat([existing, part])
+            part = part[~part.index.duplicated(keep="last")].sort_index()
+        os.makedirs(part_dir, exist_ok=True)
+        tmp_path = part_path + ".tmp"
+        pq.write_table(self._to_table(part), tmp_path, compression=self.compression)
+        os.replace(tmp_path, part_path)
+
+    def read(self, output_dir: str, symbol: str, interval: str) -> Optional["pd.DataFrame"]:
+        import pandas as pd
+
+        root = self.root(output_dir, symbol, interval)
+        parts = sorted(
+            os.path.join(root, d, "part-0.parquet")
+            for d in (os.listdir(root) if os.path.isdir(root) else [])
+            if os.path.exists(os.path.join(root, d, "part-0.parquet"))
+        )
+        if not parts:
+            return None
+        df = pd.concat([pd.read_parquet(path) for path in parts]).set_index("Date")
+        df.index = df.index.as_unit("ns")
+        return df
+
+    def last_open_time_ms(self, output_dir: str, symbol: str, interval: str) -> Optional[int]:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        root = self.root(output_dir, symbol, interval)
+        if not os.path.isdir(root):
+            return None
+        for month_dir in sorted(os.listdir(root), reverse=True):
+            part_path = os.path.join(root, month_dir, "part-0.parquet")
+            if not os.path.exists(part_path):
+                continue
+            dates = pq.read_table(part_path, columns=["Date"]).column("Date")
+            if len(dates):
+                return int(pc.max(dates).cast("int64").as_py())
+        return None
+
+
+class BarWriter(Writer):
+    """``{output_dir}/{symbol}_{interval}.bars``: packed fixed-width records, append-only."""
+
+    name = "bars"
+
+    def path(self, output_dir: str, symbol: str, interval: str) -> str:
+        return os.path.join(output_dir, f"{symbol}_{interval}.bars")
+
+    def derived_dir(self, output_dir: str, interval: str) -> str:
+        return output_dir  # the interval is part of the file name
+
+    def open(self, output_dir: str, symbol: str, interval: str, append: bool = False) -> Sink:
+        return _BarSink(self.path(output_dir, symbol, interval), append)
+
+    def resume(self, output_dir: str, symbol: str, interval: str, size: Optional[int], append: bool) -> Optional[Sink]:
+        path = self.path(output_dir, symbol, interval)
+        if not _resumable(path if append else path + PART_SUFFIX, size) or size < BAR_HEADER.itemsize:
+            return None
+        return _BarSink(path, append, resume_size=size)
+
+    def read(self, output_dir: str, symbol: str, interval: str) -> Optional["pd.DataFrame"]:
+        import pandas as pd
+
+        bars = read_bar_file(self.path(output_dir, symbol, interval))
+        if bars is None:
+            return None
+        index = pd.DatetimeIndex(bars["open_time"] * 1_000_000, dtype="datetime64[ns, UTC]", name="Date")
+        return pd.DataFrame({name: bars[name] for name in bars.dtype.names[1:]}, index=index)
+
+    def last_open_time_ms(self, output_dir: str, symbol: str, interval: str) -> Optional[int]:
+        return _last_bar_open_time(self.path(output_dir, symbol, interval))
+
+
+def _bar_header(dtype: np.dtype = BAR_DTYPE) -> bytes:
+    return np.array([(BAR_MAGIC, dtype.itemsize, len(dtype.names))], dtype=BAR_HEADER).tobytes()
+
+
+# Record layouts of every schema, keyed by the header announcing them.
+_BAR_LAYOUTS = {
+    _bar_header(dtype): dtype
+    for dtype in (BarSchema(full, float32).record_dtype() for full in (False, True) for float32 in (False, True))
+}
+
+
+def _bar_file_dtype(path: str) -> np.dtype:
+    """Record layout of an existing .bars file, from its header."""
+    with open(path, "rb") as fh:
+        header = fh.read(BAR_HEADER.itemsize)
+    dtype = _BAR_LAYOUTS.get(header)
+    if dtype is None:
+        raise ValueError(f"{path} is not a bar store file of this version")
+    return dtype
+
+
+def read_bar_file(path: str) -> Optional[np.ndarray]:
+    """Every record of a .bars file as a read-only memory map, or None if it does not exist."""
+    if not os.path.exists(path):
+        return None
+    dtype = _bar_file_dtype(path)
+    count = (os.path.getsize(path) - BAR_HEADER.itemsize) // dtype.itemsize
+    if not count:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=BAR_HEADER.itemsize, shape=(count,))
+
+
+def _last_bar_open_time(path: str) -> Optional[int]:
+    if not os.path.exists(path):
+        return None
+    size = os.path.getsize(path)
+    if size < BAR_HEADER.itemsize:
+        return None
+    record = _bar_file_dtype(path).itemsize
+    if size < BAR_HEADER.itemsize + record:
+        return None
+    last = size - (size - BAR_HEADER.itemsize) % record - record
+    with open(path, "rb") as fh:
+        fh.seek(last)
+        return int(np.frombuffer(fh.read(8), dtype="<i8")[0])
+
+
+def _resumable(path: str, size: Optional[int]) -> bool:
+    """Whether ``path`` still holds at least the ``size`` checkpointed bytes."""
+    return size is not None and os.path.exists(path) and os.path.getsize(path) >= size
+
+
+def _compressed_tail(path: str, keep: int = 64 * 1024) -> Tuple[List[bytes], bool]:
+    """Lines of the last ``keep`` decompressed bytes, and whether they start at the beginning."""
+    tail, whole = b"", True
+    with open_reader(path) as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            tail += block
+            if len(tail) > keep:
+                tail, whole = tail[-keep:], False
+    return tail.splitlines(), whole
+
+
+def _csv_header(path: str) -> Optional[List[str]]:
+    """Field names in the first line of the (possibly compressed) CSV at ``path``; None if it has none."""
+    if not os.path.exists(path):
+        return None
+    head = b""
+    with open_reader(path) as fh:
+        while b"\n" not in head:
+            block = fh.read(4096)
+            if not block:
+                break
+            head += block
+    line = head.split(b"\n", 1)[0].strip()
+    return line.decode().split(",") if line else None
+
+
+class _CsvSink(Sink):
+    """
+    Streams chunks into one CSV, opened on first write.
+
+    A full run writes ``{path}.part`` and renames it over ``path`` on close; an
+    append run writes ``path`` in place, after checking that the stored header
+    has the same fields. With ``resume_size`` that file is cut back to the
+    checkpointed size and continued.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        append: bool,
+        resume_size: Optional[int] = None,
+        compression: Optional[str] = None,
+        level: Optional[int] = None,
+        threads: int = 1,
+    ) -> None:
+        self.path = path
+        self.append = append
+        self.compression = compression
+        self.level = level
+        self.threads = threads
+        self._target = path if append else path + PART_SUFFIX
+        self._out: Optional[Any] = None
+        self._header = not append and not resume_size
+        self._check = append and not resume_size
+        if resume_size:
+            os.truncate(self._target, resume_size)
+            self._out = open_stream(open(self._target, "ab"), compression, level, threads)
+
+    def _open(self) -> Any:
+        if self._out is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            fh = open(self._target, "ab" if self.append else "wb")
+            self._out = open_stream(fh, self.compression, self.level, self.threads)
+        return self._out
+
+    def _check_stored(self, names: List[str]) -> None:
+        """On the first append, refuse fields other than the stored ones; a file without a header gets one."""
+        if not self._check:
+            return
+        self._check = False
+        stored = _csv_header(self.path)
+        if stored is None:
+            self._header = True
+        elif stored != ["Date", *names]:
+            raise ValueError(f"{self.path} stores {', '.join(stored)}; cannot append other fields")
+
+    def _write_header(self, names: List[str]) -> None:
+        if self._header:
+            self._open().write(",".join(["Date", *names]).encode() + os.linesep.encode())
+            self._header = False
+
+    def write(self, df: "pd.DataFrame") -> None:
+        import pandas as pd
+
+        self._check_stored([str(c) for c in df.columns])
+        rows = None
+        index = df.index
+        if isinstance(index, pd.DatetimeIndex) and str(index.tz) == "UTC" and index.name == "Date":
+            ns = index.as_unit("ns").asi8
+            if not (ns % 1_000_000_000).any() and all(df[c].dtype.kind in "iuf" for c in df.columns):
+                cols = {"open_time": ns // 1_000_000, **{c: df[c].to_numpy() for c in df.columns}}
+                rows = format_csv_rows(cols)
+        if rows is None:
+            rows = df.to_csv(header=self._header, index=True, float_format="%.8f").encode()
+            self._header = False
+        self._write_header([str(c) for c in df.columns])
+        self._open().write(rows)
+
+    def write_columns(self, cols: Dict[str, np.ndarray]) -> None:
+        rows = format_csv_rows(cols)
+        if rows is None:
+            text = _csv_rows(cols)
+            if text is None:
+                super().write_columns(cols)
+                return
+            rows = text.encode()
+        names = [k for k in cols if k != "open_time"]
+        self._check_stored(names)
+        self._write_header(names)
+        self._open().write(rows)
+
+    def flush(self) -> None:
+        if self._out is not None:
+            self._out.flush()
+
+    def checkpoint(self) -> Optional[int]:
+        return self._out.checkpoint() if self._out is not None else 0
+
+    def close(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+            if not self.append:
+                os.replace(self._target, self.path)
+
+    def abort(self) -> None:
+        if self._out is not None:
+            self._out.close()
+            self._out = None
+
+
+def _csv_rows(cols: Dict[str, np.ndarray]) -> Optional[str]:
+    """
+    CSV rows exactly as DataFrame.to_csv(float_format="%.8f") writes them, one value at a time.
+
+    The fallback of format_csv_rows (e.g. for nan). Returns None for open times
+    with a sub-second part, whose text pandas formats differently; callers then
+    fall back to the DataFrame path.
+    """
+    times = cols["open_time"]
+    if (times % 1000).any():
+        return None
+    stamps = np.char.replace(np.datetime_as_string(times.astype("datetime64[ms]"), unit="s"), "T", " ")
+    names = [k for k in cols if k != "open_time"]
+    fmt = "%s+00:00" + "".join(",%d" if cols[k].dtype.kind in "iu" else ",%.8f" for k in names) + os.linesep
+    return "".join(map(fmt.__mod__, zip(stamps.tolist(), *(cols[k].tolist() for k in names))))
+
+
+def _parquet_fields(root: str) -> Optional[List[str]]:
+    """Column names of the first stored partition under ``root``; None if there is none."""
+    import pyarrow.parquet as pq
+
+    for month in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        path = os.path.join(root, month, "part-0.parquet")
+        if os.path.exists(path):
+            return list(pq.read_schema(path).names)
+    return None
+
+
+class _ParquetSink(Sink):
+    """Buffers the current month only; each month is written once it is complete."""
+
+    def __init__(self, writer: ParquetWriter, root: str, append: bool) -> None:
+        self.writer = writer
+        self.root = root
+        self.append = append
+        self._started = False
+        self._month: Optional[str] = None
+        self._parts: List["pd.DataFrame"] = []
+
+    def write(self, df: "pd.DataFrame") -> None:
+        import pandas as pd
+
+        if df.empty:
+            return
+        if not self._started:
+            if self.append:
+                stored = _parquet_fields(self.root)
+                if stored is not None and stored != ["Date", *map(str, df.columns)]:
+                    raise ValueError(f"{self.root} stores {', '.join(stored)}; cannot append other fields")
+            self._started = True
+            if not self.append and os.path.isdir(self.root):
+                shutil.rmtree(self.root)
+        months = df.index.strftime("%Y-%m")
+        for month in pd.unique(months):
+            if month != self._month:
+                self._flush()
+                self._month = month
+            self._parts.append(df[months == month])
+
+    def _flush(self) -> None:
+        if self._parts:
+            import pandas as pd
+
+            part = pd.concat(self._parts) if len(self._parts) > 1 else self._parts[0]
+            # Without append the root was cleared on first write, so anything stored is ours.
+            self.writer.write_partition(self.root, self._month, part, merge=True)
+            self._parts = []
+
+    def flush(self) -> None:
+        self._flush()  # rewrites the current month's partition
+
+    def checkpoint(self) -> Optional[int]:
+        if not self._started:
+            return 0  # nothing cleared or written yet
+        self._flush()
+        return None
+
+    def close(self) -> None:
+        self._flush()
+
+    def abort(self) -> None:
+        self._parts = []  # written months stay; resume() merges the rest in
+
+
+class _BarSink(Sink):
+    """Appends packed records; the file is created (or replaced, via .part) on first write."""
+
+    def __init__(self, path: str, append: bool, resume_size: Optional[int] = None) -> None:
+        self.path = path
+        self.append = append
+        self._fh: Optional[Any] = None
+        self._tmp: Optional[str] = None
+        self._last: Optional[int] = None
+        self._dtype = BAR_DTYPE
+        if resume_size is not None:
+            target = path if append else path + PART_SUFFIX
+            self._dtype = _bar_file_dtype(target)
+            os.truncate(target, resume_size)
+            self._last = _last_bar_open_time(target)
+            self._tmp = None if append else target
+            self._fh = open(target, "ab")
+
+    def write(self, df: "pd.DataFrame") -> None:
+        cols = {"open_time": df.index.as_unit("ms").asi8}
+        for name in df.columns:
+            cols[name] = df[name].to_numpy()
+        self.write_columns(cols)
+
+    def write_columns(self, cols: Dict[str, np.ndarray]) -> None:
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._dtype = schema_of(cols, cols["open"].dtype).record_dtype()
+            if self.append and os.path.exists(self.path):
+                stored = _bar_file_dtype(self.path)
+                if stored.names != self._dtype.names:
+                    raise ValueError(f"{self.path} stores {', '.join(stored.names)}; cannot append other fields")
+                self._dtype = stored  # a float32 store stays float32
+                self._last = _last_bar_open_time(self.path)
+                self._fh = open(self.path, "ab")
+            else:
+                # Replace rather than truncate: live memory maps of the old file stay valid.
+                self._tmp = self.path + PART_SUFFIX
+                self._fh = open(self._tmp, "wb")
+                self._fh.write(_bar_header(self._dtype))
+        records = np.empty(len(cols["open_time"]), dtype=self._dtype)
+        for name in self._dtype.names:
+            records[name] = cols[name]
+        if self._last is not None:
+            records = records[records["open_time"] > self._last]
+        if len(records):
+            self._fh.write(records.tobytes())
+            self._last = int(records["open_time"][-1])
+
+    def flush(self) -> None:
+        if self._fh is not None:
+            self._fh.flush()
+
+    def checkpoint(self) -> Optional[int]:
+        return _sync(self._fh) if self._fh is not None else 0
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            if self._tmp is not None:
+                os.replace(self._tmp, self.path)
+                self._tmp = None
+
+    def abort(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+            self._tmp = None
+
+
+WRITERS: Dict[str, Type[Writer]] = {"csv": CsvWriter, "parquet": ParquetWriter, "bars": BarWriter}
+
+
+def get_writer(name: str) -> Writer:
+    """Instantiate the writer registered under ``name``."""
+    try:
+        return WRITERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown output format {name!r}; choose from {', '.join(WRITERS)}") from None
@@ -0,0 +1,572 @@
+#!/usr/bin/env python3
+"""
+End-to-end tests for criptodata() against an in-memory fake exchange.
+
+Run:
+    pytest testing_validation_by_model/test_extract.py
+"""
+
+import asyncio
+import json
+import zipfile
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from binance_ohlcv_extractor import extractor
+
+DAY = extractor.INTERVAL_MS["1d"]
+
+
+class FakeExchange:
+    """Bars for every slot of the requested interval; counts how many pages were requested."""
+
+    def __init__(self):
+        self.pages = 0
+
+    def __call__(self, symbol, interval, start_ts_ms, end_ts_ms, *args, limit=extractor.MAX_LIMIT):
+        self.pages += 1
+        step = extractor.INTERVAL_MS[interval]
+        first = -(-start_ts_ms // step) * step
+        rows = []
+        for t in range(first, end_ts_ms + 1, step):
+            if len(rows) == limit:
+                break
+            px = str(100 + (t // DAY) % 7)
+            rows.append([t, px, px, px, px, "1.5", t + step - 1, "0", 1, "0", "0", "0"])
+        return rows
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    fake = FakeExchange()
+    monkeypatch.setattr(extractor, "_fetch_page", fake)
+    return fake
+
+
+def test_criptodata_writes_requested_window(tmp_path, exchange):
+    df = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path))
+    assert len(df) == 10
+    assert df.index[0] == pd.Timestamp("2021-01-01", tz="UTC")
+    written = pd.read_csv(tmp_path / "BTCUSDT.csv", index_col="Date", parse_dates=True)
+    assert len(written) == 10
+
+
+def test_cli_runs_symbols_on_the_pool_with_one_limiter(tmp_path, exchange, monkeypatch, capsys):
+    from binance_ohlcv_extractor import cli
+
+    limiters = set()
+
+    def fetch(symbol, interval, start_ts_ms, end_ts_ms, limiter, *args, **kwargs):
+        if symbol == "BADUSDT":
+            raise RuntimeError("boom")
+        limiters.add(id(limiter))
+        return exchange(symbol, interval, start_ts_ms, end_ts_ms, limiter, *args, **kwargs)
+
+    monkeypatch.setattr(extractor, "_fetch_page", fetch)
+    argv = ["binance-ohlcv", "--symbols", "BTCUSDT", "ETHUSDT", "BADUSDT", "BTCUSDT", "--start", "2021-01-01"]
+    argv += ["--end", "2021-01-10", "--out", str(tmp_path), "--workers", "3"]
+    monkeypatch.setattr("sys.argv", argv)
+    cli.main()
+    out = capsys.readouterr().out
+    assert "-> BTCUSDT: 10 rows" in out and "-> ETHUSDT: 10 rows" in out
+    assert "Error for BADUSDT: boom" in out and "1 of 3 symbols failed: BADUSDT" in out
+    assert out.count("/3]") == 3 and len(limiters) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".binance-ohlcv.journal", "BTCUSDT.csv", "ETHUSDT.csv"]
+
+    # The kept journal is neither overwritten by a fresh run nor left behind by a resumed one.
+    with pytest.raises(SystemExit):
+        cli.main()
+    assert "--resume" in capsys.readouterr().err
+    monkeypatch.setattr("sys.argv", [*argv[:4], *argv[6:], "--resume"])  # without BADUSDT
+    cli.main()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["BTCUSDT.csv", "ETHUSDT.csv"]
+
+
+def test_csv_sink_writes_columns_byte_for_byte_like_pandas(tmp_path):
+    from binance_ohlcv_extractor.writers import CsvWriter
+
+    t0 = int(pd.Timestamp("2021-03-04", tz="UTC").value // 10**6)
+    klines = [[t0 + i * 3_600_000, "1.5", "2.123456789", "0.1", "1e-9", str(12345.678 * i)] for i in range(30)]
+    cols = extractor._parse_klines_columns(klines)
+    with CsvWriter().open(str(tmp_path), "A", "1h") as sink:
+        sink.write_columns(cols)
+    expected = extractor._frame_from_columns(cols).to_csv(float_format="%.8f")
+    assert (tmp_path / "A.csv").read_text() == expected
+
+
+def test_vectorized_csv_rows_match_per_value_formatting():
+    from binance_ohlcv_extractor.csvio import format_csv_rows
+    from binance_ohlcv_extractor.writers import _csv_rows
+
+    rng = np.random.default_rng(3)
+    n = 5_000
+    ties = np.array([0.125, 2.5e-9, 1.5e-8, -0.000000005, 1e17, -0.0, 0.0, 99999999.999999995])
+    cols = {
+        "open_time": rng.integers(0, 4 * 10**12, n) // 1000 * 1000,
+        "price": np.concatenate([ties, rng.normal(0, 1e4, n - len(ties)).round(3)]),
+        "compact": rng.random(n).astype(np.float32) * 1e3,
+        "trades": rng.integers(-(2**63) + 1, 2**63 - 1, n),
+    }
+    assert format_csv_rows(cols) == _csv_rows(cols).encode()
+    assert format_csv_rows({**cols, "price": np.full(n, np.nan)}) is None  # left to the exact paths
+    assert format_csv_rows({**cols, "open_time": cols["open_time"] + 1}) is None  # sub-second
+
+
+@pytest.mark.parametrize("compression", ["gzip", "zstd"])
+def test_compressed_csv_streams_the_same_rows_and_appends(tmp_path, exchange, compression):
+    from binance_ohlcv_extractor.csvio import COMPRESSIONS, open_reader
+    from binance_ohlcv_extractor.writers import CsvWriter
+
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    writer = CsvWriter(compression, threads=2)
+    out = str(tmp_path)
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=out, writer=writer)
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=out, writer=writer, incremental=True)
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=str(tmp_path / "ref"))
+    path = writer.path(out, "BTCUSDT", "1d")
+    assert path.endswith("BTCUSDT.csv" + COMPRESSIONS[compression])
+    with open_reader(path) as fh:
+        assert fh.read() == (tmp_path / "ref" / "BTCUSDT.csv").read_bytes()
+    assert writer.last_open_time_ms(out, "BTCUSDT", "1d") == extractor._window_ms("2021-01-12", date(2021, 1, 12))[0]
+    assert len(writer.read(out, "BTCUSDT", "1d")) == 12
+
+
+def test_streaming_run_writes_same_output_as_collected_frame(tmp_path, exchange):
+    rows = extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 3), interval="1m", output_dir=str(tmp_path / "a"),
+        page_workers=3, return_df=False,
+    )
+    df = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 3), interval="1m", output_dir=str(tmp_path / "b"))
+    assert rows == len(df) == 3 * 1440
+    assert df.index.is_monotonic_increasing and df.index.is_unique
+    assert (tmp_path / "a" / "BTCUSDT.csv").read_bytes() == (tmp_path / "b" / "BTCUSDT.csv").read_bytes()
+
+
+def _write_archive(path, klines, header=True):
+    lines = ["open_time,open,high,low,close,volume,close_time,quote_volume,count,"
+             "taker_buy_volume,taker_buy_quote_volume,ignore"] if header else []
+    lines += [",".join(str(v) for v in k) for k in klines]
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(path.name.replace(".zip", ".csv"), "\n".join(lines) + "\n")
+
+
+def test_archives_cover_history_and_rest_fills_the_tail(tmp_path, exchange):
+    jan = exchange("BTCUSDT", "1d", 1609459200000, 1612137599999)
+    feb1 = exchange("BTCUSDT", "1d", 1612137600000, 1612223999999)
+    _write_archive(tmp_path / "BTCUSDT-1d-2021-01.zip", jan)
+    _write_archive(tmp_path / "BTCUSDT-1d-2021-02-01.zip", feb1, header=False)
+    _write_archive(tmp_path / "BTCUSDT-1d-2021-01-05.zip", [])  # shadowed by the monthly file
+
+    exchange.pages = 0
+    df = extractor.criptodata(
+        "BTCUSDT", "2021-01-10", date(2021, 2, 10), output_dir=str(tmp_path / "out"), archive_dir=str(tmp_path)
+    )
+    assert exchange.pages == 1
+    ref = extractor.criptodata("BTCUSDT", "2021-01-10", date(2021, 2, 10), output_dir=str(tmp_path / "ref"))
+    pd.testing.assert_frame_equal(df, ref, check_exact=True)
+
+
+def test_rest_fills_before_and_between_archives(tmp_path, exchange):
+    feb = exchange("BTCUSDT", "1d", 1612137600000, 1614556799999)
+    apr = exchange("BTCUSDT", "1d", 1617235200000, 1619827199999)
+    _write_archive(tmp_path / "BTCUSDT-1d-2021-02.zip", feb)
+    _write_archive(tmp_path / "BTCUSDT-1d-2021-04.zip", apr)  # March is missing
+
+    exchange.pages = 0
+    df = extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 5, 10), output_dir=str(tmp_path / "out"), archive_dir=str(tmp_path)
+    )
+    assert exchange.pages == 3  # January, March and May
+    ref = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 5, 10), output_dir=str(tmp_path / "ref"))
+    pd.testing.assert_frame_equal(df, ref, check_exact=True)
+    assert len(df) == 130
+
+
+def test_incremental_appends_only_new_bars(tmp_path, exchange):
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path))
+    full = (tmp_path / "BTCUSDT.csv").read_text()
+
+    exchange.pages = 0
+    new = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=str(tmp_path), incremental=True)
+    assert list(new.index.strftime("%Y-%m-%d")) == ["2021-01-11", "2021-01-12"]
+    assert exchange.pages == 1
+
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=str(tmp_path / "ref"))
+    assert (tmp_path / "BTCUSDT.csv").read_text() == (tmp_path / "ref" / "BTCUSDT.csv").read_text()
+    assert (tmp_path / "BTCUSDT.csv").read_text().startswith(full)
+
+    exchange.pages = 0
+    again = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=str(tmp_path), incremental=True)
+    assert again.empty and exchange.pages == 0
+
+
+def test_parquet_writer_partitions_by_month_and_appends(tmp_path, exchange):
+    pytest.importorskip("pyarrow")
+    from binance_ohlcv_extractor.writers import ParquetWriter
+
+    writer = ParquetWriter()
+    extractor.criptodata("BTCUSDT", "2021-01-20", date(2021, 2, 5), output_dir=str(tmp_path), writer=writer)
+    root = tmp_path / "symbol=BTCUSDT" / "interval=1d"
+    assert sorted(p.name for p in root.iterdir()) == ["month=2021-01", "month=2021-02"]
+
+    extractor.criptodata(
+        "BTCUSDT", "2021-01-20", date(2021, 2, 8), output_dir=str(tmp_path), writer=writer, incremental=True
+    )
+    df = pd.read_parquet(root / "month=2021-02" / "part-0.parquet", columns=["Date", "close"])
+    assert len(df) == 8
+    assert str(df["Date"].dtype) == "datetime64[ms, UTC]"
+
+
+def test_bar_store_range_reads_are_views_of_the_file(tmp_path, exchange):
+    from binance_ohlcv_extractor.barstore import BarStore
+    from binance_ohlcv_extractor.writers import BarWriter
+
+    writer = BarWriter()
+    df = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path), writer=writer)
+    extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=str(tmp_path), writer=writer, incremental=True
+    )
+    assert writer.last_open_time_ms(str(tmp_path), "BTCUSDT", "1d") == df.index[-1].value // 10**6 + 2 * DAY
+
+    store = BarStore(str(tmp_path))
+    bars = store.read_range("BTCUSDT", "1d", date(2021, 1, 3), df.index[5].value // 10**6)
+    assert list(bars["open_time"]) == list(df.index[2:6].as_unit("ms").asi8)
+    assert list(bars["close"]) == list(df["close"].iloc[2:6])
+    assert isinstance(bars.base, np.memmap) or isinstance(bars, np.memmap)
+    assert len(store.read_range("BTCUSDT", "1d", 0, 2 * 10**12)) == 12
+    assert len(extractor.read_range("BTCUSDT", "1d", date(2022, 1, 1), date(2022, 2, 1), root=str(tmp_path))) == 0
+    pd.testing.assert_frame_equal(writer.read(str(tmp_path), "BTCUSDT", "1d").iloc[:10], df)
+
+
+def test_async_criptodata_matches_blocking_run(tmp_path, exchange):
+    from binance_ohlcv_extractor.aio import acriptodata
+    from binance_ohlcv_extractor.journal import Journal
+    from binance_ohlcv_extractor.transport import AsyncResponse
+
+    class Transport:
+        in_flight = peak = 0
+
+        async def get(self, path, params):
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            await asyncio.sleep(0.001)
+            self.in_flight -= 1
+            rows = exchange(params["symbol"], params["interval"], params["startTime"], params["endTime"])
+            return AsyncResponse(200, {}, json.dumps(rows).encode())
+
+    transport = Transport()
+
+    async def run():
+        return await asyncio.gather(
+            *(
+                acriptodata(s, "2021-01-01", date(2021, 1, 5), interval="1m", output_dir=str(tmp_path / "async"),
+                            transport=transport, page_workers=4)
+                for s in ("BTCUSDT", "ETHUSDT")
+            )
+        )
+
+    frames = asyncio.run(run())
+    expected = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 5), interval="1m", output_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(frames[0], expected)
+    assert (tmp_path / "async" / "ETHUSDT.csv").read_bytes() == (tmp_path / "BTCUSDT.csv").read_bytes()
+    assert transport.peak == 8
+
+    with Journal(str(tmp_path / "journal"), every=0) as journal:
+        asyncio.run(acriptodata("BTCUSDT", "2021-01-01", date(2021, 1, 5), interval="1m",
+                                output_dir=str(tmp_path / "journaled"), transport=transport, journal=journal))
+    with Journal(str(tmp_path / "journal"), resume=True) as journal:
+        exchange.pages = 0
+        done = asyncio.run(acriptodata("BTCUSDT", "2021-01-01", date(2021, 1, 5), interval="1m", return_df=False,
+                                       output_dir=str(tmp_path / "journaled"), transport=transport, journal=journal))
+    assert done == len(expected) and exchange.pages == 0
+
+
+def test_follower_appends_each_newly_closed_bar(tmp_path, exchange, monkeypatch):
+    from binance_ohlcv_extractor import follow
+
+    monkeypatch.setattr(follow, "_fetch_page", exchange)
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 1), interval="1m", output_dir=str(tmp_path))
+    now = [pd.Timestamp("2021-01-02 00:03:00.300", tz="UTC").timestamp()]
+    source = follow.QueueSource()
+    follower = follow.Follower(
+        ["BTCUSDT"], "1m", str(tmp_path), source=source, transport=object(), clock=lambda: now[0]
+    )
+
+    exchange.pages = 0
+    assert follower.catch_up() == {"BTCUSDT": 3}  # 00:00, 00:01 and 00:02 in one request
+    assert exchange.pages == 1 and follower.due() == []
+
+    now[0] += 60  # the 00:03 bar closed; it arrives through the push source, twice
+    t = int(pd.Timestamp("2021-01-02 00:03", tz="UTC").value // 10**6)
+    bar = exchange("BTCUSDT", "1m", t, t)[0]
+    source.push("BTCUSDT", bar)
+    source.push("BTCUSDT", bar)
+    assert follower.due() == ["BTCUSDT"]
+    assert follower.poll_source(0) == 1 and follower.due() == []
+    follower.close()
+
+    written = pd.read_csv(tmp_path / "BTCUSDT.csv", index_col="Date", parse_dates=True)
+    assert len(written) == 1440 + 4 and written.index.is_unique and written.index.is_monotonic_increasing
+
+
+def test_manifest_plan_merges_ranges_and_fetches_each_bar_once(tmp_path, exchange):
+    from binance_ohlcv_extractor import planner
+
+    manifest = tmp_path / "jobs.json"
+    manifest.write_text(json.dumps({"jobs": [
+        {"symbols": ["BTCUSDT", "ETHUSDT"], "interval": "1h", "start": "2021-01-01", "end": "2021-01-10"},
+        {"symbol": "BTCUSDT", "interval": "1h", "start": "2021-01-05", "end": "2021-01-20"},
+        {"symbol": "BTCUSDT", "interval": "1h", "start": "2021-01-21", "end": "2021-01-25"},  # adjacent
+        {"symbol": "BTCUSDT", "interval": "1h", "start": "2021-03-01", "end": "2021-03-02"},
+        {"symbol": "BTCUSDT", "interval": "1d", "start": "2021-01-01", "end": "2021-01-31"},
+    ]}))
+    plan = planner.plan_jobs(planner.load_manifest(str(manifest)))
+    assert plan.requested == 6
+    assert [(s.symbol, s.interval) for s in plan.series] == [("BTCUSDT", "1h"), ("BTCUSDT", "1d"), ("ETHUSDT", "1h")]
+    assert [(a.isoformat(), b.isoformat()) for a, b in plan.series[0].ranges] == [
+        ("2021-01-01", "2021-01-25"), ("2021-03-01", "2021-03-02")
+    ]
+
+    exchange.pages = 0
+    results = planner.run_plan(plan, str(tmp_path / "out"), workers=2, page_workers=2)
+    assert results == {("BTCUSDT", "1h"): 27 * 24, ("BTCUSDT", "1d"): 31, ("ETHUSDT", "1h"): 10 * 24}
+    assert exchange.pages == sum(s.pages for s in plan.series)
+    written = pd.read_csv(tmp_path / "out" / "1h" / "BTCUSDT.csv", index_col="Date")
+    assert len(written) == 27 * 24 and written.index.is_unique
+
+
+def test_pipeline_processes_write_what_criptodata_writes(tmp_path):
+    from binance_ohlcv_extractor.pipeline import run_pipeline
+    from binance_ohlcv_extractor.transport import AsyncResponse
+
+    fake = FakeExchange()
+
+    class Transport:
+        def get(self, path, params):
+            if params["symbol"] == "BADUSDT":
+                return AsyncResponse(400, {}, b'{"code":-1121}', path)
+            rows = fake(params["symbol"], params["interval"], params["startTime"], params["endTime"])
+            return AsyncResponse(200, {}, json.dumps(rows).encode())
+
+    done = []
+    results = run_pipeline(
+        ["BTCUSDT", "ETHUSDT", "BADUSDT"], "2021-01-01", date(2021, 1, 3), interval="1m",
+        output_dir=str(tmp_path / "pipe"), io_workers=3, processes=2, slots=2, transport=Transport(),
+        on_done=lambda s, r: done.append(s),
+    )
+    assert results["BTCUSDT"] == results["ETHUSDT"] == 3 * 1440
+    assert isinstance(results["BADUSDT"], Exception) and sorted(done) == ["BADUSDT", "BTCUSDT", "ETHUSDT"]
+    extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 3), interval="1m", output_dir=str(tmp_path), transport=Transport()
+    )
+    expected = (tmp_path / "BTCUSDT.csv").read_bytes()
+    assert (tmp_path / "pipe" / "BTCUSDT.csv").read_bytes() == expected
+    assert (tmp_path / "pipe" / "ETHUSDT.csv").read_bytes() == expected
+
+
+def test_compact_schema_keeps_every_field_through_parse_and_writers(tmp_path, exchange):
+    from binance_ohlcv_extractor.schema import COMPACT, FULL
+    from binance_ohlcv_extractor.writers import BarWriter, CsvWriter
+
+    klines = exchange("BTCUSDT", "1h", 0, 47 * 3_600_000)
+    cols = extractor._parse_klines_columns(json.dumps(klines).encode(), COMPACT)
+    assert list(cols) == ["open_time", *COMPACT.fields[1:]]
+    assert cols["trades"].dtype == np.int32 and cols["close_time"].dtype == np.int64
+    assert cols["open"].dtype == np.float32
+    for name, col in extractor._parse_klines_columns(klines, COMPACT).items():
+        np.testing.assert_array_equal(col, cols[name])
+
+    with CsvWriter().open(str(tmp_path / "cols"), "BTCUSDT", "1h") as sink:
+        sink.write_columns(cols)
+    with CsvWriter().open(str(tmp_path / "frame"), "BTCUSDT", "1h") as sink:
+        sink.write(extractor._frame_from_columns(cols))
+    assert (tmp_path / "cols" / "BTCUSDT.csv").read_bytes() == (tmp_path / "frame" / "BTCUSDT.csv").read_bytes()
+
+    full = extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path), schema=FULL)
+    compact = extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path), writer=BarWriter(), schema=COMPACT
+    )
+    assert list(compact.columns) == list(full.columns) and compact["trades"].tolist() == [1] * 10
+    assert compact.memory_usage().sum() < 0.65 * full.memory_usage().sum()
+    stored = BarWriter().read(str(tmp_path), "BTCUSDT", "1d")
+    pd.testing.assert_frame_equal(stored, compact, check_dtype=False)
+    assert stored["open"].dtype == np.float32
+
+
+@pytest.mark.parametrize("fmt", ["csv", "gzip", "parquet", "bars"])
+def test_incremental_refuses_a_different_schema_than_stored(tmp_path, exchange, fmt):
+    from binance_ohlcv_extractor.schema import FULL
+    from binance_ohlcv_extractor.writers import CsvWriter, get_writer
+
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    writer = CsvWriter("gzip") if fmt == "gzip" else get_writer(fmt)
+    out = str(tmp_path)
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 10), output_dir=out, writer=writer, schema=FULL)
+    before = writer.read(out, "BTCUSDT", "1d")
+    with pytest.raises(ValueError, match="cannot append other fields"):
+        extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=out, writer=writer, incremental=True)
+    pd.testing.assert_frame_equal(writer.read(out, "BTCUSDT", "1d"), before)
+    extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 12), output_dir=out, writer=writer, schema=FULL, incremental=True
+    )
+    assert len(writer.read(out, "BTCUSDT", "1d")) == 12
+
+
+def test_symbol_metadata_clamps_ranges_and_skips_dead_symbols(tmp_path, exchange):
+    from binance_ohlcv_extractor.metadata import SymbolMetadata
+    from binance_ohlcv_extractor.planner import Job, plan_jobs, run_plan
+    from binance_ohlcv_extractor.transport import AsyncResponse
+
+    ms = lambda day: int(pd.Timestamp(day, tz="UTC").value // 10**6)  # noqa: E731
+    info = {"symbols": [
+        {"symbol": "NEWUSDT", "status": "TRADING", "onboardDate": ms("2021-01-05 08:00"),
+         "deliveryDate": 4133404800000, "contractType": "PERPETUAL"},
+        {"symbol": "OLDUSDT", "status": "SETTLING", "onboardDate": ms("2020-01-01"),
+         "deliveryDate": ms("2020-12-20 16:00"), "contractType": "PERPETUAL"},
+    ]}
+
+    class Transport:
+        requests = 0
+
+        def get(self, path, params=None):
+            self.requests += 1
+            return AsyncResponse(200, {}, json.dumps(info).encode(), path)
+
+    transport, now = Transport(), [1e9]
+    path = str(tmp_path / "meta" / "exchange_info.json")
+    metadata = SymbolMetadata(path, ttl=60, transport=transport, clock=lambda: now[0])
+    assert metadata.get("OLDUSDT").status == "SETTLING" and transport.requests == 1
+    reloaded = SymbolMetadata(path, ttl=60, transport=transport, clock=lambda: now[0])
+    assert reloaded.get("NEWUSDT") == metadata.get("NEWUSDT") and transport.requests == 1
+    now[0] += 61
+    metadata.get("NEWUSDT")
+    assert transport.requests == 2
+
+    df = extractor.criptodata("NEWUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path), metadata=metadata)
+    assert df.index[0] == pd.Timestamp("2021-01-05", tz="UTC") and len(df) == 6
+    exchange.pages = 0
+    with pytest.raises(RuntimeError, match="SETTLING"):
+        extractor.criptodata("OLDUSDT", "2021-01-01", date(2021, 1, 10), output_dir=str(tmp_path), metadata=metadata)
+    assert exchange.pages == 0
+
+    jobs = [Job(s, "1h", date(2020, 12, 1), date(2021, 2, 1)) for s in ("NEWUSDT", "OLDUSDT", "GONEUSDT")]
+    jobs.append(Job("OLDUSDT", "1h", date(2021, 3, 1), date(2021, 3, 5)))  # after delisting
+    plan = plan_jobs(jobs, metadata=metadata)
+    assert [(s.symbol, s.pages) for s in plan.series] == [("NEWUSDT", 1), ("OLDUSDT", 1)]
+    assert [j.symbol for j, _ in plan.skipped] == ["GONEUSDT", "OLDUSDT"]
+    results = run_plan(plan, str(tmp_path / "plan"), page_workers=2)
+    assert exchange.pages == sum(s.pages for s in plan.series)
+    assert results == {("NEWUSDT", "1h"): 28 * 24 - 8, ("OLDUSDT", "1h"): 19 * 24 + 16}
+
+
+def test_journal_resumes_an_interrupted_run_without_refetching(tmp_path, exchange, monkeypatch):
+    from binance_ohlcv_extractor.journal import JOURNAL_NAME, Journal
+
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "BTCUSDT.csv").write_text("previous run\n")
+    args = ("BTCUSDT", "2021-01-01", date(2021, 1, 3))
+    kwargs = dict(interval="1m", output_dir=str(out), return_df=False)
+
+    def flaky(*a, **kw):
+        if exchange.pages == 3:
+            raise ConnectionError("connection reset")
+        return exchange(*a, **kw)
+
+    monkeypatch.setattr(extractor, "_fetch_page", flaky)
+    with Journal(str(out / JOURNAL_NAME), every=0) as journal, pytest.raises(ConnectionError):
+        extractor.criptodata(*args, journal=journal, **kwargs)
+    assert (out / "BTCUSDT.csv").read_text() == "previous run\n"  # never replaced by a partial file
+    with open(out / "BTCUSDT.csv.part", "a") as fh:
+        fh.write("2021-01-03 04:00:00+00:00,10")  # torn row written after the last checkpoint
+
+    monkeypatch.setattr(extractor, "_fetch_page", exchange)
+    exchange.pages = 0
+    with Journal(str(out / JOURNAL_NAME), resume=True, every=0) as journal:
+        rows = extractor.criptodata(*args, journal=journal, **kwargs)
+    assert rows == 3 * 1440 and exchange.pages == 2  # 5 pages in all, 3 already written
+    assert not (out / "BTCUSDT.csv.part").exists()
+    extractor.criptodata(*args, **{**kwargs, "output_dir": str(tmp_path / "ref")})
+    assert (out / "BTCUSDT.csv").read_bytes() == (tmp_path / "ref" / "BTCUSDT.csv").read_bytes()
+
+    exchange.pages = 0
+    with Journal(str(out / JOURNAL_NAME), resume=True) as journal:
+        again = extractor.criptodata(*args, journal=journal, **kwargs)
+    assert again == 3 * 1440 and exchange.pages == 0
+
+
+def test_frame_cache_serves_covered_ranges_and_fetches_only_the_edges(tmp_path, exchange):
+    from binance_ohlcv_extractor.framecache import FrameCache
+
+    now = [pd.Timestamp("2021-01-20 12:00", tz="UTC").timestamp()]
+    cache = FrameCache(clock=lambda: now[0])
+    ref = lambda start, end: extractor.criptodata("BTCUSDT", start, end, output_dir=str(tmp_path))  # noqa: E731
+
+    first = cache.frame("BTCUSDT", "2021-01-05", date(2021, 1, 10))
+    pd.testing.assert_frame_equal(first, ref("2021-01-05", date(2021, 1, 10)))
+    exchange.pages = 0
+    inner = cache.frame("BTCUSDT", "2021-01-06", date(2021, 1, 8))
+    assert exchange.pages == 0 and list(inner.index.day) == [6, 7, 8]
+    wide = cache.frame("BTCUSDT", "2021-01-01", date(2021, 1, 15))
+    assert exchange.pages == 2  # 01-01..01-04 and 01-11..01-15
+    exchange.pages = 0
+    pd.testing.assert_frame_equal(wide, ref("2021-01-01", date(2021, 1, 15)))
+    assert cache.missing("BTCUSDT", "1d", *extractor._window_ms("2021-01-01", date(2021, 1, 15))) == []
+
+    exchange.pages = 0
+    assert len(cache.frame("BTCUSDT", "2021-01-18", date(2021, 1, 20))) == 3
+    assert len(cache.frame("BTCUSDT", "2021-01-18", date(2021, 1, 20))) == 3
+    assert exchange.pages == 2  # the 01-20 bar is still open at noon, so it is fetched each time
+
+    cache.max_bytes = cache.nbytes
+    cache.frame("ETHUSDT", "2021-01-01", date(2021, 1, 2))
+    assert len(cache) == 1 and cache.get("BTCUSDT", "1d", 0, 1) is None
+
+
+def test_find_gaps_and_backfill_only_missing_windows(tmp_path, exchange):
+    from binance_ohlcv_extractor.gaps import backfill_gaps, find_gaps
+    from binance_ohlcv_extractor.writers import CsvWriter
+
+    extractor.criptodata("BTCUSDT", "2021-01-01", date(2021, 1, 31), output_dir=str(tmp_path / "ref"))
+    ref = (tmp_path / "ref" / "BTCUSDT.csv").read_text().splitlines(keepends=True)
+    holed = ref[:1] + ref[3:10] + ref[12:20] + ref[21:-1]  # drop Jan 1-2, 10-11, 20 and 31
+    (tmp_path / "BTCUSDT.csv").write_text("".join(holed))
+
+    t0 = 1609459200000
+    stored = CsvWriter().read(str(tmp_path), "BTCUSDT", "1d").index.as_unit("ms").asi8
+    assert find_gaps(stored, "1d", t0, t0 + 31 * DAY - 1) == [
+        (t0, t0 + DAY), (t0 + 9 * DAY, t0 + 10 * DAY), (t0 + 19 * DAY, t0 + 19 * DAY), (t0 + 30 * DAY, t0 + 30 * DAY)
+    ]
+
+    exchange.pages = 0
+    filled = backfill_gaps("BTCUSDT", "2021-01-01", date(2021, 1, 31), output_dir=str(tmp_path))
+    assert filled == 6 and exchange.pages == 4
+    assert (tmp_path / "BTCUSDT.csv").read_text() == "".join(ref)
+
+
+def test_resample_matches_exchange_bars(tmp_path, exchange):
+    from binance_ohlcv_extractor.resample import resample_ohlcv
+    from binance_ohlcv_extractor.writers import CsvWriter
+
+    extractor.criptodata(
+        "BTCUSDT", "2021-01-01", date(2021, 1, 2), interval="1m", output_dir=str(tmp_path), page_workers=2,
+        resample_to=["15m", "4h", "1d"],
+    )
+    for target in ("15m", "4h", "1d"):
+        expected = extractor.criptodata(
+            "BTCUSDT", "2021-01-01", date(2021, 1, 2), interval=target, output_dir=str(tmp_path / "ref")
+        )
+        derived = CsvWriter().read(str(tmp_path / target), "BTCUSDT", target)
+        prices = ["open", "high", "low", "close"]
+        pd.testing.assert_frame_equal(derived[prices], expected[prices], check_freq=False)
+        assert (derived["volume"] == 1.5 * (extractor.INTERVAL_MS[target] // extractor.INTERVAL_MS["1m"])).all()
+
+    one_min = extractor.criptodata("BTCUSDT", "2021-01-04", date(2021, 1, 17), interval="1h", output_dir=str(tmp_path))
+    weekly = resample_ohlcv(one_min, "1w")
+    assert list(weekly.index.strftime("%a %Y-%m-%d")) == ["Mon 2021-01-04", "Mon 2021-01-11"]
+    assert weekly["high"].iloc[0] == one_min["high"].iloc[:168].max()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the paginated REST fetcher, run against an in-memory fake exchange.
+
+Run:
+    pytest testing_validation_by_model/test_fetch.py
+"""
+
+import json
+import os
+
+import pytest
+
+from binance_ohlcv_extractor import extractor
+from binance_ohlcv_extractor.cache import PageCache
+from binance_ohlcv_extractor.metrics import RunMetrics
+from binance_ohlcv_extractor.ratelimit import RateLimiter, klines_weight
+
+STEP = extractor.INTERVAL_MS["1m"]
+
+
+def _fake_page(symbol, interval, start_ts_ms, end_ts_ms, *args):
+    """Mimic /fapi/v1/klines: up to MAX_LIMIT bars with open_time in [start, end]."""
+    first = -(-start_ts_ms // STEP) * STEP
+    rows = []
+    for t in range(first, end_ts_ms + 1, STEP):
+        if len(rows) == extractor.MAX_LIMIT:
+            break
+        rows.append([t, "1.0", "2.0", "0.5", "1.5", "10.0", t + STEP - 1, "0", 1, "0", "0", "0"])
+    return rows
+
+
+@pytest.fixture
+def fake_exchange(monkeypatch):
+    monkeypatch.setattr(extractor, "_fetch_page", _fake_page)
+
+
+def test_plan_windows_covers_range_without_overlap():
+    start, end = 123_456, 9_000_000_000
+    windows = extractor._plan_windows("1m", start, end)
+    assert windows[0][0] == start and windows[-1][1] == end
+    for (a0, a1), (b0, _) in zip(windows, windows[1:]):
+        assert b0 == a1 + 1
+        assert b0 % (STEP * extractor.MAX_LIMIT) == 0
+    assert all(w1 - w0 < STEP * extractor.MAX_LIMIT for w0, w1 in windows)
+
+
+def test_parallel_windows_match_sequential_pagination(fake_exchange):
+    start = 1_599_999_960_000
+    end = start + 3_500 * STEP + 17
+    limiter = RateLimiter(weight_limit=10**9)
+    sequential = extractor._fetch_klines_requests("BTCUSDT", "1m", start, end, limiter=limiter)
+    parallel = extractor._fetch_klines_requests("BTCUSDT", "1m", start, end, limiter=limiter, page_workers=4)
+    assert parallel == sequential
+    assert len(parallel) == 3_501
+
+
+def test_klines_weight_table():
+    assert [klines_weight(n) for n in (1, 99, 100, 499, 500, 1000, 1500)] == [1, 1, 2, 2, 5, 5, 10]
+
+
+def test_limiter_queues_callers_once_burst_is_spent():
+    limiter = RateLimiter(weight_limit=600, burst=10)  # refills 10 weight/s
+    assert limiter.reserve(5) == 0
+    assert limiter.reserve(5) == 0
+    assert limiter.reserve(5) == pytest.approx(0.5, abs=0.05)
+
+
+class _Resp:
+    def __init__(self, status, body=None, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+        self._body = body
+        self.content = json.dumps(body).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self._body
+
+
+class _Transport:
+    def __init__(self, responses):
+        self.responses = responses
+
+    def get(self, path, params=None):
+        return self.responses.pop(0)
+
+
+def test_fetch_page_honours_retry_after(monkeypatch):
+    transport = _Transport([_Resp(429, headers={"Retry-After": "0"}), _Resp(200, [[1, "1", "1", "1", "1", "1"]])])
+    pauses = []
+    limiter = RateLimiter(weight_limit=10**9)
+    monkeypatch.setattr(limiter, "pause", pauses.append)
+    assert extractor._fetch_page("BTCUSDT", "1m", 0, 1, limiter, transport) == [[1, "1", "1", "1", "1", "1"]]
+    assert pauses == [1.0]
+
+
+def test_fetch_page_records_metrics():
+    page = [[1, "1", "1", "1", "1", "1"]]
+    transport = _Transport([_Resp(429, headers={"Retry-After": "0"}), _Resp(200, page)])
+    limiter = RateLimiter(weight_limit=10**9)
+    limiter.pause = lambda seconds: None
+    metrics = RunMetrics()
+    extractor._fetch_page("BTCUSDT", "1m", 0, 1, limiter, transport, None, metrics)
+    report = metrics.to_dict()
+    assert report["counters"] == {"requests": 2, "retries": 1, "pages": 1, "bytes_received": 4 + len(json.dumps(page))}
+    assert report["request_latency_s"]["count"] == 2
+    prom = metrics.to_prometheus()
+    assert "binance_ohlcv_retries_total 1" in prom
+    assert 'binance_ohlcv_request_latency_seconds_bucket{le="+Inf"} 2' in prom
+
+
+def test_page_cache_stores_only_closed_windows(tmp_path):
+    cache = PageCache(str(tmp_path), page_limit=3)
+    now = 10_000_000
+    page = _fake_page("BTCUSDT", "1m", 0, 2 * STEP, None)
+    assert not cache.put("BTCUSDT", "1m", 0, now + STEP, page[:2], now_ms=now)  # window still open
+    assert not cache.put("BTCUSDT", "1m", 0, 2 * STEP, page, now_ms=STEP)  # last bar still open
+    assert cache.put("BTCUSDT", "1m", 0, 2 * STEP, page, now_ms=now)
+    assert cache.get("BTCUSDT", "1m", 0, STEP) == page[:2]
+    assert cache.get("BTCUSDT", "1m", 0, 50 * STEP) == page  # full page answers any later end
+    assert cache.get("BTCUSDT", "1m", STEP, 2 * STEP) is None
+
+
+def test_page_cache_evicts_least_recently_used(tmp_path):
+    page = _fake_page("BTCUSDT", "1m", 0, 0, None)
+    cache = PageCache(str(tmp_path))
+    cache.put("BTCUSDT", "1m", 0, 0, page, now_ms=STEP * 10)
+    cache.max_bytes = 2 * (tmp_path / "BTCUSDT_1m_0.json").stat().st_size
+    cache.put("BTCUSDT", "1m", 1, 0, page, now_ms=STEP * 10)
+    assert cache.get("BTCUSDT", "1m", 0, 0) == page
+    cache.put("BTCUSDT", "1m", 2, 0, page, now_ms=STEP * 10)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["BTCUSDT_1m_0.json", "BTCUSDT_1m_2.json"]
+
+    # A reopened cache takes the LRU order from the file mtimes.
+    os.utime(tmp_path / "BTCUSDT_1m_0.json", (2, 2))
+    os.utime(tmp_path / "BTCUSDT_1m_2.json", (1, 1))
+    cache = PageCache(str(tmp_path), max_bytes=cache.max_bytes)
+    cache.put("BTCUSDT", "1m", 3, 0, page, now_ms=STEP * 10)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["BTCUSDT_1m_0.json", "BTCUSDT_1m_3.json"]
+
+
+def test_overlapping_range_is_served_from_the_page_cache(tmp_path):
+    class Exchange:
+        requests = 0
+
+        def get(self, path, params=None):
+            self.requests += 1
+            step = extractor.INTERVAL_MS[params["interval"]]
+            first = -(-params["startTime"] // step) * step
+            times = range(first, params["endTime"] + 1, step)[: params["limit"]]
+            return _Resp(200, [[t, "1", "2", "0.5", "1.5", "10", t + step - 1, "0", 1, "0", "0", "0"] for t in times])
+
+    hour = extractor.INTERVAL_MS["1h"]
+    jan1, jan15, feb15, mar1 = 1_609_459_200_000, 1_610_668_800_000, 1_613_347_200_000, 1_614_556_800_000
+    exchange, cache = Exchange(), PageCache(str(tmp_path))
+    limiter = RateLimiter(weight_limit=10**9)
+    full = extractor._fetch_klines_requests("BTCUSDT", "1h", jan1, mar1, limiter, transport=exchange, cache=cache)
+    assert len(full) == (mar1 - jan1) // hour + 1
+    exchange.requests = 0
+    inner = extractor._fetch_klines_requests("BTCUSDT", "1h", jan15, feb15, limiter, transport=exchange, cache=cache)
+    assert exchange.requests == 0
+    assert inner == [k for k in full if jan15 <= k[0] <= feb15]
@@ -28,3 +28,19 @@ def test_parse_klines_response_basic():
     assert list(df.columns) == ["open", "high", "low", "close", "volume"]
     assert df["open"].dtype == float
     assert len(df) == 2
+
+
+def test_parse_klines_fast_matches_reference():
+    """The fast parser must reproduce _parse_klines_response exactly, from lists or raw bytes."""
+    import json
+
+    from binance_ohlcv_extractor.extractor import _parse_klines_fast
+
+    sample = [
+        [1609459200000, "100.0", "110.0", "90.0", "105.0", "123.45", 1609545599999, "0", 1, "0", "0", "0"],
+        [1609545600000, "105.1", "115.0", "95.0", "110.0", "0.00000001", 1609631999999, "0", 1, "0", "0", "0"],
+    ]
+    reference = _parse_klines_response(sample)
+    for raw in (sample, json.dumps(sample).encode(), b"[]"):
+        expected = reference if raw != b"[]" else _parse_klines_response([])
+        pd.testing.assert_frame_equal(_parse_klines_fast(raw), expected, check_exact=True)